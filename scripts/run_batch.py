@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from src.scheduler import BatchScheduler, LONG_JOB_COST
+
+
+def run_batch(files, workers=None, dedicated_workers=1, long_job_cost=LONG_JOB_COST):
+    """
+    Runs several TaiScript files shortest-job-first and reports the
+    estimated cost of each next to its measured runtime.
+
+    Args:
+        files (list): Paths of the TaiScript files.
+        workers (int): Size of the shared worker pool, one per CPU if None.
+        dedicated_workers (int): Workers reserved for long programs.
+        long_job_cost (int): Estimated cost from which a program is long.
+    """
+    missing = [file_path for file_path in files if not os.path.exists(file_path)]
+    if (missing):
+        print(f"Error: File '{missing[0]}' not found.")
+        sys.exit(1)
+
+    scheduler = BatchScheduler(workers, dedicated_workers, long_job_cost)
+    results = scheduler.run(files)
+    for result in results:
+        print(f"===== {result['file']} =====")
+        print(result["output"], end="")
+    print()
+    print(scheduler.report(results))
+
+    if (any(result["status"] != "ok" for result in results)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(usage="./scripts/run_batch.py <file.tai> [<file.tai> ...] [--workers <n>] [--dedicated-workers <n>] [--long-job-cost <units>]")
+    argParser.add_argument("files", nargs="+", help="TaiScript programs to run")
+    argParser.add_argument("--workers", type=int, help="Size of the shared worker pool")
+    argParser.add_argument("--dedicated-workers", type=int, default=1, help="Workers reserved for long programs")
+    argParser.add_argument("--long-job-cost", type=int, default=LONG_JOB_COST, help="Estimated cost from which a program runs on the dedicated workers")
+    args = argParser.parse_args()
+
+    run_batch(args.files, args.workers, args.dedicated_workers, args.long_job_cost)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from src.cluster import Coordinator, RETRIES
+from src.records import BATCH_SIZE
+
+
+def format_bribes(bribes):
+    """
+    Args:
+        bribes (dict): Bribe totals per parichay
+
+    Returns:
+        str: One line per parichay
+    """
+    return "\n".join(f"{parichay}: collected {totals['collected']} in {totals['collections']}, deducted {totals['deducted']} in {totals['deductions']}"
+                     for parichay, totals in sorted(bribes.items()))
+
+
+def run_cluster(files, workers, csv_paths=None, retries=RETRIES, timeout=None, batch_size=BATCH_SIZE):
+    """
+    Runs several TaiScript files, or one file over the rows of a CSV file,
+    on workers started with `run_worker.py`, and reports the bribes
+    collected and deducted on all of them.
+
+    Args:
+        files (list): Paths of the TaiScript files.
+        workers (list): Worker addresses as host:port.
+        csv_paths (tuple): CSV file of rows and CSV file for the results,
+                        to run the only file in `files` once per row.
+        retries (int): Times a unit is sent again after its worker died.
+        timeout (float): Seconds a worker has for one unit.
+        batch_size (int): CSV rows per unit.
+    """
+    missing = [path for path in list(files) + list(csv_paths or ())[:1] if not os.path.exists(path)]
+    if (missing):
+        print(f"Error: File '{missing[0]}' not found.")
+        sys.exit(1)
+
+    coordinator = Coordinator(workers, retries, timeout, batch_size)
+    if (csv_paths):
+        if (len(files) != 1):
+            print("Error: --csv runs exactly one file.")
+            sys.exit(1)
+        with open(files[0], 'r') as file:
+            code = file.read()
+        try:
+            summary = coordinator.run_records(code, csv_paths[0], csv_paths[1], os.path.dirname(os.path.abspath(files[0])))
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"{summary['rows']} rows in {summary['seconds']:.2f}s ({summary['rowsPerSecond']:.0f} rows/s), {summary['failed']} failed")
+        failed = summary["failed"]
+    else:
+        results = coordinator.run_scripts(files)
+        for result in results:
+            print(f"===== {result['file']} ({result['worker']}) =====")
+            print(result["output"], end="")
+        failed = sum(1 for result in results if result["status"] != "ok")
+
+    print()
+    print(format_bribes(coordinator.bribes))
+    if (failed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(usage="./scripts/run_cluster.py <file.tai> [<file.tai> ...] --workers <host:port>[,<host:port> ...] [--csv <rows.csv> <results.csv>] [--retries <n>] [--timeout <seconds>] [--batch-size <rows>]")
+    argParser.add_argument("files", nargs="+", help="TaiScript programs to run")
+    argParser.add_argument("--workers", required=True, help="Comma-separated host:port of every worker")
+    argParser.add_argument("--csv", nargs=2, metavar=("ROWS", "RESULTS"), help="Run the program once per row of ROWS and write the results to RESULTS")
+    argParser.add_argument("--retries", type=int, default=RETRIES, help="Times a unit is sent again after its worker died")
+    argParser.add_argument("--timeout", type=float, help="Seconds a worker has for one unit before it counts as dead")
+    argParser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="CSV rows per unit")
+    args = argParser.parse_args()
+
+    run_cluster(args.files, args.workers.split(","), args.csv, args.retries, args.timeout, args.batch_size)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from src.records import RecordRunner, BATCH_SIZE
+from src.metrics import Metrics
+from src.modules import MODULES
+
+
+def run_records(file_path, csv_path, results_path, workers=None, batch_size=BATCH_SIZE, columnar=True, metrics_path=None, metrics_port=None, module_cache=None):
+    """
+    Runs a TaiScript file once per row of a CSV file, with the columns of
+    the row as variables, and writes what each row printed to a results file.
+
+    Args:
+        file_path (str): Path to the TaiScript file.
+        csv_path (str): CSV file whose header names the variables.
+        results_path (str): CSV file the results are written to.
+        workers (int): Worker processes, one per CPU if None.
+        batch_size (int): Rows handed to a worker at a time.
+        columnar (bool): Whether straight-line programs run on NumPy columns.
+        metrics_path (str): Optional file the metrics are written to after
+                        every batch, for the Prometheus textfile collector.
+        metrics_port (int): Optional local port the metrics are served on
+                        while the rows run and afterwards, until interrupted.
+        module_cache (str): Optional directory parsed imported yojnas are
+                        kept in, so later runs do not parse them again.
+    """
+    for path in (file_path, csv_path):
+        if (not os.path.exists(path)):
+            print(f"Error: File '{path}' not found.")
+            sys.exit(1)
+
+    with open(file_path, 'r') as file:
+        code = file.read()
+
+    metrics = Metrics() if (metrics_path or metrics_port is not None) else None
+    if (metrics_port is not None):
+        server = metrics.serve(metrics_port)
+        print(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    try:
+        MODULES.directory = module_cache
+        runner = RecordRunner(code, workers, batch_size, columnar, metrics, directory=os.path.dirname(os.path.abspath(file_path)))
+        summary = runner.run(csv_path, results_path, metrics_path)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"{summary['rows']} rows in {summary['seconds']:.2f}s ({summary['rowsPerSecond']:.0f} rows/s), {summary['failed']} failed")
+    if (metrics_port is not None):
+        # Stays up so the final values can be scraped
+        try:
+            while (True):
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    if (summary["failed"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(usage="./scripts/run_records.py <file.tai> <rows.csv> <results.csv> [--workers <n>] [--batch-size <rows>] [--no-columnar] [--metrics <file.prom>] [--metrics-port <port>] [--module-cache <dir>]")
+    argParser.add_argument("file", help="TaiScript program to run for every row")
+    argParser.add_argument("csv", help="CSV file whose header names the variables")
+    argParser.add_argument("results", help="CSV file the output of every row is written to")
+    argParser.add_argument("--workers", type=int, help="Worker processes, one per CPU by default")
+    argParser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows handed to a worker at a time")
+    argParser.add_argument("--no-columnar", action="store_true", help="Run every row on its own, even for straight-line programs")
+    argParser.add_argument("--metrics", help="File the metrics are written to after every batch, in the Prometheus text format")
+    argParser.add_argument("--metrics-port", type=int, help="Serve the metrics on this local port, and keep serving them after the rows are done")
+    argParser.add_argument("--module-cache", help="Directory parsed 'yojna lao' imports are kept in across runs")
+    args = argParser.parse_args()
+
+    run_records(args.file, args.csv, args.results, args.workers, args.batch_size, not args.no_columnar, args.metrics, args.metrics_port, args.module_cache)
@@ -5,17 +5,42 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import time
 from src.lexer import lexer
 from src.parser import Parser
 from src.interpreter import Interpreter
+from src.input_source import FileInputSource
+from src.checkpoint import Checkpointer, load_checkpoint, CHECKPOINT_EVERY
+from src.jit import JIT_THRESHOLD
+from src.metrics import Metrics
+from src.delayed_output import ReleasedOutput
+from src.modules import MODULES, link_imports
 
 
-def run_taiscript(file_path):
+def run_taiscript(file_path, input_path=None, fuel=None, bribe_fuel=False, ledger_path=None, checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY, resume=False, jit=True, metrics_path=None, explicit_stack=False, delay=True, module_cache=None):
     """
     Runs a TaiScript file by tokenizing, parsing, and interpreting the code.
 
     Args:
         file_path (str): Path to the TaiScript file.
+        input_path (str): Optional file that feeds the `pucho` statements
+                        instead of stdin.
+        fuel (int): Optional fuel budget, the run is aborted once it is spent.
+        bribe_fuel (bool): Whether `ghoos lo` also buys fuel.
+        ledger_path (str): Optional SQLite file the bribe ledger is kept in.
+        checkpoint_path (str): Optional file the run is checkpointed to.
+        checkpoint_every (int): Loop back-edges between two checkpoints.
+        resume (bool): Whether to continue from the checkpoint, if there is one.
+        jit (bool): Whether hot loops are compiled to Python functions.
+        metrics_path (str): Optional file the metrics of the run are written
+                        to, for the Prometheus textfile collector.
+        explicit_stack (bool): Whether the program runs on an explicit work
+                        stack instead of recursing, for very deep nesting.
+        delay (bool): Whether output is shown only after the delay of the
+                        parichay, `Janta` and `Student` wait.
+        module_cache (str): Optional directory parsed imported yojnas are
+                        kept in, so later runs do not parse them again.
     """
     if (not os.path.exists(file_path)):
         print(f"Error: File '{file_path}' not found.")
@@ -24,30 +49,77 @@ def run_taiscript(file_path):
     with open(file_path, 'r') as file:
         code = file.read()
 
+    inputSource = None
+    interpreter = None
+    held = None
+    metrics = Metrics() if metrics_path else None
     try:
+        if (input_path):
+            inputSource = FileInputSource(input_path)
+
+        started = time.perf_counter()
         tokens = lexer(code)
+        lexed = time.perf_counter()
 #       print("\nTokens:")
 #        for token in tokens:
 #            print(token)
 
         parser = Parser(tokens)
         ast = parser.parse()
+        MODULES.directory = module_cache
+        ast = link_imports(ast, os.path.dirname(os.path.abspath(file_path)))
+        if (metrics):
+            metrics.record_compile(len(tokens), ast, lexed - started, time.perf_counter() - lexed)
 #        print("\nAbstract Syntax Tree (AST):")
 #        for node in ast:
 #            print(node)
 
 #        print("\nOutput:")
-        interpreter = Interpreter()
-        interpreter.interpret(ast)
+        checkpointer = None
+        checkpoint = None
+        if (checkpoint_path):
+            checkpointer = Checkpointer(checkpoint_path, checkpoint_every)
+            if (resume):
+                checkpoint = load_checkpoint(checkpoint_path)
+
+        interpreter = Interpreter(inputSource, fuel=fuel, bribeFuel=bribe_fuel, ledgerPath=ledger_path, checkpointer=checkpointer, jitThreshold=JIT_THRESHOLD if jit else None, metrics=metrics, explicitStack=explicit_stack)
+        if (delay):
+            # The program runs at full speed, its output is shown on time
+            held = interpreter.output = ReleasedOutput(lambda: interpreter.bribeManager.output_delay(), sys.stdout)
+        interpreter.interpret(ast, checkpoint)
     except Exception as e:
+        # The output of the program comes before the error
+        if (held):
+            held.finish()
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if (interpreter):
+            interpreter.close()
+        if (inputSource):
+            inputSource.close()
+        if (held):
+            held.finish()
+        # Also written when the run fails, `interpret` ends it with sys.exit
+        if (metrics):
+            metrics.write(metrics_path)
 
 
 if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(usage="./scripts/run_taiscript <path_to_file.tai> [--input <file>] [--fuel <units>] [--bribe-fuel] [--ledger <file.db>] [--checkpoint <file> [--checkpoint-every <n>] [--resume]] [--no-jit] [--metrics <file.prom>] [--explicit-stack] [--no-delay] [--module-cache <dir>]")
+    argParser.add_argument("file", help="TaiScript program to run")
+    argParser.add_argument("--input", help="File whose lines are read by 'pucho' instead of stdin")
+    argParser.add_argument("--fuel", type=int, help="Fuel budget, the run is aborted once it is spent")
+    argParser.add_argument("--bribe-fuel", action="store_true", help="Let 'ghoos lo' buy more fuel under the current parichay")
+    argParser.add_argument("--ledger", help="SQLite file that keeps every bribe collected and deducted across runs")
+    argParser.add_argument("--checkpoint", help="File the run is checkpointed to at loop back-edges")
+    argParser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, help="Loop back-edges between two checkpoints")
+    argParser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint instead of the beginning")
+    argParser.add_argument("--no-jit", action="store_true", help="Run every loop on the tree walker")
+    argParser.add_argument("--metrics", help="File the metrics of the run are written to, in the Prometheus text format")
+    argParser.add_argument("--explicit-stack", action="store_true", help="Run on an explicit work stack instead of recursing, for deeply nested programs")
+    argParser.add_argument("--no-delay", action="store_true", help="Show output right away, even for 'Janta' and 'Student'")
+    argParser.add_argument("--module-cache", help="Directory parsed 'yojna lao' imports are kept in across runs")
+    args = argParser.parse_args()
 
-    if len(sys.argv) != 2:
-        print("Usage: ./scripts/run_taiscript <path_to_file.tai>")
-        sys.exit(1)
-
-    run_taiscript(sys.argv[1])
+    run_taiscript(args.file, args.input, args.fuel, args.bribe_fuel, args.ledger, args.checkpoint, args.checkpoint_every, args.resume, not args.no_jit, args.metrics, args.explicit_stack, not args.no_delay, args.module_cache)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from src.cluster import serve_worker, WORKER_PORT
+
+
+def run_worker(host="127.0.0.1", port=WORKER_PORT):
+    """
+    Runs the TaiScript programs and CSV row batches a coordinator sends,
+    until interrupted.
+
+    Args:
+        host (str): Address to listen on. The worker runs whatever it is
+                        sent, so only listen where coordinators are trusted.
+        port (int): Port to listen on.
+    """
+    server = serve_worker(host, port)
+    print(f"Worker listening on {server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(usage="./scripts/run_worker.py [--host <address>] [--port <port>]")
+    argParser.add_argument("--host", default="127.0.0.1", help="Address to listen on, only the local machine by default")
+    argParser.add_argument("--port", type=int, default=WORKER_PORT, help="Port to listen on")
+    args = argParser.parse_args()
+
+    run_worker(args.host, args.port)
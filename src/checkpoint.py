@@ -0,0 +1,204 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib
+import pickle
+
+# Loop back-edges between two checkpoints
+CHECKPOINT_EVERY = 100_000
+
+# The log is rewritten as one full snapshot once the deltas appended after
+# the last snapshot outgrow it this many times.
+COMPACT_RATIO = 4
+
+def program_hash(ast):
+    """
+    Args:
+        ast (list): The parsed program
+
+    Returns:
+        str: Fingerprint that ties a checkpoint to the program it came from
+    """
+    # Hashes the text of repr(ast), written out from a list of pending
+    # pieces since repr recurses and fails on deeply nested programs
+    digest = hashlib.sha256()
+    pending = [(False, ast)]
+    while (pending):
+        isText, node = pending.pop()
+        if (isText):
+            digest.update(node.encode())
+            continue
+
+        if (type(node) is dict):
+            parts = [(True, "{")]
+            for index, (key, value) in enumerate(node.items()):
+                parts += [(True, (", " if index else "") + repr(key) + ": "), (False, value)]
+            parts.append((True, "}"))
+        elif (type(node) in (list, tuple)):
+            parts = [(True, "[" if type(node) is list else "(")]
+            for index, value in enumerate(node):
+                parts += [(True, ", " if index else ""), (False, value)]
+            parts.append((True, "]" if type(node) is list else (",)" if len(node) == 1 else ")")))
+        else:
+            digest.update(repr(node).encode())
+            continue
+        pending += reversed(parts)
+    return digest.hexdigest()
+
+def load_checkpoint(path):
+    """
+    Reads the latest checkpoint from a checkpoint log.
+
+    The log starts with a full snapshot followed by deltas that only carry
+    the variables and structs changed since the previous checkpoint. A
+    record cut short by a crash while writing is ignored.
+
+    Args:
+        path (str): Path of the checkpoint log
+
+    Returns:
+        dict | None: The merged state, None if there is no checkpoint
+    """
+    if (not os.path.exists(path)):
+        return None
+
+    state = None
+    with open(path, "rb") as file:
+        while (True):
+            try:
+                record = pickle.load(file)
+            except (EOFError, pickle.UnpicklingError):
+                break
+            if (record["full"] or state is None):
+                state = record
+            else:
+                state["variables"].update(record["variables"])
+                state["structs"].update(record["structs"])
+                for key, value in record.items():
+                    if (key not in ("variables", "structs", "full")):
+                        state[key] = value
+    return state
+
+class Checkpointer:
+    """
+    Takes periodic checkpoints of a running interpreter at loop back-edges.
+
+    A checkpoint holds the position in the program (the enclosing blocks
+    and the end and increment of every active loop, whose counters live in
+    the environment), the variables and structs, the `BribeManager` state,
+    the fuel left, the lines of input read and the offset of every open
+    file. Only variables and structs changed since the previous checkpoint
+    are written, as a delta appended to the log, so a checkpoint costs in
+    proportion to the dirty state. The log is compacted into one snapshot
+    when the deltas outgrow the last snapshot.
+    """
+    def __init__(self, path, every=CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.count = 0
+        self.interpreter = None
+        self.programHash = None
+        self.snapshotBytes = 0
+        self.deltaBytes = 0
+        self.needsSnapshot = True
+
+    def attach(self, interpreter, programHash):
+        """
+        Args:
+            interpreter (Interpreter): The interpreter being checkpointed
+            programHash (str): Fingerprint of the program it runs
+        """
+        self.interpreter = interpreter
+        self.programHash = programHash
+        self.count = 0
+        self.needsSnapshot = True
+
+    def back_edge(self):
+        """
+        Called at every loop back-edge, checkpoints every `every` calls
+        """
+        self.count += 1
+        # Positions inside a function call or a file being read are not
+        # recorded, the checkpoint waits for the call to return and the file
+        # to be closed
+        interpreter = self.interpreter
+        if (self.count >= self.every and not interpreter.callDepth and not interpreter.env.readers):
+            self.count = 0
+            self.save()
+
+    def save(self):
+        """
+        Writes a checkpoint of the current state
+        """
+        interpreter = self.interpreter
+        env = interpreter.env
+        manager = interpreter.bribeManager
+        # Everything the ledger collected so far belongs before this point
+        manager.ledger.flush()
+
+        position = []
+        block = interpreter.program
+        for frame in interpreter.frames:
+            entry = {"index": next(i for i, s in enumerate(block) if s is frame["statement"]), "key": frame["key"]}
+            if ("end" in frame):
+                entry["end"] = frame["end"]
+                entry["increment"] = frame["increment"]
+            position.append(entry)
+            block = frame["statement"][frame["key"]]
+
+        files = {}
+        for alias, fileObject in env.files.items():
+            fileObject.flush()
+            files[alias] = (fileObject.name, fileObject.tell())
+
+        full = self.needsSnapshot or self.deltaBytes > self.snapshotBytes * COMPACT_RATIO
+        if (full):
+            variables = env.variables
+            structs = env.structs
+        else:
+            variables = {name: env.variables[name] for name in env.dirtyVariables}
+            structs = {name: env.structs[name] for name in env.dirtyStructs}
+
+        record = pickle.dumps({
+            "full": full,
+            "program": self.programHash,
+            "position": position,
+            "variables": variables,
+            "structs": structs,
+            "bribeManager": {key: value for key, value in vars(manager).items() if key != "ledger"},
+            "ledgerProgram": manager.ledger.program,
+            "files": files,
+            "fuel": interpreter.fuel,
+            "inputLines": interpreter.inputSource.consumed if interpreter.inputSource else 0,
+        })
+
+        if (full):
+            # Written aside and renamed, so a crash never leaves a log
+            # without a snapshot
+            temporary = self.path + ".tmp"
+            with open(temporary, "wb") as file:
+                file.write(record)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+            self.snapshotBytes = len(record)
+            self.deltaBytes = 0
+            self.needsSnapshot = False
+        else:
+            with open(self.path, "ab") as file:
+                file.write(record)
+                file.flush()
+                os.fsync(file.fileno())
+            self.deltaBytes += len(record)
+
+        env.dirtyVariables.clear()
+        env.dirtyStructs.clear()
+
+    def finish(self):
+        """
+        Removes the checkpoint log once the program has run to the end
+        """
+        if (os.path.exists(self.path)):
+            os.remove(self.path)
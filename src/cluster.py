@@ -0,0 +1,375 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import hashlib
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from itertools import islice
+from src.program import Program
+from src.columnar import ColumnarProgram
+from src.metrics import Metrics, BRIBE_COUNTERS
+from src.result_cache import ResultCache
+from src.records import run_rows, BATCH_SIZE, BATCHES_PER_WORKER, RESULT_COLUMNS, IDENTIFIER_REGEX
+
+# Port a worker listens on when none is given
+WORKER_PORT = 7878
+
+# Times a work unit is sent again after the worker running it died
+RETRIES = 2
+
+def bribe_totals(counters):
+    """
+    Reads the bribe totals per parichay out of drained metrics
+
+    Args:
+        counters (dict): Counters from `Metrics.drain`
+
+    Returns:
+        dict: Collected and deducted amounts and counts, per parichay
+    """
+    totals = {}
+    for key, name in BRIBE_COUNTERS:
+        for (counter, labels), amount in counters.items():
+            if (counter == name):
+                parichay = dict(labels)["parichay"]
+                totals.setdefault(parichay, {"collected": 0, "deducted": 0, "collections": 0, "deductions": 0})[key] += amount
+    return totals
+
+def add_bribes(target, totals):
+    """
+    Adds bribe totals per parichay to `target`
+    """
+    for parichay, amounts in totals.items():
+        mine = target.setdefault(parichay, {"collected": 0, "deducted": 0, "collections": 0, "deductions": 0})
+        for key, amount in amounts.items():
+            mine[key] += amount
+
+def run_unit(unit, programs, cache=None):
+    """
+    Runs one work unit on a worker
+
+    Args:
+        unit (dict): A "script" unit with the source and input of a whole
+                    program, or a "rows" unit with a batch of CSV rows for
+                    a program
+        programs (dict): Programs compiled for "rows" units on this
+                    connection, by the hash of their source
+        cache (ResultCache): Where the worker keeps deterministic runs of
+                    whole programs, every run executes if None
+
+    Returns:
+        dict: The reply, with the output or row results and the bribes
+            collected and deducted while running the unit
+    """
+    if (unit["kind"] == "script"):
+        try:
+            program = Program.compile(unit["source"], directory=unit.get("directory"), cache=cache)
+        except (SyntaxError, ImportError, TypeError) as e:
+            return {"id": unit["id"], "status": "failed", "output": f"Error: {e}\n", "bribes": {}}
+        result = program.run(unit.get("input") or "")
+        output = result.output if result.ok else result.output + f"Error: {result.error}\n"
+        bribes = {parichay or "NONE": totals for parichay, totals in result.bribes.items()}
+        return {"id": unit["id"], "status": "ok" if result.ok else "failed", "output": output, "bribes": bribes, "cached": result.cached}
+
+    key = hashlib.sha256((unit["source"] + "\0" + (unit.get("directory") or "")).encode()).hexdigest()
+    entry = programs.get(key)
+    if (entry is None):
+        metrics = Metrics()
+        program = Program.compile(unit["source"], metrics=metrics, directory=unit.get("directory"))
+        columnar = ColumnarProgram(program) if (unit.get("columnar", True) and ColumnarProgram.supports(program)) else None
+        entry = programs[key] = (program, columnar, metrics)
+    program, columnar, metrics = entry
+    results = run_rows(program, unit["columns"], unit["rows"], unit["first"], columnar)
+    return {"id": unit["id"], "status": "ok", "results": results, "bribes": bribe_totals(metrics.drain()[0])}
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one coordinator connection: one JSON work unit per line in, one
+    JSON reply per line out, in the same order.
+    """
+    def handle(self):
+        programs = {}
+        for line in self.rfile:
+            unit = json.loads(line)
+            try:
+                reply = run_unit(unit, programs, self.server.results)
+            except Exception as e:
+                reply = {"id": unit.get("id"), "status": "failed", "error": str(e), "bribes": {}}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        # Shared by every connection, a batch sent again by any coordinator
+        # is replayed
+        self.results = ResultCache()
+
+def serve_worker(host="127.0.0.1", port=WORKER_PORT):
+    """
+    Starts a worker listening for coordinators. It runs whatever programs
+    it is sent, so it only listens on the loopback address unless another
+    host is given.
+
+    Args:
+        host (str): Address to listen on
+        port (int): Port to listen on, any free port if 0
+
+    Returns:
+        WorkerServer: The server, its address is in `server_address`. It
+            serves once `serve_forever` is called.
+    """
+    return WorkerServer((host, port), WorkerHandler)
+
+def parse_address(address):
+    """
+    Args:
+        address (str | tuple): "host:port", or a (host, port) pair
+
+    Returns:
+        tuple: The (host, port) pair
+    """
+    if (isinstance(address, str)):
+        host, _, port = address.rpartition(":")
+        return (host or "127.0.0.1", int(port))
+    return (address[0], int(address[1]))
+
+class Coordinator:
+    """
+    Splits a batch into work units and runs them on workers over TCP.
+
+    A batch is either several `.tai` programs, one unit per program, or one
+    program over the rows of a CSV file, one unit per `batchSize` rows.
+    Every worker gets a connection and a thread that sends it one unit at a
+    time, so a fast worker takes more units than a slow one. At most
+    `BATCHES_PER_WORKER` units per worker are queued, and results come back
+    in the order of the units.
+
+    When a worker closes its connection or takes longer than `timeout` for
+    a unit, the unit goes back on the queue for any worker, at most
+    `retries` times, and the coordinator connects to the worker again
+    before its next unit. A worker that can not be connected to is dead and
+    gets no more units. Units left when every worker is dead, or sent too
+    often, fail. The bribes each unit collected and deducted are added up
+    per parichay in `bribes`.
+    """
+    def __init__(self, workers, retries=RETRIES, timeout=None, batchSize=BATCH_SIZE):
+        """
+        Args:
+            workers (list): Worker addresses, as "host:port" or (host, port)
+            retries (int): Times a unit is sent again after its worker died
+            timeout (float): Seconds a worker has for one unit, unlimited if
+                        None
+            batchSize (int): CSV rows per unit
+        """
+        self.workers = [parse_address(address) for address in workers]
+        if (not self.workers):
+            raise RuntimeError("A coordinator needs at least one worker.")
+        self.retries = retries
+        self.timeout = timeout
+        self.batchSize = batchSize
+        self.bribes = {}
+
+    def dispatch(self, units):
+        """
+        Runs work units on the workers
+
+        Args:
+            units (Iterator): The units, each a dict with a "kind", its
+                        fields are filled in here
+
+        Yields:
+            dict: The reply to each unit, in the order of the units
+        """
+        pending = queue.Queue()
+        replies = {}
+        condition = threading.Condition()
+        alive = [len(self.workers)]
+
+        def work(address):
+            connection = None
+            while (True):
+                unit = pending.get()
+                if (unit is None):
+                    break
+                if (connection is None):
+                    try:
+                        connection = socket.create_connection(address, self.timeout)
+                    except OSError:
+                        # Not a failure of the unit, another worker runs it
+                        pending.put(unit)
+                        break
+                    stream = connection.makefile("rwb")
+                try:
+                    stream.write((json.dumps(unit) + "\n").encode())
+                    stream.flush()
+                    line = stream.readline()
+                    if (not line):
+                        raise ConnectionError(f"Worker {address[0]}:{address[1]} closed the connection.")
+                    reply = json.loads(line)
+                except (OSError, ValueError) as e:
+                    connection.close()
+                    connection = None
+                    unit["attempts"] += 1
+                    if (unit["attempts"] <= self.retries):
+                        # Another worker, or this one if it is back, runs it
+                        pending.put(unit)
+                        continue
+                    reply = {"id": unit["id"], "status": "failed", "error": f"Worker lost: {e}", "bribes": {}}
+                reply["worker"] = f"{address[0]}:{address[1]}"
+                reply["attempts"] = unit["attempts"] + 1
+                with condition:
+                    replies[unit["id"]] = reply
+                    condition.notify_all()
+            if (connection is not None):
+                connection.close()
+            with condition:
+                alive[0] -= 1
+                condition.notify_all()
+
+        threads = [threading.Thread(target=work, args=(address,), daemon=True) for address in self.workers]
+        for thread in threads:
+            thread.start()
+
+        def wait(unitId):
+            with condition:
+                while (unitId not in replies):
+                    if (alive[0] == 0):
+                        return {"id": unitId, "status": "failed", "error": "No workers left.", "bribes": {}, "worker": None, "attempts": 0}
+                    condition.wait()
+                return replies.pop(unitId)
+
+        def collect(unitId):
+            reply = wait(unitId)
+            add_bribes(self.bribes, reply["bribes"])
+            return reply
+
+        try:
+            window = deque()
+            for unitId, unit in enumerate(units):
+                unit["id"] = unitId
+                unit["attempts"] = 0
+                pending.put(unit)
+                window.append(unitId)
+                if (len(window) >= len(self.workers) * BATCHES_PER_WORKER):
+                    yield collect(window.popleft())
+            while (window):
+                yield collect(window.popleft())
+        finally:
+            for thread in threads:
+                pending.put(None)
+
+    def run_scripts(self, files, inputs=None):
+        """
+        Runs a batch of programs, one unit per program
+
+        Args:
+            files (list): Paths of the TaiScript programs, read here and
+                        sent to the workers. Imports are resolved by the
+                        workers, relative to the same path.
+            inputs (dict): Optional input file per program path, read here
+                        and fed to `pucho` on the worker
+
+        Returns:
+            list: One result per program, in the order of `files`, with the
+                output, status, bribes, worker and attempts of each, and
+                whether the worker replayed it from its `ResultCache`
+        """
+        self.bribes = {}
+        inputs = inputs or {}
+
+        def units():
+            for fileName in files:
+                with open(fileName, "r") as file:
+                    source = file.read()
+                text = None
+                if (inputs.get(fileName)):
+                    with open(inputs[fileName], "r") as file:
+                        text = file.read()
+                yield {"kind": "script", "source": source, "input": text, "directory": os.path.dirname(os.path.abspath(fileName))}
+
+        results = []
+        for fileName, reply in zip(files, self.dispatch(units())):
+            output = reply.get("output", f"Error: {reply.get('error')}\n")
+            results.append({"file": fileName, "output": output, "status": reply["status"], "bribes": reply["bribes"], "worker": reply["worker"], "attempts": reply["attempts"], "cached": reply.get("cached", False)})
+        return results
+
+    def run_records(self, source, csvPath, resultsPath, directory=None, columnar=True):
+        """
+        Runs one program over every row of a CSV file, one unit per batch
+        of rows, and writes one result per row like `RecordRunner`
+
+        Args:
+            source (str): TaiScript source code
+            csvPath (str): CSV file whose header names the variables
+            resultsPath (str): CSV file the results are written to
+            directory (str): Imports of the program are relative to it on
+                        the workers
+            columnar (bool): Whether workers run batches on columns when
+                        the program allows it
+
+        Raises:
+            SyntaxError: If the source can not be parsed
+            TypeError: With every type error found in the program
+            RuntimeError: If a column name can not be a variable name
+
+        Returns:
+            dict: Rows run, rows failed, seconds taken, rows per second and
+                the bribe totals per parichay
+        """
+        # Compiled here first, so a broken program fails before any unit
+        # is sent
+        Program.compile(source, directory=directory)
+        self.bribes = {}
+        started = time.perf_counter()
+        rowCount = 0
+        failed = 0
+        with open(csvPath, "r", newline="") as rows, open(resultsPath, "w", newline="") as target:
+            reader = csv.reader(rows)
+            columns = [name.strip() for name in next(reader, [])]
+            for name in columns:
+                if (not IDENTIFIER_REGEX.fullmatch(name)):
+                    raise RuntimeError(f"Column '{name}' can not be used as a variable name.")
+
+            sizes = deque()
+
+            def units():
+                first = 1
+                while (True):
+                    batch = list(islice(reader, self.batchSize))
+                    if (not batch):
+                        return
+                    sizes.append((first, len(batch)))
+                    yield {"kind": "rows", "source": source, "directory": directory, "columnar": columnar, "columns": columns, "rows": batch, "first": first}
+                    first += len(batch)
+
+            writer = csv.writer(target)
+            writer.writerow(RESULT_COLUMNS)
+            for reply in self.dispatch(units()):
+                first, size = sizes.popleft()
+                if (reply["status"] == "ok"):
+                    results = reply["results"]
+                else:
+                    results = [(first + position, "failed", "", reply["error"]) for position in range(size)]
+                writer.writerows(results)
+                rowCount += len(results)
+                failed += sum(1 for result in results if result[1] != "ok")
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rowCount,
+            "failed": failed,
+            "seconds": elapsed,
+            "rowsPerSecond": rowCount / elapsed if elapsed else 0.0,
+            "bribes": self.bribes,
+        }
@@ -0,0 +1,373 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.interpreter import binary_operation
+from src.vectorizer import INT_LIMIT
+
+# Statements a program may use to run on columns
+COLUMNAR_STATEMENTS = ("PROGRAM_START", "PROGRAM_END", "PARICHAY", "BRIBE", "VAR_DECL", "PRINT", "CONDITIONAL")
+
+COMPARISON_OPERATORS = ("bada hai", "chota hai", "barabar hai", "alag hai", "bada ya barabar hai", "chota ya barabar hai")
+
+NUMPY_OPERATORS = {
+    "bada hai": "greater",
+    "chota hai": "less",
+    "barabar hai": "equal",
+    "alag hai": "not_equal",
+    "bada ya barabar hai": "greater_equal",
+    "chota ya barabar hai": "less_equal",
+    "me jodo": "add",
+    "se ghatao": "subtract",
+    "me guna karo": "multiply",
+    "ka bhag karo": "true_divide",
+    "ka shesh bhag karo": "remainder",
+}
+
+PLACEHOLDER_REGEX = re.compile(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}")
+
+def column(values):
+    """
+    Stores values in the narrowest array that keeps them exactly as they are
+
+    Only columns of plain ints (small enough for float64) or of floats get
+    a numeric dtype. Anything else, including a mix of ints and floats,
+    stays an object array so every value keeps its Python type.
+
+    Args:
+        values (list): One value per row
+
+    Returns:
+        numpy.ndarray: The column
+    """
+    kinds = {type(value) for value in values}
+    if (kinds == {int} and all(-INT_LIMIT < value < INT_LIMIT for value in values)):
+        return np.array(values, dtype=np.int64)
+    if (kinds == {float}):
+        return np.array(values, dtype=np.float64)
+    if (kinds == {bool}):
+        return np.array(values, dtype=np.bool_)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+class ColumnarProgram:
+    """
+    Runs a straight-line program over many records at once.
+
+    Every variable holds one NumPy array with a value per record. `likho`,
+    comparisons and arithmetic work on whole arrays, and `agar`/`warna`
+    runs each branch for the records whose condition matches, tracked by
+    masks. Numbers stay in int64 or float64 arrays while the results are
+    known to equal Python's. Strings, mixed values and numbers that could
+    outgrow float64 fall back to `binary_operation` per record, so the
+    result always matches a run of `Interpreter` on each record, including
+    `me jodo` turning numbers into text next to a string.
+
+    Errors only stop the records they happen in. `parichay` and `ghoos lo`
+    only appear at the top level, so the bribe checks come out the same for
+    every record and run once.
+    """
+    def __init__(self, program):
+        """
+        Args:
+            program (Program): A compiled program that `supports` accepts
+        """
+        self.program = program
+        self.ast = program.ast
+
+    @classmethod
+    def supports(cls, program):
+        """
+        Args:
+            program (Program): A compiled program
+
+        Returns:
+            bool: Whether the program can run on columns
+        """
+        interpreter = program.interpreter
+        if (np is None or interpreter.fuelBudget is not None or interpreter.ledgerPath):
+            return False
+        return cls.supported_block(program.ast, True)
+
+    @classmethod
+    def supported_block(cls, statements, topLevel):
+        for s in statements or []:
+            statementType = s["type"]
+            if (statementType not in COLUMNAR_STATEMENTS):
+                return False
+            if (statementType in ("PARICHAY", "BRIBE") and not topLevel):
+                return False
+            if (statementType == "PRINT" and "file" in s):
+                return False
+            if (statementType == "CONDITIONAL"):
+                if (not cls.supported_expression(s["condition"])):
+                    return False
+                if (not cls.supported_block(s.get("if"), False) or not cls.supported_block(s.get("else"), False)):
+                    return False
+            elif (statementType in ("VAR_DECL", "PRINT") and s["value"] and not cls.supported_expression(s["value"])):
+                return False
+        return True
+
+    @classmethod
+    def supported_expression(cls, expression):
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            return (expression["operator"] in NUMPY_OPERATORS
+                    and cls.supported_expression(expression["left"])
+                    and cls.supported_expression(expression["right"]))
+        return expression["type"] in ("NUMBER", "STRING", "IDENTIFIER")
+
+    def run(self, variables, count):
+        """
+        Runs the program once for every record
+
+        Args:
+            variables (dict): Values of the variables set before the program
+                        starts, one list per variable with a value per record
+            count (int): Number of records
+
+        Returns:
+            list: Per record, the text it printed and its error message
+                (None if it ran to the end)
+        """
+        interpreter = self.program.interpreter
+        interpreter.reset()
+        started = time.perf_counter()
+        self.count = count
+        self.values = {name: column(values) for name, values in variables.items()}
+        self.defined = {name: np.ones(count, dtype=bool) for name in variables}
+        self.errors = [None] * count
+        self.alive = np.ones(count, dtype=bool)
+        self.printed = []
+
+        self.block(self.ast, self.alive.copy())
+
+        if (interpreter.metrics is not None):
+            failed = sum(1 for error in self.errors if error is not None)
+            interpreter.metrics.record_run(interpreter, time.perf_counter() - started, ok=count - failed, failed=failed, records=count)
+
+        outputs = [[] for _ in range(count)]
+        for mask, texts in self.printed:
+            for index in np.flatnonzero(mask):
+                outputs[index].append(texts[index])
+        return [("".join(output), error) for output, error in zip(outputs, self.errors)]
+
+    def fail(self, mask, message):
+        """
+        Stops the records in the mask, keeping the first error of each
+
+        Args:
+            mask (numpy.ndarray): Records the error happened in
+            message (str): The error message
+        """
+        for index in np.flatnonzero(mask & self.alive):
+            self.errors[index] = message
+        self.alive &= ~mask
+
+    def block(self, statements, active):
+        """
+        Args:
+            statements (list): List of statements
+            active (numpy.ndarray): Records that run the statements
+        """
+        interpreter = self.program.interpreter
+        manager = interpreter.bribeManager
+        counts = interpreter.statementCounts
+        for s in statements:
+            active = active & self.alive
+            if (not active.any()):
+                return
+            statementType = s["type"]
+            if (counts is not None):
+                counts[statementType] = counts.get(statementType, 0) + int(active.sum())
+            try:
+                if (statementType == "PROGRAM_START"):
+                    manager.ledger.program = s["name"][1]
+                    continue
+                elif (statementType == "PARICHAY"):
+                    interpreter.execute_parichay(s)
+                    continue
+                elif (statementType == "BRIBE"):
+                    interpreter.execute_bribe(s)
+                    continue
+                elif (statementType == "PROGRAM_END"):
+                    continue
+                manager.validate_bribe(s)
+            except RuntimeError as e:
+                self.fail(active, str(e))
+                return
+
+            self.active = active
+            if (statementType == "VAR_DECL"):
+                if (s["value"]):
+                    value = self.evaluate(s["value"])
+                else:
+                    value = np.full(self.count, None, dtype=object)
+                self.assign(s["variable"], value, active & self.alive)
+            elif (statementType == "PRINT"):
+                value = self.evaluate(s["value"])
+                end = "\n" if s.get("newline", True) else ""
+                mask = active & self.alive
+                values = value.tolist()
+                texts = [None] * self.count
+                for index in np.flatnonzero(mask):
+                    texts[index] = f"{values[index]}{end}"
+                self.printed.append((mask, texts))
+            elif (statementType == "CONDITIONAL"):
+                self.conditional(s, active)
+
+    def conditional(self, statement, active):
+        condition = self.evaluate(statement["condition"])
+        if (condition.dtype == object):
+            truth = np.array([bool(value) for value in condition.tolist()], dtype=bool)
+        else:
+            truth = condition != 0
+        active = active & self.alive
+        taken = active & truth
+        if (taken.any()):
+            if (statement.get("if")):
+                self.block(statement["if"], taken)
+            else:
+                self.fail(taken, "Missing 'if' branch in conditional.")
+        otherwise = active & ~truth
+        if (otherwise.any() and statement.get("else")):
+            self.block(statement["else"], otherwise)
+
+    def assign(self, name, value, mask):
+        """
+        Sets a variable for the records in the mask
+        """
+        if (name not in self.values or mask.all()):
+            self.values[name] = value
+            self.defined[name] = mask.copy() if name not in self.defined else (self.defined[name] | mask)
+            return
+
+        old = self.values[name]
+        if (old.dtype == value.dtype):
+            self.values[name] = np.where(mask, value, old)
+        else:
+            merged = old.astype(object)
+            merged[mask] = value.astype(object)[mask]
+            self.values[name] = merged
+        self.defined[name] |= mask
+
+    def read(self, name):
+        """
+        Raises:
+            RuntimeError: Stops the active records the variable is not set in
+        """
+        missing = self.active & self.alive
+        if (name in self.values):
+            missing = missing & ~self.defined[name]
+        if (missing.any()):
+            self.fail(missing, f"Variable '{name}' is not defined.")
+        if (name not in self.values):
+            return np.full(self.count, None, dtype=object)
+        return self.values[name]
+
+    def evaluate(self, expression):
+        """
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            numpy.ndarray: The value for every record, meaningless for
+                records that are not active
+        """
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            left = self.evaluate(expression["left"])
+            right = self.evaluate(expression["right"])
+            return self.binary(expression["operator"], left, right)
+
+        exprType = expression["type"]
+        if (exprType == "NUMBER"):
+            return column([expression["value"]] * self.count)
+        elif (exprType == "IDENTIFIER"):
+            return self.read(expression["name"])
+
+        # STRING
+        text = expression["value"]
+        names = PLACEHOLDER_REGEX.findall(text)
+        result = np.full(self.count, text, dtype=object)
+        if (not names):
+            return result
+        pieces = PLACEHOLDER_REGEX.split(text)
+        columns = {name: self.read(name).tolist() for name in dict.fromkeys(names)}
+        for index in np.flatnonzero(self.active & self.alive):
+            result[index] = "".join(piece if position % 2 == 0 else str(columns[piece][index]) for position, piece in enumerate(pieces))
+        return result
+
+    def binary(self, operator, left, right):
+        """
+        Applies an operator to two columns, with NumPy when that gives
+        exactly what `binary_operation` gives on each record
+        """
+        if (left.dtype != object and right.dtype != object):
+            if (operator in COMPARISON_OPERATORS):
+                return getattr(np, NUMPY_OPERATORS[operator])(left, right)
+
+            # bool + bool is a logical or for NumPy, but 2 for Python
+            if (left.dtype == np.bool_):
+                left = left.astype(np.int64)
+            if (right.dtype == np.bool_):
+                right = right.astype(np.int64)
+            if (self.exact(operator, left, right)):
+                if (operator in ("ka bhag karo", "ka shesh bhag karo")):
+                    zero = right == 0
+                    if (zero.any()):
+                        self.fail(zero & self.active, "Division by zero.")
+                        right = np.where(zero, 1, right)
+                return getattr(np, NUMPY_OPERATORS[operator])(left, right)
+
+        return self.per_record(operator, left.tolist(), right.tolist())
+
+    def exact(self, operator, left, right):
+        """
+        Int columns never hold values past `INT_LIMIT`, so they convert to
+        float64 exactly and only int results of `me jodo`, `se ghatao` and
+        `me guna karo` can differ from Python's
+
+        Returns:
+            bool: Whether NumPy computes the same values as Python would
+        """
+        if (left.dtype != np.int64 or right.dtype != np.int64 or operator not in ("me jodo", "se ghatao", "me guna karo")):
+            return True
+        leftMax = int(np.abs(left).max()) if len(left) else 0
+        rightMax = int(np.abs(right).max()) if len(right) else 0
+        if (operator == "me guna karo"):
+            return leftMax * rightMax < INT_LIMIT
+        return leftMax + rightMax < INT_LIMIT
+
+    def per_record(self, operator, left, right):
+        """
+        Applies an operator record by record with `binary_operation`. When
+        the active records all get ints or all get floats, the result goes
+        back into a numeric column.
+        """
+        indices = np.flatnonzero(self.active & self.alive)
+        results = []
+        for index in indices:
+            try:
+                results.append(binary_operation(operator, left[index], right[index]))
+            except (RuntimeError, TypeError) as e:
+                single = np.zeros(self.count, dtype=bool)
+                single[index] = True
+                self.fail(single, str(e))
+                results.append(None)
+
+        packed = column(results)
+        if (packed.dtype == object):
+            result = np.full(self.count, None, dtype=object)
+        else:
+            result = np.zeros(self.count, dtype=packed.dtype)
+        result[indices] = packed
+        return result
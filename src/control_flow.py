@@ -0,0 +1,17 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Signals returned by `Interpreter.execute` when the rest of a block has to
+# be skipped. Statements that let the next statement run return None, so a
+# block only tests the result for truth.
+
+# `bijli chali gayi`: ends the innermost loop
+BREAK = 1
+
+# `sarkar gir gayi`: ends the function call, its value is left in
+# `Interpreter.returnValue`
+RETURN = 2
+
+BREAK_OUTSIDE_LOOP = "'bijli chali gayi' can only be used inside a 'ginti karo'."
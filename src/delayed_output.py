@@ -0,0 +1,137 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import io
+import threading
+import time
+from collections import deque
+
+class HeldOutput(io.StringIO):
+    """
+    Output of a run, held back until its parichay lets it be seen.
+
+    Every write is stamped with the moment it may be shown: when it was
+    written plus the delay of the parichay in effect at that point, never
+    before the write before it. The program itself runs at full speed, and
+    `release_output` shows the writes on time afterwards. The whole text is
+    available at once with `getvalue`.
+    """
+    def __init__(self, delay):
+        """
+        Args:
+            delay (Callable): Returns the delay in seconds for a write
+                        made now
+        """
+        super().__init__()
+        self.delay = delay
+        self.chunks = []
+
+    def write(self, text):
+        releaseAt = time.monotonic() + self.delay()
+        if (self.chunks and self.chunks[-1][0] > releaseAt):
+            releaseAt = self.chunks[-1][0]
+        self.chunks.append((releaseAt, text))
+        return super().write(text)
+
+async def release_output(held, target=None):
+    """
+    Writes held output to its target as each write's time comes.
+
+    Waiting is done with timers on the event loop, so one thread can
+    release the output of many runs at once.
+
+    Args:
+        held (HeldOutput): The held output of a run
+        target (TextIO): Where the output is shown, nothing is written if
+                    None and the coroutine only waits until the output is
+                    due
+    """
+    for releaseAt, text in held.chunks:
+        wait = releaseAt - time.monotonic()
+        if (wait > 0):
+            await asyncio.sleep(wait)
+        if (target is not None):
+            target.write(text)
+    if (target is not None):
+        target.flush()
+
+class ReleasedOutput(io.TextIOBase):
+    """
+    Output of a run from the command line, shown while the program runs.
+
+    Writes made under a parichay without delay go straight to the target
+    when nothing is waiting before them. Other writes are stamped like in
+    `HeldOutput` and a release thread shows each one when its time comes,
+    so nothing is kept once it is shown. The program runs synchronously on
+    its own thread, which is why the timer is a thread and not the event
+    loop.
+    """
+    def __init__(self, delay, target):
+        """
+        Args:
+            delay (Callable): Returns the delay in seconds for a write
+                        made now
+            target (TextIO): Where the output is shown
+        """
+        super().__init__()
+        self.delay = delay
+        self.target = target
+        self.chunks = deque()
+        self.condition = threading.Condition()
+        self.releaser = None
+        self.finishing = False
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        delay = self.delay()
+        with self.condition:
+            if (delay <= 0 and not self.chunks):
+                self.target.write(text)
+                return len(text)
+            releaseAt = time.monotonic() + delay
+            if (self.chunks and self.chunks[-1][0] > releaseAt):
+                releaseAt = self.chunks[-1][0]
+            self.chunks.append((releaseAt, text))
+            if (self.releaser is None):
+                self.releaser = threading.Thread(target=self.release, daemon=True)
+                self.releaser.start()
+            self.condition.notify()
+        return len(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def release(self):
+        """
+        Shows the waiting writes as each one's time comes, until `finish`
+        is called and nothing is left
+        """
+        with self.condition:
+            while (True):
+                if (not self.chunks):
+                    if (self.finishing):
+                        return
+                    self.condition.wait()
+                    continue
+                wait = self.chunks[0][0] - time.monotonic()
+                if (wait > 0):
+                    self.condition.wait(wait)
+                    continue
+                self.target.write(self.chunks.popleft()[1])
+                self.target.flush()
+
+    def finish(self):
+        """
+        Waits until every write has been shown
+        """
+        with self.condition:
+            self.finishing = True
+            self.condition.notify()
+        if (self.releaser is not None):
+            self.releaser.join()
+        self.target.flush()
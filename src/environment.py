@@ -3,11 +3,15 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.input_source import MappedFileSource
+from src.rope import Rope
+
 class Environment:
     def __init__(self):
         self.variables = {}
         self.structs = {}
         self.files = {}
+        self.readers = {}
 
     def set_variable(self, name, value):
         """
@@ -19,6 +23,16 @@ class Environment:
         """
         self.variables[name] = value
 
+    def touch(self, name):
+        """
+        Marks a variable whose value was changed in place, like an array
+        that was appended to
+
+        Args:
+            name (str): Name of the variable
+        """
+        pass
+
     def get_variable(self, name):
         """
         Find the value of the variable
@@ -35,7 +49,32 @@ class Environment:
         if (name not in self.variables):
             raise RuntimeError(f"Variable '{name}' is not defined.")
 
-        return self.variables[name]
+        value = self.variables[name]
+        if (type(value) is Rope):
+            # Joined once, the string is kept until the next append
+            value = self.variables[name] = str(value)
+        return value
+
+    def peek_variable(self, name):
+        """
+        Returns the value of a variable as stored, a `Rope` is not joined
+
+        Args:
+            name (str): Name of the variable
+
+        Returns:
+            Any: The value, None if the variable is not defined
+        """
+        return self.variables.get(name)
+
+    def join_ropes(self):
+        """
+        Joins the text of every variable holding a `Rope` into a string,
+        for code that reads `variables` directly
+        """
+        for name, value in self.variables.items():
+            if (type(value) is Rope):
+                self.variables[name] = str(value)
 
     def set_struct(self, name, members):
         """
@@ -77,11 +116,43 @@ class Environment:
         Raises:
             RuntimeError: Raise an error if alias is already in use
         """
-        if (alias in self.files):
+        if (alias in self.files or alias in self.readers):
             raise RuntimeError(f"File alias '{alias}' is already in use.")
 
         self.files[alias] = open(file_name, 'w')
 
+    def open_reader(self, alias, file_name):
+        """
+        Open a file for reading its lines and associate it with an alias
+
+        Args:
+            alias (str): Alias for the file
+            file_name (str): Path of the file
+
+        Raises:
+            RuntimeError: Raise an error if alias is already in use
+        """
+        if (alias in self.files or alias in self.readers):
+            raise RuntimeError(f"File alias '{alias}' is already in use.")
+
+        self.readers[alias] = MappedFileSource(file_name)
+
+    def get_reader(self, alias):
+        """
+        Args:
+            alias (str): Alias for the file
+
+        Raises:
+            RuntimeError: If the alias is not associated with a file opened
+                        for reading
+
+        Returns:
+            MappedFileSource: The lines of the file
+        """
+        if (alias not in self.readers):
+            raise RuntimeError(f"File alias '{alias}' is not open for reading.")
+        return self.readers[alias]
+
     def close_file(self, alias):
         """
         Close the mentioned file
@@ -92,8 +163,32 @@ class Environment:
         Raises:
             RuntimeError: If the alias is not associated with file
         """
+        if (alias in self.readers):
+            self.readers.pop(alias).close()
+            return
         if (alias not in self.files):
             raise RuntimeError(f"File alias '{alias}' is not open.")
 
         self.files[alias].close()
-        del self.files[alias]
\ No newline at end of file
+        del self.files[alias]
+
+class TrackedEnvironment(Environment):
+    """
+    Environment that remembers which variables and structs changed since
+    the last checkpoint, so a checkpoint only writes those.
+    """
+    def __init__(self):
+        super().__init__()
+        self.dirtyVariables = set()
+        self.dirtyStructs = set()
+
+    def set_variable(self, name, value):
+        self.variables[name] = value
+        self.dirtyVariables.add(name)
+
+    def touch(self, name):
+        self.dirtyVariables.add(name)
+
+    def set_struct(self, name, members):
+        self.structs[name] = members
+        self.dirtyStructs.add(name)
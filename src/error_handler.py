@@ -0,0 +1,12 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+class FuelExhausted(RuntimeError):
+    """
+    Raised when a program has used up its execution fuel budget.
+    """
+    def __init__(self, budget):
+        super().__init__(f"Sarkar gir gayi! Program ka fuel khatam ho gaya (budget: {budget} units). Aur chahiye to 'ghoos lo'.")
+        self.budget = budget
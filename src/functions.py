@@ -0,0 +1,225 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections import OrderedDict
+from src.utils.helper import expression_names, expression_calls
+from src.rope import Rope
+
+# Distinct argument tuples remembered per `yaad rakho` function
+MEMO_SIZE = 1024
+
+# Statements with side effects a `yaad rakho` function may not use
+IMPURE_STATEMENTS = ("PRINT", "INPUT", "FILE_OPEN", "FILE_WRITE", "FILE_CLOSE", "FILE_LOOP", "BRIBE", "PARICHAY", "FUNCTION_DECL", "CALL_STATEMENT")
+
+# Marks a slot whose variable has not been set in the current call
+UNSET = object()
+
+def local_names(statements):
+    """
+    Collects the variables a function body binds, which are local to it
+
+    Args:
+        statements (list): The function body
+
+    Returns:
+        list: Names in the order they are first bound
+    """
+    names = []
+    for s in statements or []:
+        statementType = s["type"]
+        if (statementType in ("VAR_DECL", "ARRAY_DECL", "LOOP", "FILE_LOOP")):
+            names.append(s["variable"])
+        elif (statementType == "INPUT"):
+            names.append(s["name"])
+        elif (statementType == "STRUCT_INSTANCE"):
+            names.append(s["instance_name"])
+        if (statementType in ("LOOP", "FILE_LOOP")):
+            names += local_names(s["body"])
+        elif (statementType == "CONDITIONAL"):
+            names += local_names(s.get("if")) + local_names(s.get("else"))
+    return names
+
+class Frame:
+    """
+    Variables of one function call, kept in a list of slots.
+
+    Parameters and locals are given a slot when the function is declared,
+    so a call only resets the list. Frames are taken from the pool of
+    their function and returned to it after the call. Names without a slot
+    are globals. A frame stands in for the `Environment` while its call
+    runs.
+    """
+    def __init__(self, function, globals):
+        self.slots = function.slots
+        self.values = list(function.blank)
+        self.globals = globals
+
+    @property
+    def variables(self):
+        """
+        Returns:
+            dict: Globals and the locals set so far, as one dictionary
+        """
+        variables = dict(self.globals.variables)
+        for name, slot in self.slots.items():
+            if (self.values[slot] is not UNSET):
+                variables[name] = self.values[slot]
+        return variables
+
+    @property
+    def structs(self):
+        return self.globals.structs
+
+    @property
+    def files(self):
+        return self.globals.files
+
+    @property
+    def readers(self):
+        return self.globals.readers
+
+    def set_variable(self, name, value):
+        slot = self.slots.get(name)
+        if (slot is None):
+            self.globals.set_variable(name, value)
+        else:
+            self.values[slot] = value
+
+    def get_variable(self, name):
+        slot = self.slots.get(name)
+        if (slot is None):
+            return self.globals.get_variable(name)
+        value = self.values[slot]
+        if (value is UNSET):
+            raise RuntimeError(f"Variable '{name}' is not defined.")
+        if (type(value) is Rope):
+            value = self.values[slot] = str(value)
+        return value
+
+    def peek_variable(self, name):
+        slot = self.slots.get(name)
+        if (slot is None):
+            return self.globals.peek_variable(name)
+        value = self.values[slot]
+        return None if value is UNSET else value
+
+    def touch(self, name):
+        if (name not in self.slots):
+            self.globals.touch(name)
+
+    def set_struct(self, name, members):
+        self.globals.set_struct(name, members)
+
+    def get_struct(self, name):
+        return self.globals.get_struct(name)
+
+    def open_file(self, alias, file_name):
+        self.globals.open_file(alias, file_name)
+
+    def open_reader(self, alias, file_name):
+        self.globals.open_reader(alias, file_name)
+
+    def get_reader(self, alias):
+        return self.globals.get_reader(alias)
+
+    def close_file(self, alias):
+        self.globals.close_file(alias)
+
+class Function:
+    """
+    A function declared with `karam karo`.
+
+    With `yaad rakho`, results are remembered per argument list in a cache
+    of at most `MEMO_SIZE` entries, dropping the least recently used. Such
+    functions must be pure: they may only read their parameters and locals,
+    have no side effects and only call themselves or other `yaad rakho`
+    functions.
+    """
+    def __init__(self, statement, functions):
+        """
+        Args:
+            statement (dict): A dictionary representing function declaration
+            functions (dict): Functions declared so far, by name
+
+        Raises:
+            RuntimeError: If a `yaad rakho` function is not pure
+        """
+        self.name = statement["name"]
+        self.params = statement["params"]
+        self.body = statement["body"]
+        self.slots = {}
+        for name in self.params + local_names(self.body):
+            self.slots.setdefault(name, len(self.slots))
+        self.blank = [UNSET] * len(self.slots)
+        self.pool = []
+        self.cache = None
+        self.hits = 0
+        self.misses = 0
+        if (statement.get("memoize")):
+            self.check_pure(self.body, functions)
+            self.cache = OrderedDict()
+
+    def check_pure(self, statements, functions):
+        """
+        Raises:
+            RuntimeError: If the statements read globals, have side effects
+                        or call functions that are not `yaad rakho`
+        """
+        for s in statements or []:
+            statementType = s["type"]
+            if (statementType in IMPURE_STATEMENTS or (statementType == "ARRAY_APPEND" and s["variable"] not in self.slots)):
+                raise RuntimeError(f"'yaad rakho' karam '{self.name}' can not use '{statementType}'.")
+
+            expressions = [s.get(key) for key in ("value", "condition", "start", "end") if isinstance(s.get(key), dict)]
+            for expression in expressions:
+                for name in expression_names(expression):
+                    if (name not in self.slots):
+                        raise RuntimeError(f"'yaad rakho' karam '{self.name}' can not read outer variable '{name}'.")
+                for callee in expression_calls(expression):
+                    if (callee != self.name and (callee not in functions or functions[callee].cache is None)):
+                        raise RuntimeError(f"'yaad rakho' karam '{self.name}' can only call other 'yaad rakho' karam, not '{callee}'.")
+
+            self.check_pure(s.get("body"), functions)
+            self.check_pure(s.get("if"), functions)
+            self.check_pure(s.get("else"), functions)
+
+    def acquire(self, globals, args):
+        """
+        Takes a frame from the pool and fills in the arguments
+
+        Args:
+            globals (Environment): The program's environment
+            args (list): Values of the parameters
+
+        Returns:
+            Frame: The frame for the call
+        """
+        if (self.pool):
+            frame = self.pool.pop()
+            frame.values[:] = self.blank
+        else:
+            frame = Frame(self, globals)
+        frame.values[:len(args)] = args
+        return frame
+
+    def release(self, frame):
+        """
+        Args:
+            frame (Frame): A frame whose call has returned
+        """
+        self.pool.append(frame)
+
+    def remember(self, key, value):
+        """
+        Stores a result in the cache, dropping the least recently used one
+        when the cache is full
+
+        Args:
+            key (tuple): The arguments
+            value (Any): The result
+        """
+        self.cache[key] = value
+        if (len(self.cache) > MEMO_SIZE):
+            self.cache.popitem(last=False)
@@ -0,0 +1,267 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import codecs
+import mmap
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Characters read per refill. Lines are split from the whole chunk in one go.
+CHUNK_SIZE = 1 << 20
+
+INTEGER_REGEX = re.compile(r"-?\d+")
+FLOAT_REGEX = re.compile(r"-?\d+\.\d*|-?\.\d+")
+
+def parse_input_value(text):
+    """
+    Converts a line of input into the value stored by `pucho`
+
+    Args:
+        text (str): The line without its line ending
+
+    Returns:
+        int | float | str: Numbers are converted, anything else stays a string
+    """
+    if (INTEGER_REGEX.fullmatch(text)):
+        return int(text)
+    if (FLOAT_REGEX.fullmatch(text)):
+        return float(text)
+    return text
+
+class InputSource(ABC):
+    """
+    Base class of the sources `pucho` reads from.
+
+    Sources read ahead in large chunks and keep the complete lines in a
+    buffer, so most `pucho` statements never touch the underlying stream.
+    Subclasses only implement `fill`.
+    """
+    def __init__(self):
+        self.lines = deque()
+        self.pending = ""
+        self.finished = False
+        self.consumed = 0
+
+    def feed(self, text):
+        """
+        Adds raw text to the buffer, splitting all complete lines at once
+
+        Args:
+            text (str): Text read from the underlying stream
+        """
+        if (not text):
+            return
+        parts = (self.pending + text).split("\n")
+        self.pending = parts.pop()
+        self.lines.extend(parts)
+
+    def finish(self):
+        """
+        Marks the end of input, keeping a last line without a line ending
+        """
+        if (self.pending):
+            self.lines.append(self.pending)
+            self.pending = ""
+        self.finished = True
+
+    @abstractmethod
+    def fill(self):
+        """
+        Reads the next chunk from the underlying stream into the buffer,
+        calling `finish` once the stream has no more
+        """
+
+    def read_line(self):
+        """
+        Returns the next line of input
+
+        Returns:
+            str | None: The line without its line ending, None at end of input
+        """
+        while (not self.lines):
+            if (self.finished):
+                return None
+            self.fill()
+        self.consumed += 1
+        return self.lines.popleft().rstrip("\r")
+
+    def ready(self):
+        """
+        Returns:
+            bool: Whether `read_line` returns without reading the stream
+        """
+        return bool(self.lines) or self.finished
+
+    def close(self):
+        """
+        Releases the underlying stream, if the source owns it
+        """
+        pass
+
+class TextInputSource(InputSource):
+    """
+    Reads input given up front as text, for programs run from Python.
+    """
+    def __init__(self, text):
+        super().__init__()
+        self.feed(text)
+        self.finish()
+
+    def fill(self):
+        pass
+
+class StreamInputSource(InputSource):
+    """
+    Reads from a text stream such as `sys.stdin`. Interactive terminals are
+    read one line at a time so a prompt never waits for a full chunk.
+
+    Other streams are read through their binary buffer with `read1`, which
+    returns whatever has arrived instead of waiting for a full chunk, so a
+    pipe fed a line at a time is read a line at a time.
+    """
+    def __init__(self, stream, chunkSize=CHUNK_SIZE):
+        super().__init__()
+        self.stream = stream
+        self.chunkSize = chunkSize
+        self.interactive = hasattr(stream, "isatty") and stream.isatty()
+        buffer = getattr(stream, "buffer", None)
+        # Streams without a binary buffer, like `io.StringIO`, never wait
+        self.buffer = buffer if (not self.interactive and hasattr(buffer, "read1")) else None
+        self.decoder = codecs.getincrementaldecoder(getattr(stream, "encoding", None) or "utf-8")()
+
+    def fill(self):
+        if (self.buffer is not None):
+            raw = self.buffer.read1(self.chunkSize)
+            # A chunk may end in the middle of a multi-byte character
+            self.feed(self.decoder.decode(raw, final=not raw))
+            if (not raw):
+                self.finish()
+            return
+        text = self.stream.readline() if self.interactive else self.stream.read(self.chunkSize)
+        if (text):
+            self.feed(text)
+        else:
+            self.finish()
+
+class FileInputSource(StreamInputSource):
+    """
+    Reads input from a file, for batch runs.
+    """
+    def __init__(self, fileName, chunkSize=CHUNK_SIZE):
+        super().__init__(open(fileName, "r", buffering=chunkSize), chunkSize)
+
+    def close(self):
+        self.stream.close()
+
+class MappedFileSource(InputSource):
+    """
+    Reads the lines of a file opened with `file padho` through `mmap`.
+
+    The mapping is decoded one chunk at a time and each chunk is split into
+    lines in one go, so memory use stays at about one chunk however large
+    the file is.
+    """
+    def __init__(self, fileName, chunkSize=CHUNK_SIZE):
+        super().__init__()
+        self.file = open(fileName, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.chunkSize = chunkSize
+        self.offset = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.map = None
+        # An empty file can not be mapped
+        if (self.size):
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if (hasattr(self.map, "madvise")):
+                self.map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def fill(self):
+        if (self.offset >= self.size):
+            self.feed(self.decoder.decode(b"", final=True))
+            self.finish()
+            return
+        end = self.offset + self.chunkSize
+        # A chunk may end in the middle of a multi-byte character
+        self.feed(self.decoder.decode(self.map[self.offset:end]))
+        self.offset = end
+
+    def close(self):
+        if (self.map is not None):
+            self.map.close()
+        self.file.close()
+
+class QueueInputSource(InputSource):
+    """
+    Reads input from a `queue.Queue` filled by another part of the program.
+    Each item is a piece of text (one or more lines), None ends the input.
+    """
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    def fill(self):
+        text = self.queue.get()
+        if (text is None):
+            self.finish()
+        else:
+            self.feed(text)
+
+class AsyncInputSource(InputSource):
+    """
+    Reads input from an `asyncio.StreamReader` or an `asyncio.Queue`.
+
+    Waiting happens on the event loop, so one thread can serve many
+    interpreters waiting for input. `Interpreter.interpret_async` awaits
+    `read_line_async` for each `pucho`. A synchronous run can not wait for
+    more input, so `prefetch` it first: that buffers everything up to the
+    end of the stream, holding the whole input in memory.
+    """
+    def __init__(self, reader, chunkSize=CHUNK_SIZE):
+        super().__init__()
+        self.reader = reader
+        self.chunkSize = chunkSize
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+    async def fill_async(self):
+        """
+        Waits for the next chunk of input and adds it to the buffer
+        """
+        if (hasattr(self.reader, "read")):
+            raw = await self.reader.read(self.chunkSize)
+        else:
+            raw = await self.reader.get()
+
+        if (not raw):
+            self.feed(self.decoder.decode(b"", final=True))
+            self.finish()
+        elif (isinstance(raw, bytes)):
+            # A chunk may end in the middle of a multi-byte character
+            self.feed(self.decoder.decode(raw))
+        else:
+            self.feed(raw)
+
+    async def read_line_async(self):
+        """
+        Returns:
+            str | None: The next line, None at end of input
+        """
+        while (not self.lines):
+            if (self.finished):
+                return None
+            await self.fill_async()
+        self.consumed += 1
+        return self.lines.popleft().rstrip("\r")
+
+    async def prefetch(self):
+        """
+        Waits until all input has arrived, reading the stream to its end
+        and keeping all of it in the buffer
+        """
+        while (not self.finished):
+            await self.fill_async()
+
+    def fill(self):
+        raise RuntimeError("Input has not arrived yet. Use 'interpret_async', or await 'prefetch' before running synchronously.")
@@ -1,33 +1,259 @@
 import sys
 import os
+import math
+import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.environment import Environment
+from src.environment import Environment, TrackedEnvironment
+from src.typed_array import TypedArray
+from src.vectorizer import LoopVectorizer
+from src.type_inference import TypeInferrer, SPECIALISED_NODES
+from src.loop_optimizer import LoopInvariantHoister
+from src.parallel import ParallelLoopRunner
+from src.input_source import StreamInputSource, parse_input_value
+from src.error_handler import FuelExhausted
+from src.checkpoint import program_hash
+from src.jit import LoopJit, JIT_THRESHOLD
+from src.stack_machine import StackMachine, WAIT_INPUT
+from src.functions import Function
+from src.control_flow import BREAK, RETURN, BREAK_OUTSIDE_LOOP
+from src.money import Money, MoneyArithmetic
+from src.rope import APPEND_NODES, appendable, append
+from src.modules import MODULES
 from src.utils.bribe_manager import BribeManager
 
+# Operators `MoneyArithmetic` takes over once an amount is involved
+MONEY_OPERATORS = ("me jodo", "se ghatao", "me guna karo", "ka bhag karo", "ka shesh bhag karo")
+
+def binary_operation(operator, left, right):
+    """
+    Applies a comparison or arithmetic operator to two values, the way
+    `Interpreter.evaluate` does
+
+    Args:
+        operator (str): The operator keyword
+        left (Any): Value of the left operand
+        right (Any): Value of the right operand
+
+    Raises:
+        RuntimeError: If division by 0 occurs
+        RuntimeError: Operator type is unknown
+
+    Returns:
+        Any: The result
+    """
+    if (operator == "bada hai"):
+        return left > right
+    elif (operator == "chota hai"):
+        return left < right
+    elif (operator == "barabar hai"):
+        return left == right
+    elif (operator == "alag hai"):
+        return left != right
+    elif (operator == "bada ya barabar hai"):
+        return left >= right
+    elif (operator == "chota ya barabar hai"):
+        return left <= right
+    elif (operator == "me jodo"):
+        if isinstance(left, str) and not isinstance(right, str):
+            right = str(right)
+        elif isinstance(right, str) and not isinstance(left, str):
+            left = str(left)
+        return left + right
+    elif (operator == "se ghatao"):
+        return left - right
+    elif (operator == "me guna karo"):
+        return left * right
+    elif (operator == "ka bhag karo"):
+        if (right == 0):
+            raise RuntimeError("Division by zero.")
+        return left / right
+    elif (operator == "ka shesh bhag karo"):
+        if (right == 0):
+            raise RuntimeError("Division by zero.")
+        return left % right
+    else:
+        raise RuntimeError(f"Unknown operator: {operator}")
+
+def prepare_program(ast):
+    """
+    Runs the analyses done before execution: types are inferred, so type
+    errors that are known statically are reported without running
+    anything, then loop invariant expressions are hoisted out of
+    `ginti karo` bodies.
+
+    Args:
+        ast (list): List of statement from AST
+
+    Raises:
+        TypeError: With every type error found in the program
+
+    Returns:
+        list: The rewritten AST, ready for `Interpreter.run`
+    """
+    money = any(statement["type"] == "MONEY_MODE" for statement in ast)
+    ast = TypeInferrer(money).infer(ast)
+    return LoopInvariantHoister().optimise(ast)
+
 class Interpreter:
-    def __init__(self):
-        self.env = Environment()
-        self.bribeManager = BribeManager()
+    def __init__(self, inputSource=None, fuel=None, bribeFuel=False, ledgerPath=None, checkpointer=None, jitThreshold=JIT_THRESHOLD, output=None, metrics=None, explicitStack=False):
+        """
+        Args:
+            inputSource (InputSource): Where `pucho` reads from, stdin if None
+            fuel (int): Fuel budget for the run, unlimited if None. Every loop
+                        iteration and every block of statements entered burns
+                        one unit per statement in it.
+            bribeFuel (bool): Whether `ghoos lo` also buys fuel, at the rate
+                        of the current parichay
+            ledgerPath (str): SQLite file that keeps the bribe ledger across
+                        runs, nothing is written if None
+            checkpointer (Checkpointer): Takes checkpoints at loop back-edges
+                        so the run can be resumed, none are taken if None
+            jitThreshold (int): Iterations after which a loop is compiled to
+                        a Python function, loops are never compiled if None.
+                        Checkpointed runs always use the tree walker.
+            output (TextIO): Where `ghoshna` prints to, stdout if None
+            metrics (Metrics): Receives the statements, loop iterations,
+                        bribes and execution time of every run, nothing is
+                        counted if None
+            explicitStack (bool): Whether to run on a `StackMachine`, which
+                        handles any depth of nesting without recursing.
+                        Checkpointed runs always use the recursive walker.
+        """
+        self.env = None
+        self.inputSource = inputSource
+        self.fuelBudget = fuel
+        self.bribeFuel = bribeFuel
+        self.ledgerPath = ledgerPath
+        self.output = output
+        self.metrics = metrics
+        # Counted during a run and handed to `metrics` when it ends
+        self.statementCounts = {} if metrics is not None else None
+        self.loopIterations = 0
+        self.vectorizer = LoopVectorizer(self)
+        self.parallelRunner = ParallelLoopRunner(self)
+        self.checkpointer = checkpointer
+        self.program = None
+        self.jit = LoopJit(self, jitThreshold) if (jitThreshold and not checkpointer) else None
+        self.stack = StackMachine(self) if (explicitStack and not checkpointer) else None
+        self.reset()
 
-    def interpret(self, ast):
+    def reset(self):
+        """
+        Brings the interpreter back to the state it had when it was created,
+        so it can run a program again. Files left open by the previous run
+        are closed and the workers of parallel loops stopped. Loops compiled
+        by the JIT are kept.
+        """
+        if (self.env is not None):
+            self.close()
+        self.env = TrackedEnvironment() if self.checkpointer else Environment()
+        # While a function runs, `env` is its frame and `globals` the program's
+        self.globals = self.env
+        self.functions = {}
+        self.callDepth = 0
+        # Value of the last `sarkar gir gayi`, until its call picks it up
+        self.returnValue = None
+        self.fuel = math.inf if self.fuelBudget is None else self.fuelBudget
+        self.bribeManager = BribeManager(self.ledgerPath)
+        # Ledger totals already handed to `metrics`
+        self.bribesReported = {}
+        self.invariantCache = {}
+        # Arithmetic in paise, set by `paise me hisaab karo`
+        self.money = None
+        # Blocks the checkpointer is inside of, outermost first
+        self.frames = []
+
+    def close(self):
+        """
+        Releases what the last run left behind: open files and the worker
+        processes of parallel loops
+        """
+        self.parallelRunner.close()
+        for fileObject in self.globals.files.values():
+            fileObject.close()
+        for reader in self.globals.readers.values():
+            reader.close()
+
+    def interpret(self, ast, checkpoint=None):
         """
         Interprets and execute a list of statement (AST)
 
+        Errors are printed and end the process, see `run` for a version
+        that raises them instead.
+
         Args:
             ast (list): List of statement from AST
+            checkpoint (dict): State returned by `load_checkpoint`, the run
+                        continues from there instead of the beginning
+        """
+        programHash = program_hash(ast)
+        started = time.perf_counter()
+        try:
+            ast = prepare_program(ast)
+        except TypeError as e:
+            print(f"\nType error: {e}", file=self.output)
+            sys.exit(1)
+        if (self.metrics is not None):
+            self.metrics.observe("taiscript_phase_seconds", time.perf_counter() - started, (("phase", "prepare"),))
+
+        try:
+            self.run(ast, programHash, checkpoint)
+        except RuntimeError as e:
+            print(f"\nRuntime exception: {e}", file=self.output)
+            sys.exit(1)
+
+    def run(self, ast, programHash=None, checkpoint=None):
+        """
+        Executes a program prepared by `prepare_program`
+
+        Args:
+            ast (list): The prepared AST
+            programHash (str): Fingerprint of the program before it was
+                        prepared, needed for checkpoints
+            checkpoint (dict): State returned by `load_checkpoint`, the run
+                        continues from there instead of the beginning
 
         Raises:
             RuntimeError: Raises an exception if an error occurs during interpretation
         """
+        self.program = ast
+        if (self.checkpointer):
+            self.checkpointer.attach(self, programHash)
+
+        ledger = self.bribeManager.ledger
+        started = time.perf_counter()
+        finished = False
         try:
-            for statement in ast:
-                self.execute(statement)
+            start = 0
+            if (checkpoint is None):
+                self.charge_fuel(len(ast))
+            else:
+                if (checkpoint["program"] != programHash):
+                    raise RuntimeError("Checkpoint was taken from a different program.")
+                self.restore(checkpoint)
+                index, signal = self.resume_statement(ast, checkpoint["position"])
+                if (signal):
+                    raise RuntimeError(BREAK_OUTSIDE_LOOP)
+                start = index + 1
+                ledger.flush()
 
-        except RuntimeError as e:
-            print(f"\nRuntime exception: {e}")
-            sys.exit(1)
+            execute = self.stack.execute if self.stack else self.execute
+            for statement in ast[start:]:
+                if (execute(statement)):
+                    raise RuntimeError(BREAK_OUTSIDE_LOOP)
+                # The ledger is written at block boundaries, never per statement
+                if (statement["type"] in ("LOOP", "CONDITIONAL")):
+                    ledger.flush()
+
+            if (self.checkpointer):
+                self.checkpointer.finish()
+            finished = True
+        finally:
+            ledger.flush()
+            if (self.metrics is not None):
+                self.metrics.record_run(self, time.perf_counter() - started, ok=int(finished), failed=int(not finished))
 
     def execute(self, statement):
         """
@@ -38,30 +264,46 @@ class Interpreter:
 
         Raises:
             RuntimeError: Raise an error is statement type is not known
+
+        Returns:
+            int: `BREAK` or `RETURN` if the rest of the enclosing blocks has
+                to be skipped, None otherwise
         """
         statementType = statement["type"]
+        if (self.statementCounts is not None):
+            self.statementCounts[statementType] = self.statementCounts.get(statementType, 0) + 1
 
         if (statement["type"] not in ["PARICHAY", "BRIBE", "PROGRAM_START", "PROGRAM_END", "INPUT"]):
             self.bribeManager.validate_bribe(statement)
 
         if (statementType == "PROGRAM_START"):
-            pass
+            # The name is kept as its STRING token
+            self.bribeManager.ledger.program = statement["name"][1]
         elif (statementType == "PROGRAM_END"):
             pass
         elif (statementType == "INPUT"):
-            pass
+            self.execute_input(statement)
         elif (statementType == "VAR_DECL"):
             self.execute_var_decl(statement)
         elif (statementType == "PRINT"):
             self.execute_print(statement)
         elif (statementType == "CONDITIONAL"):
-            self.execute_conditional(statement)
+            return self.execute_conditional(statement)
         elif (statementType == "LOOP"):
-            self.execute_loop(statement)
+            if (statement.get("parallel")):
+                self.parallelRunner.execute(statement)
+            elif (not self.vectorizer.try_execute(statement)):
+                return self.execute_loop(statement)
+        elif (statementType == "FILE_LOOP"):
+            return self.execute_file_loop(statement)
         elif (statementType == "STRUCT_DECL"):
             self.execute_struct_decl(statement)
         elif (statementType == "STRUCT_INSTANCE"):
             self.execute_struct_instance(statement)
+        elif (statementType == "ARRAY_DECL"):
+            self.execute_array_decl(statement)
+        elif (statementType == "ARRAY_APPEND"):
+            self.execute_array_append(statement)
         elif (statementType == "FILE_OPEN"):
             self.execute_file_open(statement)
         elif (statementType == "FILE_CLOSE"):
@@ -70,11 +312,189 @@ class Interpreter:
             self.execute_file_write(statement)
         elif statementType == "PARICHAY":
             self.execute_parichay(statement)
+        elif (statementType == "MONEY_MODE"):
+            self.money = MoneyArithmetic(statement["rounding"])
         elif statementType == "BRIBE":
             self.execute_bribe(statement)
+        elif (statementType == "FUNCTION_DECL"):
+            self.functions[statement["name"]] = Function(statement, self.functions)
+        elif (statementType == "IMPORT"):
+            self.execute_import(statement)
+        elif (statementType == "CALL_STATEMENT"):
+            self.call_function(statement["call"])
+        elif (statementType == "BREAK"):
+            return BREAK
+        elif (statementType == "RETURN"):
+            if (self.callDepth == 0):
+                raise RuntimeError("'sarkar gir gayi' can only be used inside a 'karam'.")
+            self.returnValue = self.evaluate(statement["value"]) if statement["value"] else None
+            return RETURN
         else:
             raise RuntimeError(f"Unknown statement type: {statementType}")
 
+    async def interpret_async(self, ast):
+        """
+        Interprets a program whose input comes from an `AsyncInputSource`.
+        Each `pucho` awaits its line on the event loop, so no thread is held
+        while waiting and the program runs as soon as it starts.
+
+        Errors are raised like in `run`, never printed. The program runs on
+        a `StackMachine`, so loops are not compiled by the JIT and no
+        checkpoints are taken. A `pucho` inside a `karam` called from an
+        expression can not wait, it only reads input that already arrived.
+
+        Args:
+            ast (list): List of statement from AST
+
+        Raises:
+            TypeError: If the program does not type check
+            RuntimeError: Raises an exception if an error occurs during interpretation
+        """
+        started = time.perf_counter()
+        ast = prepare_program(ast)
+        if (self.metrics is not None):
+            self.metrics.observe("taiscript_phase_seconds", time.perf_counter() - started, (("phase", "prepare"),))
+
+        self.program = ast
+        if (self.stack is None):
+            self.stack = StackMachine(self)
+
+        ledger = self.bribeManager.ledger
+        started = time.perf_counter()
+        finished = False
+        try:
+            self.charge_fuel(len(ast))
+            for statement in ast:
+                stack = [statement]
+                signal = self.stack.run(stack, pausable=True)
+                while (signal == WAIT_INPUT):
+                    await self.inputSource.fill_async()
+                    signal = self.stack.run(stack, pausable=True)
+                if (signal):
+                    raise RuntimeError(BREAK_OUTSIDE_LOOP)
+                # The ledger is written at block boundaries, never per statement
+                if (statement["type"] in ("LOOP", "CONDITIONAL")):
+                    ledger.flush()
+            finished = True
+        finally:
+            ledger.flush()
+            if (self.metrics is not None):
+                self.metrics.record_run(self, time.perf_counter() - started, ok=int(finished), failed=int(not finished))
+
+    def charge_fuel(self, cost):
+        """
+        Burns fuel for a block of statements
+
+        Args:
+            cost (int): Fuel units to burn
+
+        Raises:
+            FuelExhausted: If the budget is spent
+        """
+        self.fuel -= cost
+        if (self.fuel < 0):
+            raise FuelExhausted(self.fuelBudget)
+
+    def restore(self, checkpoint):
+        """
+        Brings the interpreter back to the state saved in a checkpoint
+
+        Args:
+            checkpoint (dict): State returned by `load_checkpoint`
+        """
+        self.env.variables = dict(checkpoint["variables"])
+        self.env.structs = dict(checkpoint["structs"])
+        for key, value in checkpoint["bribeManager"].items():
+            setattr(self.bribeManager, key, value)
+        self.bribeManager.ledger.program = checkpoint["ledgerProgram"]
+        self.fuel = checkpoint["fuel"]
+
+        for alias, (fileName, offset) in checkpoint["files"].items():
+            # Anything written after the checkpoint is written again
+            fileObject = open(fileName, "r+")
+            fileObject.seek(offset)
+            fileObject.truncate()
+            self.env.files[alias] = fileObject
+
+        if (checkpoint["inputLines"]):
+            if (self.inputSource is None):
+                self.inputSource = StreamInputSource(sys.stdin)
+            for _ in range(checkpoint["inputLines"]):
+                self.inputSource.read_line()
+
+    def resume_statement(self, statements, position):
+        """
+        Finishes the statement a checkpoint was taken inside of
+
+        Args:
+            statements (list): The block holding the statement
+            position (list): Path from this block down to the loop whose
+                        back-edge took the checkpoint
+
+        Returns:
+            tuple: Index of the finished statement in the block, and the
+                signal it ended with
+        """
+        frame = position[0]
+        statement = statements[frame["index"]]
+        if (statement["type"] == "LOOP"):
+            if (len(position) > 1):
+                # Finish the iteration that was interrupted in a nested block
+                self.frames.append({"statement": statement, "key": "body", "end": frame["end"], "increment": frame["increment"]})
+                signal = self.resume_block(statement["body"], position[1:])
+                self.frames.pop()
+                if (signal):
+                    # The interrupted iteration left the loop
+                    self.bribeManager.loop_dec()
+                    return frame["index"], None
+                var = statement["variable"]
+                self.env.set_variable(var, self.env.get_variable(var) + frame["increment"])
+            signal = self.run_loop(statement, frame["end"], frame["increment"])
+        else:
+            self.frames.append({"statement": statement, "key": frame["key"]})
+            signal = self.resume_block(statement[frame["key"]], position[1:])
+            self.frames.pop()
+        return frame["index"], signal
+
+    def resume_block(self, statements, position):
+        """
+        Finishes a block from a checkpoint position inside it
+
+        Args:
+            statements (list): The block
+            position (list): Path from this block down to the loop whose
+                        back-edge took the checkpoint
+
+        Returns:
+            int: `BREAK` if the block was left early, None otherwise
+        """
+        index, signal = self.resume_statement(statements, position)
+        if (signal):
+            return signal
+        for s in statements[index + 1:]:
+            signal = self.execute(s)
+            if (signal):
+                return signal
+        return None
+
+    def execute_input(self, statement):
+        """
+        Executes a pucho statement, reading the next line of input
+
+        Args:
+            statement (dict): A dictionary representing input statement
+
+        Raises:
+            RuntimeError: If there is no more input
+        """
+        if (self.inputSource is None):
+            self.inputSource = StreamInputSource(sys.stdin)
+
+        line = self.inputSource.read_line()
+        if (line is None):
+            raise RuntimeError(f"No more input for 'pucho {statement['name']}'.")
+        self.env.set_variable(statement["name"], self.money.parse(line) if self.money else parse_input_value(line))
+
     def execute_var_decl(self, statement):
         """
         Execute a variable declaration statement
@@ -83,9 +503,36 @@ class Interpreter:
             statement (dict): A dictionary representing variable declaration
         """
         var = statement["variable"]
-        value = self.evaluate(statement["value"]) if statement["value"] else None
+        value = statement["value"]
+        if (value and value.get("type") in APPEND_NODES and value["operator"] == "me jodo"):
+            appended = self.append_text(value)
+            if (appended is not None):
+                self.env.set_variable(var, appended)
+                return
+        value = self.evaluate(value) if value else None
         self.env.set_variable(var, value)
 
+    def append_text(self, expression):
+        """
+        Evaluates `<variable> me jodo <value>` by appending to the text in
+        the variable as a `Rope`, without copying it
+
+        Args:
+            expression (dict): A `me jodo` expression
+
+        Returns:
+            Rope: The longer text, None if the left operand is not a
+                variable holding enough text, then the expression has to
+                be evaluated as usual
+        """
+        left = expression["left"]
+        if (left["type"] != "IDENTIFIER"):
+            return None
+        current = self.env.peek_variable(left["name"])
+        if (not appendable(current)):
+            return None
+        return append(current, self.evaluate(expression["right"]))
+
     def execute_print(self, statement):
         """
         Executes a print statement
@@ -96,7 +543,19 @@ class Interpreter:
         Raises:
             RuntimeError: File alias is not open
         """
-        value = self.evaluate(statement["value"])
+        self.print_value(statement, self.evaluate(statement["value"]))
+
+    def print_value(self, statement, value):
+        """
+        Prints the evaluated value of a print statement
+
+        Args:
+            statement (dict): A dictionary representing print statement
+            value (Any): Value of its expression
+
+        Raises:
+            RuntimeError: File alias is not open
+        """
         newline = statement.get("newline", True)
 
         if ("file" in statement):
@@ -111,9 +570,9 @@ class Interpreter:
                 raise RuntimeError(f"File alias '{fileAlias}' is not open.")
         else:
             if newline:
-                print(value)
+                print(value, file=self.output)
             else:
-                print(value, end="")
+                print(value, end="", file=self.output)
 
     def execute_conditional(self, statement):
         """
@@ -124,19 +583,32 @@ class Interpreter:
 
         Raises:
             RuntimeError: If the "if" branch is missing when the condition evaluates to True.
+
+        Returns:
+            int: The signal the branch ended with, None if it ran to the end
         """
         condition = self.evaluate(statement["condition"])
         if (condition):
             if ("if" in statement and statement["if"]):
-                for s in statement["if"]:
-                    self.execute(s)
+                branch = "if"
             else:
                 raise RuntimeError("Missing 'if' branch in conditional.")
         elif ("else" in statement and statement["else"]):
-            for s in statement["else"]:
-                self.execute(s)
+            branch = "else"
         else:
-            pass
+            return None
+
+        self.charge_fuel(len(statement[branch]))
+        if (self.checkpointer):
+            self.frames.append({"statement": statement, "key": branch})
+        signal = None
+        for s in statement[branch]:
+            signal = self.execute(s)
+            if (signal):
+                break
+        if (self.checkpointer):
+            self.frames.pop()
+        return signal
 
     def execute_loop(self, statement):
         """
@@ -144,9 +616,16 @@ class Interpreter:
 
         Args:
             statement (dict): A dictionary representing loop statement
+
+        Returns:
+            int: `RETURN` if the body returned from the function, None
+                otherwise
         """
         self.bribeManager.loop_inc()
 
+        for slot in statement.get("invariants", ()):
+            self.invariantCache.pop(slot, None)
+
         var = statement["variable"]
         start = self.evaluate(statement["start"])
         end = self.evaluate(statement["end"])
@@ -158,19 +637,123 @@ class Interpreter:
             raise RuntimeError(f"Loop boundaries and increment must be integers. Got: start={start}, end={end}, increment={increment}")
 
         self.env.set_variable(var, start)
+        return self.run_loop(statement, end, increment)
+
+    def run_loop(self, statement, end, increment):
+        """
+        Runs the iterations of a loop from the current value of its
+        variable, shared by `execute_loop` and resuming from a checkpoint
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            end (int): Last value of the loop variable
+            increment (int): Step of the loop variable
 
+        Returns:
+            int: `RETURN` if the body returned from the function, None
+                otherwise. The loop ends, with its bribe depth left, on
+                `bijli chali gayi` or `sarkar gir gayi` alike.
+        """
+        var = statement["variable"]
+
+        # Compiled loops divide in floats, and count their own iterations
+        jit = self.jit if self.money is None else None
+        if (jit and jit.enter(statement, end, increment)):
+            self.bribeManager.loop_dec()
+            return None
+
+        cost = len(statement["body"]) or 1
+        checkpointer = self.checkpointer
+        if (checkpointer):
+            self.frames.append({"statement": statement, "key": "body", "end": end, "increment": increment})
+        # Iterations left before the JIT compiles this loop
+        countdown = jit.countdown(statement) if jit else -1
+
+        # Counted as each iteration starts, so one left early counts too
+        iterations = 0
+        signal = None
         if (increment > 0):
             while (self.env.get_variable(var) <= end):
+                iterations += 1
+                self.fuel -= cost
+                if (self.fuel < 0):
+                    raise FuelExhausted(self.fuelBudget)
                 for s in statement["body"]:
-                    self.execute(s)
+                    signal = self.execute(s)
+                    if (signal):
+                        break
+                if (signal):
+                    break
                 self.env.set_variable(var, self.env.get_variable(var) + increment)
+                if (checkpointer):
+                    checkpointer.back_edge()
+                countdown -= 1
+                if (countdown == 0 and jit.hot(statement, end, increment)):
+                    break
         else:
             while (self.env.get_variable(var) >= end):
+                iterations += 1
+                self.fuel -= cost
+                if (self.fuel < 0):
+                    raise FuelExhausted(self.fuelBudget)
                 for s in statement["body"]:
-                    self.execute(s)
+                    signal = self.execute(s)
+                    if (signal):
+                        break
+                if (signal):
+                    break
                 self.env.set_variable(var, self.env.get_variable(var) + increment)
+                if (checkpointer):
+                    checkpointer.back_edge()
+                countdown -= 1
+                if (countdown == 0 and jit.hot(statement, end, increment)):
+                    break
+
+        if (jit):
+            jit.leave(statement, countdown)
+        if (checkpointer):
+            self.frames.pop()
+        self.loopIterations += iterations
+        self.bribeManager.loop_dec()
+        return RETURN if signal == RETURN else None
+
+    def execute_file_loop(self, statement):
+        """
+        Runs a loop body once for every line left in a file opened with
+        `file padho`. Lines are converted like the input of `pucho`.
+
+        Args:
+            statement (dict): A dictionary representing file loop statement
+
+        Returns:
+            int: `RETURN` if the body returned from the function, None
+                otherwise
+        """
+        reader = self.env.get_reader(statement["alias"])
+        self.bribeManager.loop_inc()
+
+        var = statement["variable"]
+        cost = len(statement["body"]) or 1
+        lines = 0
+        signal = None
+        line = reader.read_line()
+        while (line is not None):
+            lines += 1
+            self.fuel -= cost
+            if (self.fuel < 0):
+                raise FuelExhausted(self.fuelBudget)
+            self.env.set_variable(var, self.money.parse(line) if self.money else parse_input_value(line))
+            for s in statement["body"]:
+                signal = self.execute(s)
+                if (signal):
+                    break
+            if (signal):
+                break
+            line = reader.read_line()
 
+        self.loopIterations += lines
         self.bribeManager.loop_dec()
+        return RETURN if signal == RETURN else None
 
     def execute_struct_decl(self, statement):
         """
@@ -183,6 +766,31 @@ class Interpreter:
         fields = statement["members"]
         self.env.set_struct(name, fields)
 
+    def execute_import(self, statement):
+        """
+        Declares the dhacha and karam of an imported yojna and of the yojnas
+        it imports
+
+        Args:
+            statement (dict): A dictionary representing import statement
+
+        Raises:
+            RuntimeError: If the yojna can not be loaded
+        """
+        module = statement.get("module")
+        if (module is None):
+            # Not linked by `link_imports`, relative to the current directory
+            try:
+                module = MODULES.load(statement["path"], self.money is not None)
+            except (ImportError, SyntaxError, TypeError) as e:
+                raise RuntimeError(str(e))
+        for imported in module.order:
+            for declaration in imported.declarations:
+                if (declaration["type"] == "STRUCT_DECL"):
+                    self.execute_struct_decl(declaration)
+                else:
+                    self.functions[declaration["name"]] = Function(declaration, self.functions)
+
     def execute_struct_instance(self, statement):
         """
         Execute the creation of the struct instance
@@ -204,6 +812,44 @@ class Interpreter:
         instance = {field: None for field in structFields}
         self.env.set_variable(instanceName, instance)
 
+    def execute_array_decl(self, statement):
+        """
+        Execute an array (suchi) declaration
+
+        Args:
+            statement (dict): A dictionary representing array declaration
+        """
+        self.env.set_variable(statement["variable"], TypedArray(statement["values"]))
+
+    def execute_array_append(self, statement):
+        """
+        Execute a statement appending a value to an array
+
+        Args:
+            statement (dict): A dictionary representing array append
+        """
+        array = self.get_array(statement["variable"])
+        array.append(self.evaluate(statement["value"]))
+        self.env.touch(statement["variable"])
+
+    def get_array(self, name):
+        """
+        Find an array variable in the environment
+
+        Args:
+            name (str): Name of the array
+
+        Raises:
+            RuntimeError: If the variable does not hold an array
+
+        Returns:
+            TypedArray: The array stored in the variable
+        """
+        value = self.env.get_variable(name)
+        if (not isinstance(value, TypedArray)):
+            raise RuntimeError(f"Variable '{name}' is not a suchi.")
+        return value
+
     def execute_file_open(self, statement):
         """
         Executes the file open statement
@@ -218,7 +864,10 @@ class Interpreter:
         fileName = statement["file_name"]
         alias = statement["alias"]
         try:
-            self.env.open_file(alias, fileName)
+            if (statement.get("read")):
+                self.env.open_reader(alias, fileName)
+            else:
+                self.env.open_file(alias, fileName)
         except FileNotFoundError:
             raise RuntimeError(f"File '{fileName}' not found.")
         except RuntimeError as e:
@@ -277,46 +926,24 @@ class Interpreter:
         if (not expression):
             return None
 
+        specialised = SPECIALISED_NODES.get(expression.get("type"))
+        if (specialised is not None):
+            return specialised(self.evaluate(expression["left"]), self.evaluate(expression["right"]))
+
         if ("left" in expression and "operator" in expression and "right" in expression):
             left = self.evaluate(expression["left"])
             right = self.evaluate(expression["right"])
             operator = expression["operator"]
 
-            if (operator == "bada hai"):
-                return left > right
-            elif (operator == "chota hai"):
-                return left < right
-            elif (operator == "barabar hai"):
-                return left == right
-            elif (operator == "alag hai"):
-                return left != right
-            elif (operator == "bada ya barabar hai"):
-                return left >= right
-            elif (operator == "chota ya barabar hai"):
-                return left <= right
-            elif (operator == "me jodo"):
-                if isinstance(left, str) and not isinstance(right, str):
-                    right = str(right)
-                elif isinstance(right, str) and not isinstance(left, str):
-                    left = str(left)
-                return left + right
-            elif (operator == "se ghatao"):
-                return left - right
-            elif (operator == "me guna karo"):
-                return left * right
-            elif (operator == "ka bhag karo"):
-                if (right == 0):
-                    raise RuntimeError("Division by zero.")
-                return left / right
-            elif (operator == "ka shesh bhag karo"):
-                if (right == 0):
-                    raise RuntimeError("Division by zero.")
-                return left % right
-            else:
-                raise RuntimeError(f"Unknown operator: {operator}")
+            return self.operate(operator, left, right)
 
         exprType = expression["type"]
-        if (exprType == "NUMBER"):
+        if (exprType == "INVARIANT"):
+            slot = expression["slot"]
+            if (slot not in self.invariantCache):
+                self.invariantCache[slot] = self.evaluate(expression["value"])
+            return self.invariantCache[slot]
+        elif (exprType == "NUMBER"):
             return expression["value"]
         elif (exprType == "STRING"):
             raw_string = expression["value"]
@@ -330,9 +957,106 @@ class Interpreter:
             return interpolated_string
         elif (exprType == "IDENTIFIER"):
             return self.env.get_variable(expression["name"])
+        elif (exprType == "ARRAY_INDEX"):
+            return self.get_array(expression["name"]).get(self.evaluate(expression["index"]))
+        elif (exprType == "ARRAY_SLICE"):
+            array = self.get_array(expression["name"])
+            return array.slice(self.evaluate(expression["start"]), self.evaluate(expression["end"]))
+        elif (exprType == "ARRAY_AGGREGATE"):
+            return self.get_array(expression["name"]).aggregate(expression["function"])
+        elif (exprType == "CALL"):
+            return self.call_function(expression)
         else:
             raise RuntimeError(f"Unknown expression type: {exprType}")
 
+    def operate(self, operator, left, right):
+        """
+        Applies an operator to two values, in paise once an amount is
+        involved in `paise me hisaab karo` mode
+
+        Args:
+            operator (str): The operator keyword
+            left (Any): Value of the left operand
+            right (Any): Value of the right operand
+
+        Returns:
+            Any: The result
+        """
+        if (self.money is not None and operator in MONEY_OPERATORS
+                and (operator == "ka bhag karo" or type(left) is Money or type(right) is Money)
+                and not isinstance(left, str) and not isinstance(right, str)):
+            return self.money.apply(operator, left, right)
+        return binary_operation(operator, left, right)
+
+    def call_function(self, expression):
+        """
+        Calls a function declared with `karam karo`
+
+        The call runs in a frame taken from the function's pool, which
+        stands in for the environment until the call returns. Results of
+        `yaad rakho` functions are looked up in their cache first.
+
+        Args:
+            expression (dict): A dictionary representing the call
+
+        Raises:
+            RuntimeError: If the function is not declared or gets the wrong
+                        number of arguments
+
+        Returns:
+            Any: The value given to `sarkar gir gayi`, None if there is none
+        """
+        name = expression["name"]
+        function = self.functions.get(name)
+        if (function is None):
+            raise RuntimeError(f"Karam '{name}' is not defined.")
+        args = [self.evaluate(arg) for arg in expression["args"]]
+        if (len(args) != len(function.params)):
+            raise RuntimeError(f"Karam '{name}' takes {len(function.params)} arguments, got {len(args)}.")
+
+        key = None
+        if (function.cache is not None):
+            try:
+                # 2, 2.0 and True are equal keys, their results are not
+                key = tuple((type(arg), arg) for arg in args)
+                if (key in function.cache):
+                    function.hits += 1
+                    function.cache.move_to_end(key)
+                    return function.cache[key]
+            except TypeError:
+                # Arguments like a suchi can not be remembered
+                key = None
+            function.misses += 1
+
+        self.charge_fuel(len(function.body))
+        frame = function.acquire(self.globals, args)
+        caller = self.env
+        self.env = frame
+        self.callDepth += 1
+        try:
+            signal = None
+            if (self.stack):
+                signal = self.stack.run(list(reversed(function.body)))
+            else:
+                for s in function.body:
+                    signal = self.execute(s)
+                    if (signal):
+                        break
+            if (signal == BREAK):
+                raise RuntimeError(BREAK_OUTSIDE_LOOP)
+            result = None
+            if (signal == RETURN):
+                result = self.returnValue
+                self.returnValue = None
+        finally:
+            self.env = caller
+            self.callDepth -= 1
+            function.release(frame)
+
+        if (key is not None):
+            function.remember(key, result)
+        return result
+
     def execute_parichay(self, statement):
         """
         This function evaluates the parichay or profile of the user
@@ -354,6 +1078,8 @@ class Interpreter:
         """
         bribeAmount = statement["amount"][1]
         self.bribeManager.collect_bribe(bribeAmount)
+        if (self.bribeFuel):
+            self.fuel += self.bribeManager.fuel_for_bribe(bribeAmount)
 
 if __name__ == "__main__":
     ast = [
@@ -0,0 +1,449 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import math
+import re
+from src.error_handler import FuelExhausted
+from src.rope import joined
+
+# Iterations, counted over every entry, before a loop is compiled
+JIT_THRESHOLD = 1000
+
+# Compilations of one loop before the JIT gives up on it
+MAX_COMPILES = 3
+
+COMPARISON_OPERATORS = {
+    "bada hai": ">",
+    "chota hai": "<",
+    "barabar hai": "==",
+    "alag hai": "!=",
+    "bada ya barabar hai": ">=",
+    "chota ya barabar hai": "<=",
+}
+NUMERIC_TYPES = (int, float)
+
+PLACEHOLDER_REGEX = re.compile(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}")
+
+class Deoptimise(Exception):
+    """
+    Raised by compiled code on entry when a variable does not have the
+    type the code was compiled for. Nothing has run at that point.
+    """
+    pass
+
+class Unsupported(Exception):
+    """
+    Raised while compiling when a loop uses something the JIT can not
+    translate.
+    """
+    pass
+
+def divide(left, right):
+    if (right == 0):
+        raise RuntimeError("Division by zero.")
+    return left / right
+
+def modulo(left, right):
+    if (right == 0):
+        raise RuntimeError("Division by zero.")
+    return left % right
+
+class LoopCompiler:
+    """
+    Translates a `ginti karo` loop into the source of a Python function.
+
+    The function is compiled for the types the variables have when the loop
+    becomes hot. Variables are loaded into Python locals on entry, after
+    checking their types, and written back to the `Environment` on exit,
+    even when the loop fails. Bribes, fuel, invariant slots and statement
+    counts are handled exactly like the tree walker handles them, and the
+    iterations of the loop and the loops nested in it are counted.
+    """
+    def __init__(self, statement, variables, metered, counted=False):
+        """
+        Args:
+            statement (dict): A dictionary representing loop statement
+            variables (dict): Current values of the variables
+            metered (bool): Whether fuel has to be charged
+            counted (bool): Whether statements and loop iterations are
+                        counted for metrics
+        """
+        self.loopStatement = statement
+        self.variables = variables
+        self.metered = metered
+        self.counted = counted
+        # Statement types counted in locals, added to the metrics on exit
+        self.counters = set()
+        self.types = {}
+        self.assigned = set()
+        self.nodes = []
+        self.lines = []
+
+    def compile(self):
+        """
+        Raises:
+            Unsupported: If the loop can not be compiled
+
+        Returns:
+            str: Source of a function `compiled_loop(interp, env, end, increment)`
+        """
+        statement = self.loopStatement
+        increment = statement["increment"]["value"] if isinstance(statement.get("increment"), dict) else statement.get("increment", 1)
+        var = statement["variable"]
+        self.load(var)
+        if (self.types[var] is not int):
+            raise Unsupported()
+        self.assigned.add(var)
+
+        body = []
+        self.lines = body
+        self.loop_body(statement, "end", "increment", increment, 2)
+
+        local = self.local
+        source = ["def compiled_loop(interp, env, end, increment):",
+                  "    variables = env.variables",
+                  "    manager = interp.bribeManager",
+                  "    cache = interp.invariantCache",
+                  "    out = interp.output"]
+        if (self.counted):
+            source.append("    iterations = 0")
+        for statementType in sorted(self.counters):
+            source.append(f"    count_{statementType} = 0")
+        source.append("    try:")
+        for name in self.types:
+            if (self.types[name] is str):
+                # Text built with `me jodo` may still be a rope
+                source.append(f"        {local(name)} = joined(variables[{name!r}])")
+            else:
+                source.append(f"        {local(name)} = variables[{name!r}]")
+        source += ["    except KeyError:",
+                   "        raise Deoptimise()"]
+        guards = " or ".join(f"type({local(name)}) is not {self.types[name].__name__}" for name in self.types)
+        source += [f"    if ({guards}):",
+                   "        raise Deoptimise()",
+                   "    try:"]
+        source += body
+        source.append("    finally:")
+        for name in sorted(self.assigned):
+            source.append(f"        env.set_variable({name!r}, {local(name)})")
+        if (self.counted):
+            source.append("        interp.loopIterations += iterations")
+        if (self.counters):
+            source.append("        counts = interp.statementCounts")
+        for statementType in sorted(self.counters):
+            source.append(f"        counts[{statementType!r}] = counts.get({statementType!r}, 0) + count_{statementType}")
+        return "\n".join(source) + "\n"
+
+    def local(self, name):
+        return f"v_{name}"
+
+    def load(self, name):
+        """
+        Adds a variable to the ones loaded on entry, typed by its value now
+
+        Raises:
+            Unsupported: If the variable is not set yet or has a type the
+                        JIT does not handle
+        """
+        if (name in self.types):
+            return
+        if (name not in self.variables):
+            raise Unsupported()
+        valueType = type(joined(self.variables[name]))
+        if (valueType not in (int, float, str, bool)):
+            raise Unsupported()
+        self.types[name] = valueType
+
+    def node(self, value):
+        """
+        Returns:
+            str: Code referring to an AST node from the compiled function
+        """
+        self.nodes.append(value)
+        return f"NODES[{len(self.nodes) - 1}]"
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def charge(self, indent, cost):
+        if (self.metered):
+            self.emit(indent, f"interp.fuel -= {cost}")
+            self.emit(indent, "if (interp.fuel < 0):")
+            self.emit(indent + 1, "raise FuelExhausted(interp.fuelBudget)")
+
+    def loop_body(self, statement, end, increment, step, indent):
+        var = self.local(statement["variable"])
+        comparison = "<=" if step > 0 else ">="
+        self.emit(indent, f"while ({var} {comparison} {end}):")
+        if (self.counted):
+            self.emit(indent + 1, "iterations += 1")
+        self.charge(indent + 1, len(statement["body"]) or 1)
+        self.block(statement["body"], indent + 1)
+        self.emit(indent + 1, f"{var} = {var} + {increment}")
+
+    def block(self, statements, indent):
+        for statement in statements:
+            self.statement(statement, indent)
+
+    def statement(self, statement, indent):
+        statementType = statement["type"]
+        if (self.counted):
+            self.counters.add(statementType)
+            self.emit(indent, f"count_{statementType} += 1")
+
+        if (statementType == "VAR_DECL"):
+            if (not statement["value"]):
+                raise Unsupported()
+            code, valueType = self.expression(statement["value"])
+            name = statement["variable"]
+            self.load(name)
+            if (self.types[name] is not valueType):
+                # The variable would change type between iterations
+                raise Unsupported()
+            self.assigned.add(name)
+            self.emit(indent, f"{self.local(name)} = {code}")
+        elif (statementType == "PRINT"):
+            if ("file" in statement):
+                raise Unsupported()
+            code, _ = self.expression(statement["value"])
+            if (statement.get("newline", True)):
+                self.emit(indent, f"print({code}, file=out)")
+            else:
+                self.emit(indent, f"print({code}, end=\"\", file=out)")
+        elif (statementType == "CONDITIONAL"):
+            code, _ = self.expression(statement["condition"])
+            self.emit(indent, f"if ({code}):")
+            if (statement.get("if")):
+                self.charge(indent + 1, len(statement["if"]))
+                self.block(statement["if"], indent + 1)
+            else:
+                self.emit(indent + 1, "raise RuntimeError(\"Missing 'if' branch in conditional.\")")
+            if (statement.get("else")):
+                self.emit(indent, "else:")
+                self.charge(indent + 1, len(statement["else"]))
+                self.block(statement["else"], indent + 1)
+        elif (statementType == "LOOP" and not statement.get("parallel")):
+            self.loop(statement, indent)
+        elif (statementType == "BREAK"):
+            # Every statement is emitted inside the `while` of its
+            # innermost loop, whose `loop_dec` follows it
+            self.emit(indent, "break")
+        else:
+            raise Unsupported()
+
+    def loop(self, statement, indent):
+        """
+        Emits a nested loop, with the bribe checks `Interpreter.execute` does
+        """
+        name = statement["variable"]
+        self.load(name)
+        if (self.types[name] is not int):
+            raise Unsupported()
+        self.assigned.add(name)
+
+        label = len(self.nodes)
+        self.emit(indent, f"manager.validate_bribe({self.node(statement)})")
+        self.emit(indent, "manager.loop_inc()")
+        for slot in statement.get("invariants", ()):
+            self.emit(indent, f"cache.pop({slot}, None)")
+
+        start, startType = self.expression(statement["start"])
+        end, endType = self.expression(statement["end"])
+        step = statement["increment"]["value"] if isinstance(statement.get("increment"), dict) else statement.get("increment", 1)
+        if (startType is not int or endType is not int or not isinstance(step, int) or isinstance(step, bool) or step == 0):
+            raise Unsupported()
+
+        self.emit(indent, f"end_{label} = {end}")
+        self.emit(indent, f"{self.local(name)} = {start}")
+        self.loop_body(statement, f"end_{label}", step, step, indent)
+        self.emit(indent, "manager.loop_dec()")
+
+    def expression(self, expression):
+        """
+        Raises:
+            Unsupported: If the expression can not be compiled
+
+        Returns:
+            tuple: Python code and the type of its value
+        """
+        if (not expression):
+            raise Unsupported()
+
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            left, leftType = self.expression(expression["left"])
+            right, rightType = self.expression(expression["right"])
+            return self.binary(expression["operator"], left, leftType, right, rightType)
+
+        exprType = expression["type"]
+        if (exprType == "NUMBER"):
+            value = expression["value"]
+            return repr(value), type(value)
+        elif (exprType == "STRING"):
+            value = expression["value"]
+            names = PLACEHOLDER_REGEX.findall(value)
+            if (not names):
+                return repr(value), str
+            parts = []
+            for index, piece in enumerate(PLACEHOLDER_REGEX.split(value)):
+                if (index % 2):
+                    self.load(piece)
+                    parts.append(f"str({self.local(piece)})")
+                elif (piece):
+                    parts.append(repr(piece))
+            return "(" + " + ".join(parts) + ")", str
+        elif (exprType == "IDENTIFIER"):
+            self.load(expression["name"])
+            return self.local(expression["name"]), self.types[expression["name"]]
+        elif (exprType == "INVARIANT"):
+            # Computed from the locals, the variables in `env` are only
+            # written back when the compiled loop ends
+            code, valueType = self.expression(expression["value"])
+            slot = expression["slot"]
+            return f"(cache[{slot}] if {slot} in cache else cache.setdefault({slot}, {code}))", valueType
+        raise Unsupported()
+
+    def binary(self, operator, left, leftType, right, rightType):
+        numeric = leftType in NUMERIC_TYPES and rightType in NUMERIC_TYPES
+        numericType = int if (leftType is int and rightType is int) else float
+
+        if (operator in COMPARISON_OPERATORS):
+            if (operator not in ("barabar hai", "alag hai") and not numeric and not (leftType is str and rightType is str)):
+                raise Unsupported()
+            return f"({left} {COMPARISON_OPERATORS[operator]} {right})", bool
+        elif (operator == "me jodo"):
+            if (numeric):
+                return f"({left} + {right})", numericType
+            if (leftType is str and rightType is str):
+                return f"({left} + {right})", str
+            if (leftType is str and rightType is not bool):
+                return f"({left} + str({right}))", str
+            if (rightType is str and leftType is not bool):
+                return f"(str({left}) + {right})", str
+        elif (operator == "se ghatao" and numeric):
+            return f"({left} - {right})", numericType
+        elif (operator == "me guna karo" and numeric):
+            return f"({left} * {right})", numericType
+        elif (operator == "ka bhag karo" and numeric):
+            return f"divide({left}, {right})", float
+        elif (operator == "ka shesh bhag karo" and numeric):
+            return f"modulo({left}, {right})", numericType
+        raise Unsupported()
+
+class LoopJit:
+    """
+    Counts the iterations of every `ginti karo` loop and compiles the loops
+    that get hot into Python functions.
+
+    A loop is compiled once it has run `threshold` iterations, counted over
+    all its entries, and the interpreter switches to the compiled function
+    in the middle of the loop. Later entries run the compiled function
+    directly. If a variable no longer has the type the function was
+    compiled for, the function deoptimises before doing anything and the
+    loop runs on the tree walker again, to be compiled afresh for the new
+    types once it is hot again. Loops using statements the JIT can not
+    translate (input, files, arrays, structs, bribes, parallel loops) always
+    run on the tree walker.
+    """
+    def __init__(self, interpreter, threshold=JIT_THRESHOLD):
+        self.interpreter = interpreter
+        self.threshold = threshold
+        self.remaining = {}
+        self.compiled = {}
+        self.compiles = {}
+        self.rejected = set()
+        self.deoptimisations = 0
+
+    def countdown(self, statement):
+        """
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Returns:
+            int: Iterations left before the loop is compiled, -1 if it will
+                not be compiled
+        """
+        key = id(statement)
+        if (key in self.rejected):
+            return -1
+        return self.remaining.get(key, self.threshold)
+
+    def leave(self, statement, countdown):
+        """
+        Remembers how close a loop got to being compiled
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            countdown (int): Value of the countdown when the loop ended
+        """
+        if (countdown > 0):
+            self.remaining[id(statement)] = countdown
+
+    def enter(self, statement, end, increment):
+        """
+        Runs a loop with its compiled function, if it has one
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            end (int): Last value of the loop variable
+            increment (int): Step of the loop variable
+
+        Returns:
+            bool: True if the loop ran, False if the tree walker has to run it
+        """
+        entry = self.compiled.get(id(statement))
+        if (entry is None):
+            return False
+        function = entry[1]
+        try:
+            function(self.interpreter, self.interpreter.env, end, increment)
+        except Deoptimise:
+            self.deoptimise(statement)
+            return False
+        return True
+
+    def hot(self, statement, end, increment):
+        """
+        Compiles a loop that just got hot and runs its remaining iterations
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            end (int): Last value of the loop variable
+            increment (int): Step of the loop variable
+
+        Returns:
+            bool: True if the compiled function finished the loop
+        """
+        key = id(statement)
+        self.remaining.pop(key, None)
+        self.compiles[key] = self.compiles.get(key, 0) + 1
+        if (self.compiles[key] > MAX_COMPILES):
+            self.rejected.add(key)
+            return False
+
+        try:
+            compiler = LoopCompiler(statement, self.interpreter.env.variables, not math.isinf(self.interpreter.fuel),
+                                    self.interpreter.statementCounts is not None)
+            source = compiler.compile()
+        except Unsupported:
+            self.rejected.add(key)
+            return False
+
+        namespace = {"NODES": compiler.nodes, "Deoptimise": Deoptimise, "FuelExhausted": FuelExhausted,
+                     "divide": divide, "modulo": modulo, "joined": joined}
+        exec(compile(source, f"<ginti karo {statement['variable']}>", "exec"), namespace)
+        # The statement is kept so its id is not reused while compiled
+        self.compiled[key] = (statement, namespace["compiled_loop"])
+        return self.enter(statement, end, increment)
+
+    def deoptimise(self, statement):
+        """
+        Drops the compiled function of a loop, it is compiled again once the
+        loop gets hot with the new types
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+        """
+        del self.compiled[id(statement)]
+        self.deoptimisations += 1
@@ -3,11 +3,13 @@ import re
 TOKEN_SPECIFICATION = [
     ('YOJNA_START', r'yojna shuru'),            # Start of the program
     ('YOJNA_END', r'yojna band'),               # End of the program
+    ('IMPORT', r'yojna lao'),                   # Import another program's dhacha and karam
     ('NUMBER', r'\d+'),                         # Integer Numbers
     ('STRING', r'".*?"'),                       # Strings inside double quotes
     ('INPUT', r'pucho'),                        # User Input Operation
     ('VAR_DECL', r'likho'),                     # Variable Declaration
     ('PARICHAY', r'parichay'),                  # Parichay statement at top of the code
+    ('MONEY_MODE', r'paise me hisaab karo'),    # Count in rupees and paise
     ('BRIBE', r'ghoos lo'),                     # Bribe Statement
     ('PRINT', r'ghoshna'),                      # Print Statement
     ('NO_NEWLINE', r'lagatar'),                 # Modifier for no newline
@@ -16,14 +18,23 @@ TOKEN_SPECIFICATION = [
     ('DECREMENT', r'ghatao'),                   # Decrement Operator
     ('COMPARISON', r'barabar hai|alag hai|bada hai|chota hai|bada ya barabar hai|chota ya barabar hai'),    # Comparison Operator
     ('CONDITIONAL', r'agar|warna'),             # Conditional Statements
+    ('PARALLEL_LOOP_START', r'milkar ginti karo'),  # Parallel Loop Start
     ('LOOP_START', r'ginti karo'),              # Loop Start
     ('LOOP_END', r'ginti band'),                # Loop End
     ('FILE_OPEN', r'file kholo'),               # File Operations
+    ('FILE_READ', r'file padho'),               # Open a file for reading
+    ('FILE_LINES', r'ki har line\b'),           # Lines of a file read by a loop
     ('FILE_CLOSE', r'band karo'),               # File Operations
     ('FILE_WRITE', r'me likho'),                # File Write Operation
+    ('ARRAY_APPEND', r'me dalo'),               # Append a value to an array
     ('FILE_DECL', r'aur naam do'),              # File Instance Creation
     ('STRUCT_DECL', r'dhacha banao'),           # Structure declaration
     ('STRUCT_INSTANCE', r'aur usko banao'),     # Structure Instance Creation
+    ('ARRAY_DECL', r'suchi banao'),             # Array declaration
+    ('MEMOIZE', r'yaad rakho'),                 # Remember results of a function
+    ('FUNCTION_DECL', r'karam karo'),           # Function declaration
+    ('FUNCTION_END', r'karam band'),            # Function end
+    ('FUNCTION_CALL', r'bulao\b'),              # Function call
     ('STRUCT_ACCESS', r'ka'),                   # Access structure properties
     ('BREAK', r'bijli chali gayi'),             # Break statement
     ('RETURN', r'sarkar gir gayi'),             # Return statement
@@ -57,6 +68,8 @@ def lexer(code):
     """
     tokens = []
     structTypes = set()
+    # Structs may also come from a yojna imported with `yojna lao`
+    imports = False
     tokenIter = re.finditer(tokenRegex, code)
     tokenList = list(tokenIter)
     i = 0
@@ -73,6 +86,8 @@ def lexer(code):
             continue
         elif (kind == 'MISMATCH'):
             raise SyntaxError(f'Unexpected character: {value}')
+        elif (kind == 'IMPORT'):
+            imports = True
 
         if (kind == 'STRUCT_DECL' and (i+1) < len(tokenList)):
             nextIndex = i + 1
@@ -94,7 +109,7 @@ def lexer(code):
                 nextIndex += 1
             if nextIndex < len(tokenList) and tokenList[nextIndex].lastgroup == 'IDENTIFIER':
                 structName = tokenList[nextIndex].group('IDENTIFIER')
-                if structName in structTypes:
+                if structName in structTypes or imports:
                     tokens.append((kind, value))
                     tokens.append(('STRUCT_TYPE', structName))
                     i = nextIndex + 1
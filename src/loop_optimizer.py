@@ -0,0 +1,287 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+from src.utils.helper import expression_calls, trampoline
+
+PLACEHOLDER_REGEX = re.compile(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}")
+
+# In the variant names of a loop that appends to a suchi. Suchis are shared
+# by reference, so the one appended to may be read under another name.
+ANY_SUCHI = "*suchi"
+
+class LoopInvariantHoister:
+    """
+    Hoists expressions that do not change inside a `ginti karo` body.
+
+    An expression is invariant when it does not use the loop variable or any
+    variable assigned anywhere in the body. Suchi reads are never invariant
+    in a body that appends to any suchi. Each invariant
+    expression is wrapped in an INVARIANT node owned by the outermost loop it
+    is invariant in. The interpreter evaluates such a node the first time it
+    is reached after the loop starts and reuses the value for the rest of the
+    loop. Evaluating on first use instead of in front of the loop keeps errors
+    (undefined variables, division by zero) in the same order relative to
+    `ghoshna`, file writes and bribes as before, and skips the work entirely
+    when the loop does not run.
+
+    Rewrites are generators run by `trampoline` and the checks walk their
+    own list of pending nodes, so nesting thousands of levels deep does not
+    recurse.
+    """
+    def __init__(self, firstSlot=0):
+        """
+        Args:
+            firstSlot (int): Number of the first INVARIANT slot, programs
+                        whose loops share an interpreter need slots that do
+                        not overlap
+        """
+        self.nextSlot = firstSlot
+
+    def optimise(self, ast):
+        """
+        Args:
+            ast (list): List of statement from AST
+
+        Returns:
+            list: A copy of the AST with invariant expressions hoisted
+        """
+        return trampoline(self.block(ast))
+
+    def block(self, statements):
+        """
+        Args:
+            statements (list): List of statements
+
+        Returns:
+            generator: The statements with the invariants of their loops hoisted
+        """
+        result = []
+        for s in statements:
+            result.append((yield self.statement(s)))
+        return result
+
+    def statement(self, statement):
+        """
+        Looks for loops inside a statement and hoists their invariants
+
+        Args:
+            statement (dict): A dictionary representing the statement
+
+        Returns:
+            generator: The rewritten statement
+        """
+        if (statement["type"] == "LOOP"):
+            return (yield self.loop(statement))
+        elif (statement["type"] == "CONDITIONAL"):
+            return dict(statement, **{
+                "if": (yield self.block(statement["if"])) if statement.get("if") else statement.get("if"),
+                "else": (yield self.block(statement["else"])) if statement.get("else") else statement.get("else"),
+            })
+        elif (statement["type"] in ("FUNCTION_DECL", "FILE_LOOP")):
+            return dict(statement, body=(yield self.block(statement["body"])))
+        return statement
+
+    def loop(self, statement):
+        """
+        Hoists the invariants of a loop, then of the loops nested inside it
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Returns:
+            generator: The rewritten loop with the slots it owns in "invariants"
+        """
+        slots = []
+        if (self.calls(statement["body"])):
+            # A called karam may change any global, nothing is invariant
+            body = statement["body"]
+        else:
+            variant = {statement["variable"]} | self.assigned(statement["body"])
+            if (self.appends(statement["body"])):
+                variant.add(ANY_SUCHI)
+            body = []
+            for s in statement["body"]:
+                body.append((yield self.rewrite_statement(s, variant, slots)))
+        body = yield self.block(body)
+        return dict(statement, body=body, invariants=slots)
+
+    def assigned(self, statements):
+        """
+        Collects every variable that statements assign or modify
+
+        Args:
+            statements (list): List of statements
+
+        Returns:
+            set: Names of the variables
+        """
+        names = set()
+        pending = list(statements or [])
+        while (pending):
+            s = pending.pop()
+            statementType = s["type"]
+            if (statementType in ("VAR_DECL", "ARRAY_DECL", "ARRAY_APPEND")):
+                names.add(s["variable"])
+            elif (statementType == "INPUT"):
+                names.add(s["name"])
+            elif (statementType == "STRUCT_INSTANCE"):
+                names.add(s["instance_name"])
+            elif (statementType in ("LOOP", "FILE_LOOP")):
+                names.add(s["variable"])
+                pending += s["body"]
+            elif (statementType == "CONDITIONAL"):
+                pending += s.get("if") or []
+                pending += s.get("else") or []
+        return names
+
+    def appends(self, statements):
+        """
+        Args:
+            statements (list): List of statements
+
+        Returns:
+            bool: Whether the statements append to a suchi
+        """
+        pending = list(statements or [])
+        while (pending):
+            s = pending.pop()
+            if (s["type"] == "ARRAY_APPEND"):
+                return True
+            for key in ("body", "if", "else"):
+                pending += s.get(key) or []
+        return False
+
+    def calls(self, statements):
+        """
+        Args:
+            statements (list): List of statements
+
+        Returns:
+            bool: Whether the statements call a function
+        """
+        pending = list(statements or [])
+        while (pending):
+            s = pending.pop()
+            if (s["type"] == "CALL_STATEMENT"):
+                return True
+            for key in ("value", "condition", "start", "end"):
+                if (isinstance(s.get(key), dict) and expression_calls(s[key])):
+                    return True
+            for key in ("body", "if", "else"):
+                pending += s.get(key) or []
+        return False
+
+    def rewrite_statement(self, statement, variant, slots):
+        """
+        Replaces invariant expressions in a statement, including the
+        statements nested inside it
+
+        Args:
+            statement (dict): A dictionary representing the statement
+            variant (set): Names of the variables that change in the loop
+            slots (list): Slots owned by the loop, new slots are added here
+
+        Returns:
+            generator: The rewritten statement
+        """
+        statementType = statement["type"]
+        if (statementType in ("VAR_DECL", "PRINT", "FILE_WRITE", "ARRAY_APPEND")):
+            return dict(statement, value=(yield self.rewrite(statement["value"], variant, slots)))
+        elif (statementType == "CONDITIONAL"):
+            return dict(statement, **{
+                "condition": (yield self.rewrite(statement["condition"], variant, slots)),
+                "if": (yield self.rewrite_block(statement["if"], variant, slots)) if statement.get("if") else statement.get("if"),
+                "else": (yield self.rewrite_block(statement["else"], variant, slots)) if statement.get("else") else statement.get("else"),
+            })
+        elif (statementType in ("LOOP", "FILE_LOOP")):
+            return dict(statement, body=(yield self.rewrite_block(statement["body"], variant, slots)))
+        return statement
+
+    def rewrite_block(self, statements, variant, slots):
+        """
+        Args:
+            statements (list): List of statements
+            variant (set): Names of the variables that change in the loop
+            slots (list): Slots owned by the loop, new slots are added here
+
+        Returns:
+            generator: The statements with invariant expressions replaced
+        """
+        result = []
+        for s in statements:
+            result.append((yield self.rewrite_statement(s, variant, slots)))
+        return result
+
+    def rewrite(self, expression, variant, slots):
+        """
+        Wraps the largest invariant parts of an expression in INVARIANT nodes
+
+        Args:
+            expression (dict): A dictionary representing the expression
+            variant (set): Names of the variables that change in the loop
+            slots (list): Slots owned by the loop, new slots are added here
+
+        Returns:
+            generator: The rewritten expression
+        """
+        if (not expression or expression.get("type") == "INVARIANT"):
+            return expression
+
+        isBinary = "left" in expression and "operator" in expression and "right" in expression
+        worthHoisting = isBinary or expression.get("type") in ("STRING", "ARRAY_AGGREGATE")
+        if (worthHoisting and self.is_invariant(expression, variant)):
+            slot = self.nextSlot
+            self.nextSlot += 1
+            slots.append(slot)
+            return {"type": "INVARIANT", "slot": slot, "value": expression}
+
+        if (isBinary):
+            return dict(expression,
+                        left=(yield self.rewrite(expression["left"], variant, slots)),
+                        right=(yield self.rewrite(expression["right"], variant, slots)))
+        return expression
+
+    def is_invariant(self, expression, variant):
+        """
+        Args:
+            expression (dict): A dictionary representing the expression
+            variant (set): Names of the variables that change in the loop
+
+        Returns:
+            bool: Whether the expression gives the same value on every iteration
+        """
+        pending = [expression]
+        while (pending):
+            expression = pending.pop()
+            if (not expression):
+                continue
+            if ("left" in expression and "operator" in expression and "right" in expression):
+                pending += [expression["left"], expression["right"]]
+                continue
+
+            exprType = expression["type"]
+            if (exprType == "NUMBER"):
+                continue
+            elif (exprType == "STRING"):
+                if (any(name in variant for name in PLACEHOLDER_REGEX.findall(expression["value"]))):
+                    return False
+            elif (exprType == "IDENTIFIER"):
+                if (expression["name"] in variant):
+                    return False
+            elif (exprType == "INVARIANT"):
+                pending.append(expression["value"])
+            elif (exprType == "ARRAY_AGGREGATE"):
+                if (expression["name"] in variant or ANY_SUCHI in variant):
+                    return False
+            elif (exprType == "ARRAY_INDEX"):
+                if (expression["name"] in variant or ANY_SUCHI in variant):
+                    return False
+                pending.append(expression["index"])
+            else:
+                # Slices create a new suchi that the loop may modify, anything
+                # else is not known to be free of side effects.
+                return False
+        return True
@@ -0,0 +1,319 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds, in seconds, of the buckets phase timings are counted in
+PHASE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+COUNTERS = {
+    "taiscript_tokens_total": "Tokens produced by the lexer.",
+    "taiscript_ast_nodes_total": "Nodes in the parsed programs.",
+    "taiscript_runs_total": "Program runs, by how they ended.",
+    "taiscript_statements_total": "Statements executed, by type.",
+    "taiscript_loop_iterations_total": "Iterations of ginti karo and file padho loops.",
+    "taiscript_bribe_collections_total": "Bribes collected with ghoos lo, by parichay.",
+    "taiscript_bribe_collected_total": "Amount of bribe collected, by parichay.",
+    "taiscript_bribe_deductions_total": "Bribes deducted for loops, by parichay.",
+    "taiscript_bribe_deducted_total": "Amount of bribe deducted, by parichay.",
+}
+
+# Ledger totals and the counters they are reported in
+BRIBE_COUNTERS = (
+    ("collections", "taiscript_bribe_collections_total"),
+    ("collected", "taiscript_bribe_collected_total"),
+    ("deductions", "taiscript_bribe_deductions_total"),
+    ("deducted", "taiscript_bribe_deducted_total"),
+)
+
+# Series updated after every run, keyed once
+RUNS_OK = ("taiscript_runs_total", (("status", "ok"),))
+RUNS_FAILED = ("taiscript_runs_total", (("status", "failed"),))
+LOOP_ITERATIONS = ("taiscript_loop_iterations_total", ())
+EXECUTE_SECONDS = ("taiscript_phase_seconds", (("phase", "execute"),))
+
+HISTOGRAMS = {
+    "taiscript_phase_seconds": "Time spent in each phase: lex, parse, prepare and execute.",
+}
+
+def count_nodes(statements):
+    """
+    Counts the statement and expression nodes of a program
+
+    Args:
+        statements (list): The parsed program
+
+    Returns:
+        int: Number of nodes
+    """
+    count = 0
+    pending = list(statements or [])
+    while (pending):
+        node = pending.pop()
+        if (isinstance(node, dict)):
+            if ("type" in node):
+                count += 1
+            pending.extend(node.values())
+        elif (isinstance(node, list)):
+            pending.extend(node)
+    return count
+
+def format_value(value):
+    """
+    Args:
+        value (int | float | Money): A counter value or sum
+
+    Returns:
+        str: The value as Prometheus writes numbers
+    """
+    if (isinstance(value, float)):
+        if (value != value):
+            return "NaN"
+        if (value in (float("inf"), float("-inf"))):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+def format_labels(labels):
+    """
+    Args:
+        labels (tuple): (name, value) pairs
+
+    Returns:
+        str: The labels between braces, empty if there are none
+    """
+    if (not labels):
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Metrics:
+    """
+    Counters and histograms describing the programs a process runs, in the
+    Prometheus text format.
+
+    The interpreter counts statements and loop iterations in plain
+    dictionaries and integers while a program runs, and the bribe ledger
+    already keeps totals per parichay. They are added here once per run
+    by `record_run`, so nothing is written per statement. The metrics are
+    written to a file for the textfile collector of the node exporter with
+    `write`, or served over HTTP on a local port with `serve`.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        # Statements executed by type, rendered as taiscript_statements_total
+        self.statements = {}
+
+    def add(self, name, amount, labels=()):
+        """
+        Args:
+            name (str): Name of the counter, one of `COUNTERS`
+            amount (int | float): Added to the counter
+            labels (tuple): (name, value) pairs of the series
+        """
+        with self.lock:
+            self._add((name, labels), amount)
+
+    def _add(self, key, amount):
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, labels=()):
+        """
+        Args:
+            name (str): Name of the histogram, one of `HISTOGRAMS`
+            seconds (float): The observed duration
+            labels (tuple): (name, value) pairs of the series
+        """
+        with self.lock:
+            self._observe((name, labels), seconds)
+
+    def _observe(self, key, seconds):
+        # Each observation is counted in its own bucket only, the last one
+        # past every bound, and the buckets are summed up when rendered
+        histogram = self.histograms.get(key)
+        if (histogram is None):
+            histogram = self.histograms[key] = [[0] * (len(PHASE_BUCKETS) + 1), 0.0]
+        histogram[0][bisect_left(PHASE_BUCKETS, seconds)] += 1
+        histogram[1] += seconds
+
+    def record_compile(self, tokenCount, ast, lexSeconds, parseSeconds):
+        """
+        Records the lexing and parsing of a program
+
+        Args:
+            tokenCount (int): Tokens produced by the lexer
+            ast (list): The parsed program
+            lexSeconds (float): Time spent lexing
+            parseSeconds (float): Time spent parsing
+        """
+        self.add("taiscript_tokens_total", tokenCount)
+        self.add("taiscript_ast_nodes_total", count_nodes(ast))
+        self.observe("taiscript_phase_seconds", lexSeconds, (("phase", "lex"),))
+        self.observe("taiscript_phase_seconds", parseSeconds, (("phase", "parse"),))
+
+    def record_run(self, interpreter, seconds, ok=1, failed=0, records=1):
+        """
+        Adds what an interpreter counted since its last report
+
+        Args:
+            interpreter (Interpreter): The interpreter that ran
+            seconds (float): Time spent executing
+            ok (int): Runs that ended normally
+            failed (int): Runs that ended with an error
+            records (int): Runs the bribes in the ledger stand for. A
+                        `ColumnarProgram` runs many records at once and
+                        their bribes, the same for every record, once.
+        """
+        counts = interpreter.statementCounts
+        totals = interpreter.bribeManager.ledger.totals
+        with self.lock:
+            statements = self.statements
+            for statementType, count in counts.items():
+                statements[statementType] = statements.get(statementType, 0) + count
+            counts.clear()
+            if (interpreter.loopIterations):
+                self._add(LOOP_ITERATIONS, interpreter.loopIterations)
+                interpreter.loopIterations = 0
+
+            # The ledger keeps totals since the interpreter was reset, only
+            # what changed since the last report is added
+            reported = interpreter.bribesReported
+            for parichay, current in totals.items():
+                labels = (("parichay", parichay or "NONE"),)
+                before = reported.get(parichay, {})
+                for key, name in BRIBE_COUNTERS:
+                    if (current[key] != before.get(key, 0)):
+                        self._add((name, labels), (current[key] - before.get(key, 0)) * records)
+                reported[parichay] = dict(current)
+
+            if (ok):
+                self._add(RUNS_OK, ok)
+            if (failed):
+                self._add(RUNS_FAILED, failed)
+            self._observe(EXECUTE_SECONDS, seconds)
+
+    def drain(self):
+        """
+        Takes the metrics collected so far, leaving this object empty, so a
+        worker process can hand them to its parent
+
+        Returns:
+            tuple: Counters and histograms, for `merge`
+        """
+        with self.lock:
+            state = (self.counters, self.histograms, self.statements)
+            self.counters = {}
+            self.histograms = {}
+            self.statements = {}
+        return state
+
+    def merge(self, state):
+        """
+        Args:
+            state (tuple): Metrics returned by `drain`
+        """
+        counters, histograms, statements = state
+        with self.lock:
+            for statementType, count in statements.items():
+                self.statements[statementType] = self.statements.get(statementType, 0) + count
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (buckets, total) in histograms.items():
+                histogram = self.histograms.get(key)
+                if (histogram is None):
+                    histogram = self.histograms[key] = [[0] * (len(PHASE_BUCKETS) + 1), 0.0]
+                histogram[0] = [mine + theirs for mine, theirs in zip(histogram[0], buckets)]
+                histogram[1] += total
+
+    def render(self):
+        """
+        Returns:
+            str: Every metric in the Prometheus text exposition format
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            for statementType, count in self.statements.items():
+                counters[("taiscript_statements_total", (("type", statementType),))] = count
+            histograms = {key: (list(buckets), total) for key, (buckets, total) in self.histograms.items()}
+
+        lines = []
+        for name, help in COUNTERS.items():
+            series = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+            if (not series):
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in series:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        for name, help in HISTOGRAMS.items():
+            series = sorted((labels, histogram) for (metric, labels), histogram in histograms.items() if metric == name)
+            if (not series):
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, (buckets, total) in series:
+                count = 0
+                for bound, bucketCount in zip(PHASE_BUCKETS, buckets):
+                    count += bucketCount
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(float(bound))),))} {count}")
+                count += buckets[-1]
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path):
+        """
+        Writes the metrics for the textfile collector. The file is written
+        aside and renamed, so the collector never reads half of it.
+
+        Args:
+            path (str): File the metrics are written to, ending in `.prom`
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            file.write(self.render())
+        os.replace(temporary, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serves the metrics over HTTP from a daemon thread
+
+        Args:
+            port (int): Port to listen on, any free port if 0
+            host (str): Address to listen on, only this machine by default
+
+        Returns:
+            ThreadingHTTPServer: The server, `shutdown` stops it
+        """
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if (self.path not in ("/", "/metrics")):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,212 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashlib
+import marshal
+import threading
+from src.lexer import lexer
+from src.parser import Parser
+from src.type_inference import TypeInferrer
+from src.loop_optimizer import LoopInvariantHoister
+
+# Statements of an imported yojna that are declared in the importer, the
+# rest of it does not run
+DECLARATIONS = ("STRUCT_DECL", "FUNCTION_DECL")
+
+# INVARIANT slots of imported yojnas start here, above the slots of any
+# program, so loops of both can share an interpreter's invariant cache
+MODULE_SLOTS = 1 << 32
+
+class Module:
+    """
+    A yojna imported with `yojna lao`, lexed, parsed and prepared once.
+
+    Modules are shared by every program that imports them and are never
+    changed after loading. `order` lists the module and everything it
+    imports, each once, dependencies first, which is the order their
+    declarations are made in.
+    """
+    def __init__(self, path, digest, declarations, imports, stamp=None):
+        """
+        Args:
+            path (str): Absolute path of the yojna
+            digest (str): SHA-256 of its source
+            declarations (list): Its prepared `dhacha` and `karam`
+                        declarations
+            imports (list): Modules it imports, in order
+            stamp (tuple): Modification time and size of the file when it
+                        was read
+        """
+        self.path = path
+        self.digest = digest
+        self.stamp = stamp
+        self.declarations = declarations
+        self.order = []
+        for module in imports:
+            for dependency in module.order:
+                if (dependency not in self.order):
+                    self.order.append(dependency)
+        self.order.append(self)
+
+    def __repr__(self):
+        # Part of the importing program's fingerprint for checkpoints and
+        # cached results, which change with any yojna imported on the way
+        return f"Module({self.path!r}, {[module.digest for module in self.order]!r})"
+
+class ModuleCache:
+    """
+    Modules loaded in this process, by path and arithmetic mode.
+
+    A module is loaded again only when its file, or the file of any yojna
+    it imports on the way, changed. With a directory,
+    parsed yojnas are also kept on disk by the hash of their source, so
+    other processes skip lexing and parsing them. Importing a yojna that is
+    still being loaded further up the chain of imports is an error.
+    """
+    nextSlot = MODULE_SLOTS
+
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str): Where parsed yojnas are kept across processes,
+                        only this process keeps them if None
+        """
+        self.directory = directory
+        self.modules = {}
+        self.lock = threading.RLock()
+        self.compiles = 0
+
+    def load(self, path, money=False, chain=()):
+        """
+        Args:
+            path (str): Path of the yojna
+            money (bool): Whether the importer counts in paise, its
+                        divisions are prepared the same way
+            chain (tuple): Paths being imported, outermost first
+
+        Raises:
+            ImportError: If the file does not exist or imports itself
+                        through its imports
+            SyntaxError: If the yojna can not be parsed
+            TypeError: With every type error found in the yojna
+
+        Returns:
+            Module: The loaded module
+        """
+        path = os.path.abspath(path)
+        if (path in chain):
+            cycle = " -> ".join(os.path.basename(p) for p in chain[chain.index(path):] + (path,))
+            raise ImportError(f"Yojna imports itself: {cycle}")
+        stamp = file_stamp(path)
+        if (stamp is None):
+            raise ImportError(f"Yojna '{path}' not found.")
+
+        key = (path, money)
+        with self.lock:
+            module = self.modules.get(key)
+            if (module is not None and all(file_stamp(m.path) == m.stamp for m in module.order)):
+                return module
+            module = self.compile(path, money, chain + (path,), stamp)
+            self.modules[key] = module
+            return module
+
+    def compile(self, path, money, chain, stamp=None):
+        """
+        Prepares a yojna and loads the yojnas it imports
+
+        Returns:
+            Module: The new module
+        """
+        with open(path, "r") as file:
+            source = file.read()
+        digest = hashlib.sha256(source.encode()).hexdigest()
+        ast = self.parse(source, digest)
+        self.compiles += 1
+
+        imports = []
+        declarations = []
+        for statement in ast:
+            if (statement["type"] == "IMPORT"):
+                imports.append(self.load(os.path.join(os.path.dirname(path), statement["path"]), money, chain))
+            elif (statement["type"] in DECLARATIONS):
+                declarations.append(statement)
+
+        declarations = TypeInferrer(money).infer(declarations)
+        hoister = LoopInvariantHoister(ModuleCache.nextSlot)
+        declarations = hoister.optimise(declarations)
+        ModuleCache.nextSlot = hoister.nextSlot
+        return Module(path, digest, declarations, imports, stamp)
+
+    def parse(self, source, digest):
+        """
+        Parses a yojna, or reads it back from the directory
+
+        Args:
+            source (str): Source of the yojna
+            digest (str): SHA-256 of the source
+
+        Returns:
+            list: The parsed AST
+        """
+        cached = os.path.join(self.directory, digest + ".ast") if self.directory else None
+        if (cached and os.path.exists(cached)):
+            try:
+                with open(cached, "rb") as file:
+                    return marshal.load(file)
+            except (OSError, EOFError, ValueError, TypeError):
+                # Unreadable, parsed again and rewritten
+                pass
+
+        ast = Parser(lexer(source)).parse()
+        if (cached):
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as file:
+                marshal.dump(ast, file)
+            os.replace(temporary, cached)
+        return ast
+
+def file_stamp(path):
+    """
+    Args:
+        path (str): Path of a file
+
+    Returns:
+        tuple | None: Modification time and size of the file, None if it
+            does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Modules shared by every program in the process
+MODULES = ModuleCache()
+
+def link_imports(ast, directory=None, modules=MODULES):
+    """
+    Loads the yojnas a program imports and attaches them to its
+    `yojna lao` statements, so running the program does not look them up
+
+    Args:
+        ast (list): The parsed program
+        directory (str): Imports are relative to it, the current directory
+                    if None
+        modules (ModuleCache): Where modules are loaded from
+
+    Raises:
+        ImportError: If an imported yojna does not exist or imports are
+                    circular
+
+    Returns:
+        list: The AST with a module on every `yojna lao` statement
+    """
+    if (not any(statement["type"] == "IMPORT" for statement in ast)):
+        return ast
+    money = any(statement["type"] == "MONEY_MODE" for statement in ast)
+    directory = directory or os.getcwd()
+    return [dict(statement, module=modules.load(os.path.join(directory, statement["path"]), money))
+            if (statement["type"] == "IMPORT" and "module" not in statement) else statement for statement in ast]
@@ -0,0 +1,185 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+from src.input_source import parse_input_value
+
+# Paise in a rupee
+SCALE = 100
+
+# How `ka bhag karo` rounds to the nearest paisa
+ROUNDING_MODES = ("aadha upar", "aadha sam", "upar", "neeche")
+DEFAULT_ROUNDING = "aadha upar"
+
+DECIMAL_REGEX = re.compile(r"(-?)(\d*)\.(\d+)")
+
+def divide_rounded(numerator, denominator, rounding):
+    """
+    Divides two integers, rounding the quotient to an integer
+
+    Args:
+        numerator (int): The dividend
+        denominator (int): The divisor, not 0
+        rounding (str): One of `ROUNDING_MODES`. "aadha upar" rounds halves
+                    away from zero, "aadha sam" rounds halves to the even
+                    neighbour, "upar" rounds up and "neeche" rounds down.
+
+    Returns:
+        int: The rounded quotient
+    """
+    if (denominator < 0):
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    if (remainder == 0 or rounding == "neeche"):
+        return quotient
+    if (rounding == "upar"):
+        return quotient + 1
+    twice = 2 * remainder
+    if (twice > denominator):
+        return quotient + 1
+    if (twice < denominator):
+        return quotient
+    if (rounding == "aadha sam"):
+        return quotient + (quotient & 1)
+    # Halfway and floor division rounded towards minus infinity
+    return quotient + 1 if numerator > 0 else quotient
+
+class Money:
+    """
+    An amount of rupees, held as a whole number of paise.
+
+    Values are compared with each other and with plain integers (whole
+    rupees) through the paise, so the arithmetic never touches floats.
+    """
+    __slots__ = ("paise",)
+
+    def __init__(self, paise):
+        self.paise = paise
+
+    def __str__(self):
+        sign = "-" if self.paise < 0 else ""
+        rupees, paise = divmod(abs(self.paise), SCALE)
+        return f"{sign}{rupees}.{paise:02d}"
+
+    __repr__ = __str__
+
+    def __bool__(self):
+        return self.paise != 0
+
+    def __hash__(self):
+        # Whole rupees hash like the equal integer
+        if (self.paise % SCALE == 0):
+            return hash(self.paise // SCALE)
+        return hash((Money, self.paise))
+
+    def __eq__(self, other):
+        return self.paise == to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __ne__(self, other):
+        return self.paise != to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __lt__(self, other):
+        return self.paise < to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __le__(self, other):
+        return self.paise <= to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __gt__(self, other):
+        return self.paise > to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __ge__(self, other):
+        return self.paise >= to_paise(other) if isinstance(other, (Money, int)) else NotImplemented
+
+    def __reduce__(self):
+        return (Money, (self.paise,))
+
+def to_paise(value):
+    """
+    Args:
+        value (Money | int): An amount, integers are whole rupees
+
+    Raises:
+        RuntimeError: If the value is not an amount
+
+    Returns:
+        int: The amount in paise
+    """
+    if (type(value) is Money):
+        return value.paise
+    if (isinstance(value, int)):
+        return value * SCALE
+    raise RuntimeError(f"'{value}' can not be used as rupees.")
+
+class MoneyArithmetic:
+    """
+    Arithmetic of a program that counts in paise, chosen with
+    `paise me hisaab karo`.
+
+    Adding, subtracting and multiplying by integers is exact. Division
+    always gives rupees and paise, rounded as configured, and so does
+    multiplying two amounts. Integers that never meet an amount or a
+    division stay integers, so loop counters and counts keep working.
+    """
+    def __init__(self, rounding=DEFAULT_ROUNDING):
+        """
+        Args:
+            rounding (str): One of `ROUNDING_MODES`
+        """
+        self.rounding = rounding
+
+    def apply(self, operator, left, right):
+        """
+        Args:
+            operator (str): An arithmetic operator
+            left (Money | int): The left operand
+            right (Money | int): The right operand
+
+        Raises:
+            RuntimeError: If an operand is not an amount or the divisor is 0
+
+        Returns:
+            Money | int: The result
+        """
+        if (operator == "me jodo"):
+            return Money(to_paise(left) + to_paise(right))
+        elif (operator == "se ghatao"):
+            return Money(to_paise(left) - to_paise(right))
+        elif (operator == "me guna karo"):
+            if (type(left) is not Money):
+                left, right = right, left
+            if (type(right) is Money):
+                return Money(divide_rounded(left.paise * right.paise, SCALE, self.rounding))
+            if (isinstance(right, int)):
+                return Money(left.paise * right)
+            raise RuntimeError(f"'{right}' can not be used as rupees.")
+        elif (operator == "ka bhag karo"):
+            divisor = to_paise(right)
+            if (divisor == 0):
+                raise RuntimeError("Division by zero.")
+            return Money(divide_rounded(to_paise(left) * SCALE, divisor, self.rounding))
+        elif (operator == "ka shesh bhag karo"):
+            divisor = to_paise(right)
+            if (divisor == 0):
+                raise RuntimeError("Division by zero.")
+            return Money(to_paise(left) % divisor)
+        raise RuntimeError(f"Unknown operator: {operator}")
+
+    def parse(self, text):
+        """
+        Converts a line of input, numbers with a decimal point become
+        amounts rounded to the paisa
+
+        Args:
+            text (str): The line without its line ending
+
+        Returns:
+            Money | int | str: The value stored by `pucho`
+        """
+        match = DECIMAL_REGEX.fullmatch(text)
+        if (match is None):
+            return parse_input_value(text)
+        sign, rupees, fraction = match.groups()
+        paise = divide_rounded(int((rupees or "0") + fraction) * SCALE, 10 ** len(fraction), self.rounding)
+        return Money(-paise if sign else paise)
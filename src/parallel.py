@@ -0,0 +1,364 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from src.utils.helper import expression_names, expression_calls
+from src.error_handler import FuelExhausted
+from src.utils.bribe_ledger import BribeLedger
+from src.money import Money
+from src.rope import joined
+
+# Statements that touch shared state (input, open files, the bribe pool)
+# and so can not run inside a `milkar ginti karo` body.
+FORBIDDEN_STATEMENTS = ("INPUT", "FILE_OPEN", "FILE_CLOSE", "BRIBE", "PARICHAY", "PROGRAM_START", "PROGRAM_END")
+
+# Chunks handed out per worker, more chunks balance uneven iterations better.
+CHUNKS_PER_WORKER = 4
+
+def run_chunk(task):
+    """
+    Runs a range of iterations of a parallel loop inside a worker process.
+
+    Args:
+        task (dict): Loop body, iteration values and a copy of the
+                    interpreter state at the start of the loop
+
+    Returns:
+        dict: Output printed, text written per file alias, final variables,
+            bribe deducted, statements and nested loop iterations run and
+            the error message if the chunk failed
+    """
+    from src.interpreter import Interpreter
+
+    interpreter = Interpreter()
+    interpreter.env.variables = task["variables"]
+    interpreter.env.structs = task["structs"]
+    interpreter.env.files = {alias: io.StringIO() for alias in task["files"]}
+    interpreter.bribeManager = task["bribeManager"]
+    # Deductions are recorded once, by the parent, after merging the chunks
+    interpreter.bribeManager.ledger = BribeLedger()
+    interpreter.fuel = task["fuel"]
+    interpreter.money = task["money"]
+    interpreter.statementCounts = {} if task["counted"] else None
+    manager = interpreter.bribeManager
+    collectedBefore = manager.collectedBribe
+    deductedBefore = manager.loopDepth in manager.loopDeducted
+
+    for name, identity in task["reductions"].items():
+        interpreter.env.set_variable(name, identity)
+
+    output = io.StringIO()
+    error = None
+    outOfFuel = False
+    cost = len(task["body"]) or 1
+    with redirect_stdout(output):
+        try:
+            for value in task["values"]:
+                interpreter.charge_fuel(cost)
+                interpreter.env.set_variable(task["variable"], value)
+                for s in task["body"]:
+                    interpreter.execute(s)
+        except FuelExhausted:
+            outOfFuel = True
+        except RuntimeError as e:
+            error = str(e)
+
+    return {
+        "output": output.getvalue(),
+        "files": {alias: f.getvalue() for alias, f in interpreter.env.files.items()},
+        "variables": {name: joined(interpreter.env.variables[name]) for name in task["returned"] if name in interpreter.env.variables},
+        "deducted": collectedBefore - manager.collectedBribe,
+        "deductedDepth": not deductedBefore and manager.loopDepth in manager.loopDeducted,
+        "error": error,
+        "fuelUsed": 0 if math.isinf(task["fuel"]) else task["fuel"] - interpreter.fuel,
+        "outOfFuel": outOfFuel,
+        "statementCounts": interpreter.statementCounts,
+        "loopIterations": interpreter.loopIterations,
+    }
+
+class ParallelLoopRunner:
+    """
+    Runs `milkar ginti karo` loops across a process pool.
+
+    The pool is started by the first parallel loop and kept for the ones
+    after it, so a parallel loop nested in a serial loop does not start
+    new worker processes on every entry. `close` stops the workers.
+
+    The range is split into chunks that run in worker processes, each with
+    its own copy of the environment. Output and file writes are captured per
+    chunk and released in iteration order. The body may only assign variables
+    that did not exist before the loop, or accumulate into an outer variable
+    with `likho x x me jodo ...` / `likho x x se ghatao ...`, whose partial
+    results are combined in order at the end. Integer and string reductions
+    are exact; float sums are added per chunk, so they may differ from the
+    serial loop in the last digits.
+    """
+    def __init__(self, interpreter, workers=None):
+        self.interpreter = interpreter
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+
+    def close(self):
+        """
+        Stops the worker processes, a later parallel loop starts new ones
+        """
+        if (self.pool is not None):
+            self.pool.shutdown()
+            self.pool = None
+
+    def execute(self, statement):
+        """
+        Executes a parallel loop
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Raises:
+            RuntimeError: If the loop can not run in parallel, or an
+                        iteration fails
+        """
+        interpreter = self.interpreter
+        env = interpreter.env
+        manager = interpreter.bribeManager
+
+        var = statement["variable"]
+        start = interpreter.evaluate(statement["start"])
+        end = interpreter.evaluate(statement["end"])
+        increment = statement.get("increment", 1)
+        if (isinstance(increment, dict)):
+            increment = interpreter.evaluate(increment)
+
+        if (not isinstance(start, int) or not isinstance(end, int) or not isinstance(increment, int)):
+            raise RuntimeError(f"Loop boundaries and increment must be integers. Got: start={start}, end={end}, increment={increment}")
+        if (increment == 0):
+            raise RuntimeError("'milkar ginti karo' needs a non-zero increment.")
+
+        reductions, bodyLocals = self.check(statement)
+        identities = {}
+        for name in reductions:
+            identities[name] = self.identity(name, joined(env.variables[name]))
+
+        values = range(start, end + 1, increment) if increment > 0 else range(start, end - 1, increment)
+        manager.loop_inc()
+
+        chunkCount = max(1, min(len(values), self.workers * CHUNKS_PER_WORKER))
+        size = -(-len(values) // chunkCount)
+        tasks = []
+        for index in range(0, len(values), size):
+            tasks.append({
+                "body": statement["body"],
+                "variable": var,
+                "values": values[index:index + size],
+                "variables": dict(env.variables),
+                "structs": env.structs,
+                "files": list(env.files),
+                "bribeManager": manager,
+                "reductions": identities,
+                "returned": bodyLocals | reductions,
+                "fuel": interpreter.fuel,
+                "money": interpreter.money,
+                "counted": interpreter.statementCounts is not None,
+            })
+
+        # Workers flush the inherited stdout buffer when they exit
+        sys.stdout.flush()
+        results = []
+        if (tasks):
+            if (self.pool is None):
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            results = list(self.pool.map(run_chunk, tasks))
+
+        fuelUsed = sum(result["fuelUsed"] for result in results)
+        if (any(result["outOfFuel"] for result in results) or fuelUsed > interpreter.fuel):
+            # The serial loop stops at the exact iteration where fuel runs out
+            manager.loop_dec()
+            interpreter.execute_loop(statement)
+            return
+        interpreter.fuel -= fuelUsed
+
+        deducted = 0
+        depthDeducted = manager.loopDepth in manager.loopDeducted
+        output = interpreter.output or sys.stdout
+        counts = interpreter.statementCounts
+        interpreter.loopIterations += len(values)
+        for result in results:
+            output.write(result["output"])
+            interpreter.loopIterations += result["loopIterations"]
+            for statementType, count in (result["statementCounts"] or {}).items():
+                counts[statementType] = counts.get(statementType, 0) + count
+            for alias, text in result["files"].items():
+                if (text):
+                    env.files[alias].write(text)
+            if (result["error"]):
+                raise RuntimeError(result["error"])
+
+            deducted += result["deducted"]
+            if (result["deductedDepth"]):
+                if (depthDeducted):
+                    # Serially, the nested loop pays only on its first entry
+                    deducted -= manager.baseBribe
+                depthDeducted = True
+
+            for name, value in result["variables"].items():
+                if (name in reductions):
+                    env.set_variable(name, self.combine(name, joined(env.variables[name]), value))
+                else:
+                    env.set_variable(name, value)
+
+        if (deducted):
+            manager.deduct_bribe(deducted)
+        if (depthDeducted):
+            manager.loopDeducted.add(manager.loopDepth)
+        if (manager.collectedBribe < 0):
+            raise RuntimeError(f"Itne me kya hoga! Thoda aur adjust karo, tabhi 'LOOP' ki file aage badhegi.\nPass {abs(manager.collectedBribe)} more under the table.")
+
+        env.set_variable(var, start + len(values) * increment)
+        manager.loop_dec()
+
+    def check(self, statement):
+        """
+        Makes sure the iterations of a loop are independent of each other
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Raises:
+            RuntimeError: If the body assigns an outer variable (other than a
+                        reduction), reads a variable left over from the
+                        previous iteration or has ordered side effects
+
+        Returns:
+            tuple: Names of the reduction variables and of the variables
+                local to the body
+        """
+        outer = set(self.interpreter.env.variables) - {statement["variable"]}
+        reductions = set()
+        bodyLocals = set()
+        readOutside = set()
+
+        def visit(statements, defined):
+            for s in statements or []:
+                statementType = s["type"]
+                if (statementType in FORBIDDEN_STATEMENTS or statementType not in (
+                        "VAR_DECL", "PRINT", "FILE_WRITE", "CONDITIONAL", "LOOP",
+                        "ARRAY_DECL", "ARRAY_APPEND", "STRUCT_INSTANCE")):
+                    raise RuntimeError(f"'{statementType}' can not be used inside 'milkar ginti karo'.")
+                if (any(isinstance(s.get(key), dict) and expression_calls(s[key]) for key in ("value", "condition", "end"))):
+                    raise RuntimeError("'bulao' can not be used inside 'milkar ginti karo'.")
+
+                target = None
+                read = set()
+                if (statementType == "VAR_DECL"):
+                    target = s["variable"]
+                    value = s["value"]
+                    if (target in outer):
+                        operand = self.reduction_operand(target, value)
+                        if (operand is None):
+                            raise RuntimeError(f"'milkar ginti karo' can not change outer variable '{target}'. Only 'likho {target} {target} me jodo ...' is allowed.")
+                        reductions.add(target)
+                        read = expression_names(operand)
+                        target = None
+                    else:
+                        read = expression_names(value)
+                elif (statementType in ("PRINT", "FILE_WRITE")):
+                    read = expression_names(s["value"])
+                elif (statementType == "ARRAY_APPEND"):
+                    if (s["variable"] in outer):
+                        raise RuntimeError(f"'milkar ginti karo' can not change outer suchi '{s['variable']}'.")
+                    read = expression_names(s["value"]) | {s["variable"]}
+                elif (statementType == "ARRAY_DECL"):
+                    target = s["variable"]
+                elif (statementType == "STRUCT_INSTANCE"):
+                    target = s["instance_name"]
+                elif (statementType == "CONDITIONAL"):
+                    check_reads(expression_names(s["condition"]), defined)
+                    visit(s.get("if"), set(defined))
+                    visit(s.get("else"), set(defined))
+                elif (statementType == "LOOP"):
+                    check_reads(expression_names(s["end"]), defined)
+                    if (s["variable"] in outer):
+                        raise RuntimeError(f"'milkar ginti karo' can not change outer variable '{s['variable']}'.")
+                    bodyLocals.add(s["variable"])
+                    visit(s["body"], defined | {s["variable"]})
+
+                check_reads(read, defined)
+                if (target is not None):
+                    if (target in outer):
+                        raise RuntimeError(f"'milkar ginti karo' can not change outer variable '{target}'.")
+                    bodyLocals.add(target)
+                    defined.add(target)
+
+        def check_reads(names, defined):
+            readOutside.update(names)
+            for name in names:
+                if (name in reductions):
+                    raise RuntimeError(f"Reduction variable '{name}' can not be read inside 'milkar ginti karo'.")
+                if (name not in outer and name not in defined):
+                    raise RuntimeError(f"Variable '{name}' is read before it is set in this iteration of 'milkar ginti karo'.")
+
+        visit(statement["body"], {statement["variable"]})
+        for name in reductions:
+            if (name in readOutside):
+                raise RuntimeError(f"Reduction variable '{name}' can not be read inside 'milkar ginti karo'.")
+        return reductions, bodyLocals
+
+    def reduction_operand(self, name, value):
+        """
+        Args:
+            name (str): Name of the outer variable being assigned
+            value (dict): The assigned expression
+
+        Returns:
+            dict | None: What is added to (or taken from) the variable, None
+                if the assignment is not a reduction
+        """
+        if (not value or value.get("operator") not in ("me jodo", "se ghatao")):
+            return None
+        left = value["left"]
+        if (left.get("type") != "IDENTIFIER" or left["name"] != name):
+            return None
+        if (name in expression_names(value["right"])):
+            return None
+        return value["right"]
+
+    def identity(self, name, value):
+        """
+        Args:
+            name (str): Name of the reduction variable
+            value (Any): Its value before the loop
+
+        Raises:
+            RuntimeError: If the value can not be reduced in parallel
+
+        Returns:
+            int | float | str: Starting value for each chunk
+        """
+        if (type(value) in (int, float, Money)):
+            return 0
+        elif (isinstance(value, str)):
+            return ""
+        raise RuntimeError(f"Reduction variable '{name}' must be a number or a string.")
+
+    def combine(self, name, total, partial):
+        """
+        Args:
+            name (str): Name of the reduction variable
+            total (int | float | str): Value combined so far
+            partial (int | float | str): Result of one chunk
+
+        Raises:
+            RuntimeError: If the chunk changed the kind of value
+
+        Returns:
+            int | float | str: The combined value
+        """
+        if (type(total) is Money or type(partial) is Money):
+            return self.interpreter.money.apply("me jodo", total, partial)
+        if (isinstance(total, str) != isinstance(partial, str) or type(partial) not in (int, float, str)):
+            raise RuntimeError(f"Reduction variable '{name}' changed type inside 'milkar ginti karo'.")
+        return total + partial
@@ -4,6 +4,9 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.utils.token_utils import TokenUtils
+from src.utils.helper import trampoline
+from src.money import ROUNDING_MODES, DEFAULT_ROUNDING
+from src.typed_array import AGGREGATES
 
 class Parser:
     def __init__(self, tokens):
@@ -26,7 +29,7 @@ class Parser:
             ast.append({"type": "PROGRAM_START", "name": program_name})
 
         while (not self.utils.is_at_end()):
-            ast.append(self.parse_statement())
+            ast.append(trampoline(self.parse_statement()))
 
         if (not any(node["type"] == "PROGRAM_END" for node in ast)):
             raise SyntaxError("Program must end with 'yojna band'.")
@@ -41,12 +44,16 @@ class Parser:
         declaration, conditional, loop) and delegates further parsing
         to the appropriate method.
 
+        Statements with blocks are parsed as generators run by
+        `trampoline`, which yield the statements nested in them. Blocks
+        nested thousands of levels deep do not grow the Python call stack.
+
         Raises:
             SyntaxError: In case if there are any unexpected tokens,
                         raise a Syntax error
 
         Returns:
-            dict: This funtion returns a dictionary where the 'type' key
+            generator: Returns a dictionary where the 'type' key
                 is the type of statement and other key store details
                 like related to the statement type.
         """
@@ -55,28 +62,49 @@ class Parser:
         elif self.utils.match("VAR_DECL"):
             if (self.utils.check_next("STRUCT_INSTANCE")):
                 return self.parse_struct_instance()
+            elif (self.utils.check_next("ARRAY_DECL")):
+                return self.parse_array_declaration()
             else:
                 return self.parse_variable_declaration()
         elif (self.utils.check("IDENTIFIER") and self.utils.check_next("FILE_WRITE")):
             return self.parse_file_write()
+        elif (self.utils.check("IDENTIFIER") and self.utils.check_next("ARRAY_APPEND")):
+            return self.parse_array_append()
         elif (self.utils.match("INPUT")):
             return self.parse_input()
-        elif (self.utils.match("FILE_OPEN") or self.utils.match("FILE_CLOSE")):
+        elif (self.utils.match("FILE_OPEN") or self.utils.match("FILE_READ") or self.utils.match("FILE_CLOSE")):
             return self.parse_file_operation()
         elif (self.utils.match("PARICHAY")):
             return self.parse_parichay()
+        elif (self.utils.match("IMPORT")):
+            return self.parse_import()
+        elif (self.utils.match("MONEY_MODE")):
+            return self.parse_money_mode()
         elif (self.utils.match("BRIBE")):
             return self.parse_bribe()
         elif (self.utils.match("PRINT")):
             return self.parse_print_statement()
         elif (self.utils.match("CONDITIONAL")):
-            return self.parse_conditional()
+            return (yield self.parse_conditional())
         elif (self.utils.match("LOOP_START")):
-            return self.parse_loop()
+            return (yield self.parse_loop())
+        elif (self.utils.match("PARALLEL_LOOP_START")):
+            loop = yield self.parse_loop()
+            loop["parallel"] = True
+            return loop
+        elif (self.utils.match("MEMOIZE")):
+            self.utils.consume("FUNCTION_DECL", "Expected 'karam karo' after 'yaad rakho'.")
+            function = yield self.parse_function()
+            function["memoize"] = True
+            return function
+        elif (self.utils.match("FUNCTION_DECL")):
+            return (yield self.parse_function())
+        elif (self.utils.match("FUNCTION_CALL")):
+            return {"type": "CALL_STATEMENT", "call": self.parse_call()}
         elif (self.utils.match("BREAK")):
             return {"type": "BREAK"}
         elif (self.utils.match("RETURN")):
-            return {"type", "RETURN"}
+            return self.parse_return()
         elif self.utils.match("YOJNA_END"):
             return {"type": "PROGRAM_END"}
         else:
@@ -132,6 +160,33 @@ class Parser:
             "struct_type": structType
         }
 
+    def parse_array_declaration(self):
+        """
+        Extracts the array name and its initial values, if any.
+
+        Returns:
+            dict: Returns type, name of the array and its initial values
+        """
+        variable = self.utils.consume("IDENTIFIER", "Expected variable name for the suchi.")[1]
+        self.utils.consume("ARRAY_DECL", "Expected 'suchi banao' for array declaration.")
+        values = []
+        while (self.utils.match("NUMBER")):
+            values.append(self.utils.previous()[1])
+
+        return {"type": "ARRAY_DECL", "variable": variable, "values": values}
+
+    def parse_array_append(self):
+        """
+        Parses a statement that appends a value to an array
+
+        Returns:
+            dict: Returns the type of operation, name of the array and the value to be added.
+        """
+        variable = self.utils.consume("IDENTIFIER", "Expected suchi name before 'me dalo'.")[1]
+        self.utils.consume("ARRAY_APPEND", "Expected 'me dalo'.")
+        value = self.parse_expression()
+        return {"type": "ARRAY_APPEND", "variable": variable, "value": value}
+
     def parse_input(self):
         """
         Associates a variable for a user provided input.
@@ -158,6 +213,11 @@ class Parser:
             self.utils.consume("FILE_DECL", "Expected 'aur naam do' for file declaration.")
             alias = self.utils.consume("IDENTIFIER", "Expected file alias for this file.")[1]
             return {"type": "FILE_OPEN", "file_name": fileName, "alias": alias}
+        elif (operation == "file padho"):
+            fileName = self.utils.consume("STRING", "Expected a file name after 'file padho'.")[1]
+            self.utils.consume("FILE_DECL", "Expected 'aur naam do' for file declaration.")
+            alias = self.utils.consume("IDENTIFIER", "Expected file alias for this file.")[1]
+            return {"type": "FILE_OPEN", "file_name": fileName, "alias": alias, "read": True}
         elif (operation == "band karo"):
             alias = self.utils.consume("IDENTIFIER", "Expected file alias to close.")[1]
             return {"type": "FILE_CLOSE", "alias": alias}
@@ -184,6 +244,16 @@ class Parser:
         profile = self.utils.consume("STRING", "Expected parichay description.")[1]
         return {"type": "PARICHAY", "profile": profile}
 
+    def parse_import(self):
+        """
+        Extracts the path of the yojna to import
+
+        Returns:
+            dict: Returns the type of operation and the path, as written
+        """
+        path = self.utils.consume("STRING", "Expected path of the yojna after 'yojna lao'.")[1]
+        return {"type": "IMPORT", "path": path}
+
     def parse_bribe(self):
         """
         Extracts the amount of bribe
@@ -203,6 +273,10 @@ class Parser:
         Handles operators and evaluates expressions in a
         left to right order.
 
+        Operators group to the right, `a op b op c` is `a op (b op c)`. The
+        operands are collected first and folded from the right, so chains
+        thousands of operators long do not recurse.
+
         Raises:
             SyntaxError: Operator found without a preceding operand.
             SyntaxError: Unexpected token in the expression
@@ -212,19 +286,10 @@ class Parser:
             dict: A dictionary containing type, value, name and details of binary
                 expressions
         """
-        left = None
-        if (self.utils.match("NUMBER")):
-            left = {"type": "NUMBER", "value": self.utils.previous()[1]}
-        elif (self.utils.match("STRING")):
-            left = {"type": "STRING", "value": self.utils.previous()[1]}
-        elif (self.utils.match("IDENTIFIER")):
-            left = {"type": "IDENTIFIER", "name": self.utils.previous()[1]}
-        elif self.utils.check("OPERATOR"):
-            raise SyntaxError("Operator found without a preceding operand.")
-        else:
-            if self.utils.check("RCBRACE"):
-                return None
-            raise SyntaxError(f"Unexpected token in expression: {self.utils.peek()}")
+        if (self.utils.check("RCBRACE")):
+            return None
+        operands = [self.parse_operand()]
+        operators = []
 
         while self.utils.match("OPERATOR"):
             operator = self.utils.previous()[1]
@@ -232,15 +297,162 @@ class Parser:
             if self.utils.is_at_end() or self.utils.check("RCBRACE") or self.utils.check("LOOP"):
                 raise SyntaxError(f"Unexpected end of expression after operator '{operator}'.")
 
-            right = self.parse_expression()
-            left = {
+            operators.append(operator)
+            operands.append(self.parse_operand())
+
+        expression = operands.pop()
+        while (operators):
+            expression = {
                 "type": "BINARY_EXPRESSION",
-                "operator": operator,
-                "left": left,
-                "right": right,
+                "operator": operators.pop(),
+                "left": operands.pop(),
+                "right": expression,
             }
 
-        return left
+        return expression
+
+    def parse_operand(self):
+        """
+        Parses a single operand of an expression
+
+        Raises:
+            SyntaxError: Operator found without a preceding operand.
+            SyntaxError: Unexpected token in the expression
+
+        Returns:
+            dict: A dictionary representing the operand
+        """
+        if (self.utils.match("NUMBER")):
+            return {"type": "NUMBER", "value": self.utils.previous()[1]}
+        elif (self.utils.match("STRING")):
+            return {"type": "STRING", "value": self.utils.previous()[1]}
+        elif (self.utils.match("IDENTIFIER")):
+            operand = {"type": "IDENTIFIER", "name": self.utils.previous()[1]}
+            if (self.utils.match("STRUCT_ACCESS")):
+                operand = self.parse_array_access(operand["name"])
+            return operand
+        elif (self.utils.match("FUNCTION_CALL")):
+            return self.parse_call()
+        elif self.utils.check("OPERATOR"):
+            raise SyntaxError("Operator found without a preceding operand.")
+        raise SyntaxError(f"Unexpected token in expression: {self.utils.peek()}")
+
+    def parse_array_access(self, name):
+        """
+        Parses what follows `<suchi> ka`: an aggregate (`kul`, `nyuntam`,
+        `adhiktam`, `sankhya`), an index or a start and end index for a slice.
+        The aggregate names are only special here, anywhere else they are
+        ordinary identifiers.
+
+        Args:
+            name (str): Name of the array being accessed
+
+        Returns:
+            dict: A dictionary containing type, name of the array and the
+                aggregate or index details
+        """
+        if (self.utils.check("IDENTIFIER") and self.utils.peek()[1] in AGGREGATES):
+            self.utils.advance()
+            return {"type": "ARRAY_AGGREGATE", "name": name, "function": self.utils.previous()[1]}
+
+        index = self.parse_index_operand()
+        if (self.utils.check("NUMBER") or (self.utils.check("IDENTIFIER")
+                and not self.utils.check_next("FILE_WRITE") and not self.utils.check_next("ARRAY_APPEND"))):
+            end = self.parse_index_operand()
+            return {"type": "ARRAY_SLICE", "name": name, "start": index, "end": end}
+
+        return {"type": "ARRAY_INDEX", "name": name, "index": index}
+
+    def parse_index_operand(self):
+        """
+        Extracts a single number or identifier used as an array index.
+
+        Raises:
+            SyntaxError: If the index is neither a number nor an identifier
+
+        Returns:
+            dict: A dictionary representing the index
+        """
+        if (self.utils.match("NUMBER")):
+            return {"type": "NUMBER", "value": self.utils.previous()[1]}
+        elif (self.utils.match("IDENTIFIER")):
+            return {"type": "IDENTIFIER", "name": self.utils.previous()[1]}
+        raise SyntaxError(f"Expected an index after 'ka'. Got: {self.utils.peek()}")
+
+    def parse_money_mode(self):
+        """
+        Parses `paise me hisaab karo`, with an optional rounding mode
+
+        Raises:
+            SyntaxError: If the rounding mode is not known
+
+        Returns:
+            dict: Returns type of op and the rounding mode
+        """
+        rounding = DEFAULT_ROUNDING
+        if (self.utils.match("STRING")):
+            rounding = self.utils.previous()[1]
+            if (rounding not in ROUNDING_MODES):
+                raise SyntaxError(f"Unknown rounding '{rounding}'. Use one of: {', '.join(ROUNDING_MODES)}.")
+        return {"type": "MONEY_MODE", "rounding": rounding}
+
+    def parse_function(self):
+        """
+        Extracts the name, parameters and body of a function declared with
+        `karam karo <name> <param> ... { ... } karam band`.
+
+        Raises:
+            SyntaxError: If the name, the braces or 'karam band' are missing
+
+        Returns:
+            generator: Returns type of op, name, parameters and body of the function
+        """
+        name = self.utils.consume("IDENTIFIER", "Expected a function name after 'karam karo'.")[1]
+        params = []
+        while (self.utils.match("IDENTIFIER")):
+            params.append(self.utils.previous()[1])
+
+        self.utils.consume("LCBRACE", "Expected '{' for function body.")
+        body = []
+        while not self.utils.check("RCBRACE") and not self.utils.is_at_end():
+            body.append((yield self.parse_statement()))
+        self.utils.consume("RCBRACE", "Expected '}' after function body.")
+        self.utils.consume("FUNCTION_END", "Expected 'karam band' after function body.")
+
+        return {"type": "FUNCTION_DECL", "name": name, "params": params, "body": body, "memoize": False}
+
+    def parse_call(self):
+        """
+        Extracts the function name and arguments of `bulao <name>(<expr> ...)`.
+
+        Raises:
+            SyntaxError: If the name or the round braces are missing
+
+        Returns:
+            dict: Returns type of op, name of the function and the arguments
+        """
+        name = self.utils.consume("IDENTIFIER", "Expected a function name after 'bulao'.")[1]
+        self.utils.consume("LRBRACE", "Expected '(' after function name.")
+        args = []
+        while not self.utils.check("RRBRACE") and not self.utils.is_at_end():
+            args.append(self.parse_expression())
+        self.utils.consume("RRBRACE", "Expected ')' after function arguments.")
+        return {"type": "CALL", "name": name, "args": args}
+
+    def parse_return(self):
+        """
+        Extracts the value returned by `sarkar gir gayi`, if any.
+
+        Returns:
+            dict: Returns type of op and the returned expression (None if
+                nothing is returned)
+        """
+        value = None
+        startsExpression = (self.utils.check("NUMBER") or self.utils.check("STRING") or self.utils.check("FUNCTION_CALL")
+                            or (self.utils.check("IDENTIFIER") and not self.utils.check_next("FILE_WRITE") and not self.utils.check_next("ARRAY_APPEND")))
+        if (startsExpression):
+            value = self.parse_expression()
+        return {"type": "RETURN", "value": value}
 
     def parse_print_statement(self):
         """
@@ -261,7 +473,7 @@ class Parser:
         Extracts the if-else branch
 
         Returns:
-            dict: Returns type of operation, condition, if branch and else branch.
+            generator: Returns type of operation, condition, if branch and else branch.
         """
         left = self.parse_expression()
         operator = self.utils.consume("COMPARISON", "Expected a comparison operator.")[1]
@@ -272,7 +484,7 @@ class Parser:
         self.utils.consume("LCBRACE", "Expected '{' after condition.")
         ifBranch = []
         while (not self.utils.check("RCBRACE") and not self.utils.is_at_end()):
-            ifBranch.append(self.parse_statement())
+            ifBranch.append((yield self.parse_statement()))
 
         self.utils.consume("RCBRACE", "Expected '}' after if branch.")
 
@@ -281,7 +493,7 @@ class Parser:
             self.utils.consume("LCBRACE", "Expected '{' after 'warna'.")
             elseBranch = []
             while (not self.utils.check("RCBRACE") and not self.utils.is_at_end()):
-                elseBranch.append(self.parse_statement())
+                elseBranch.append((yield self.parse_statement()))
 
             self.utils.consume("RCBRACE", "Expected '}' after else branch.")
 
@@ -300,10 +512,12 @@ class Parser:
             SyntaxError: Expected end value
 
         Returns:
-            dict: Returns type of op, loop variable, start, end, increement
+            generator: Returns type of op, loop variable, start, end, increement
                 and body of loop
         """
         loopVariable = self.utils.consume("IDENTIFIER", "Expected a loop variable")[1]
+        if (self.utils.check("IDENTIFIER") and self.utils.check_next("FILE_LINES")):
+            return (yield self.parse_file_loop(loopVariable))
         start = {"type": "NUMBER", "value": self.utils.consume("NUMBER", "Expected start value")[1]}
 
         if (self.utils.match("NUMBER")):
@@ -322,7 +536,7 @@ class Parser:
         self.utils.consume("LCBRACE", "Expected '{' for loop body.")
         body = []
         while not self.utils.check("RCBRACE") and not self.utils.is_at_end():
-            body.append(self.parse_statement())
+            body.append((yield self.parse_statement()))
         self.utils.consume("RCBRACE", "Expected '}' after loop body.")
         self.utils.consume("LOOP_END", "Expected 'ginti band' after loop body.")
 
@@ -335,6 +549,34 @@ class Parser:
             "body": body,
         }
 
+    def parse_file_loop(self, loopVariable):
+        """
+        Parses a loop over the lines of a file opened with 'file padho'
+
+        Args:
+            loopVariable (str): Name of the variable that holds each line
+
+        Returns:
+            generator: Returns type of op, loop variable, file alias and body of
+                loop
+        """
+        alias = self.utils.advance()[1]
+        self.utils.advance()
+
+        self.utils.consume("LCBRACE", "Expected '{' for loop body.")
+        body = []
+        while not self.utils.check("RCBRACE") and not self.utils.is_at_end():
+            body.append((yield self.parse_statement()))
+        self.utils.consume("RCBRACE", "Expected '}' after loop body.")
+        self.utils.consume("LOOP_END", "Expected 'ginti band' after loop body.")
+
+        return {
+            "type": "FILE_LOOP",
+            "variable": loopVariable,
+            "alias": alias,
+            "body": body,
+        }
+
 if __name__ == "__main__":
     tokens = [
             ('FILE_OPEN', 'file kholo'),
@@ -0,0 +1,221 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import math
+import time
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter, prepare_program
+from src.input_source import InputSource, AsyncInputSource, TextInputSource, parse_input_value
+from src.money import MoneyArithmetic
+from src.checkpoint import program_hash
+from src.jit import JIT_THRESHOLD
+from src.delayed_output import HeldOutput, release_output
+from src.modules import link_imports
+from src.result_cache import ProgramEffects
+
+class RunResult:
+    """
+    Outcome of one run of a `Program`.
+
+    `error` holds the exception that stopped the program, None when it ran
+    to the end. `output` is what the program printed, None when it printed
+    to a sink given by the caller. `bribes` holds the bribes collected and
+    deducted per parichay since the interpreter was reset.
+    """
+    def __init__(self, output, error, variables, collectedBribe, fuelUsed, elapsed, bribes=None, cached=False):
+        self.output = output
+        self.error = error
+        self.variables = variables
+        self.collectedBribe = collectedBribe
+        self.fuelUsed = fuelUsed
+        self.elapsed = elapsed
+        self.bribes = bribes or {}
+        # Whether the run was replayed from a `ResultCache`
+        self.cached = cached
+
+    @property
+    def ok(self):
+        return self.error is None
+
+class Program:
+    """
+    A TaiScript program compiled once and run any number of times.
+
+    Lexing, parsing, type inference and loop invariant hoisting happen when
+    the program is compiled. Each run only executes the prepared AST. Runs
+    never print errors or end the process, they are returned in a
+    `RunResult`.
+
+    With a `ResultCache`, deterministic runs that were seen before are
+    replayed from it instead: their output, error, variables and written
+    files are the same, and the interpreter is left as it was.
+
+    Runs use one interpreter per program, which is reset before every run,
+    so loops the JIT compiled in earlier runs are reused. Pass `reset=False`
+    to carry the variables and bribes of the previous run over instead.
+    A program is not safe to run from several threads at once.
+    """
+    def __init__(self, ast, fuel=None, bribeFuel=False, ledgerPath=None, jitThreshold=JIT_THRESHOLD, metrics=None, directory=None, cache=None):
+        """
+        Args:
+            ast (list): The parsed program
+            fuel (int): Fuel budget of every run, unlimited if None
+            bribeFuel (bool): Whether `ghoos lo` also buys fuel
+            ledgerPath (str): SQLite file that keeps the bribe ledger, nothing
+                        is written if None
+            jitThreshold (int): Iterations after which a loop is compiled to a
+                        Python function, loops are never compiled if None
+            metrics (Metrics): Receives the timings and counts of compiling
+                        and running the program, nothing is counted if None
+            directory (str): Yojnas imported with `yojna lao` are relative
+                        to it, the current directory if None
+            cache (ResultCache): Where deterministic runs are remembered
+                        and replayed from, every run executes if None
+
+        Raises:
+            ImportError: If an imported yojna does not exist or imports are
+                        circular
+            TypeError: With every type error found in the program
+        """
+        ast = link_imports(ast, directory)
+        self.hash = program_hash(ast)
+        started = time.perf_counter()
+        self.ast = prepare_program(ast)
+        if (metrics is not None):
+            metrics.observe("taiscript_phase_seconds", time.perf_counter() - started, (("phase", "prepare"),))
+        money = next((statement for statement in ast if statement["type"] == "MONEY_MODE"), None)
+        # Converts text from outside, like `pucho` does for this program
+        self.parse_value = MoneyArithmetic(money["rounding"]).parse if money else parse_input_value
+        self.interpreter = Interpreter(fuel=fuel, bribeFuel=bribeFuel, ledgerPath=ledgerPath, jitThreshold=jitThreshold, metrics=metrics)
+        self.runs = 0
+        self.cache = cache
+        self.effects = ProgramEffects(self.ast) if cache is not None else None
+
+    @classmethod
+    def compile(cls, source, **options):
+        """
+        Args:
+            source (str): TaiScript source code
+            options: Passed on to `Program`
+
+        Raises:
+            SyntaxError: If the source can not be parsed
+            ImportError: If an imported yojna does not exist or imports are
+                        circular
+            TypeError: With every type error found in the program
+
+        Returns:
+            Program: The compiled program
+        """
+        started = time.perf_counter()
+        tokens = lexer(source)
+        lexed = time.perf_counter()
+        ast = Parser(tokens).parse()
+        metrics = options.get("metrics")
+        if (metrics is not None):
+            metrics.record_compile(len(tokens), ast, lexed - started, time.perf_counter() - lexed)
+        return cls(ast, **options)
+
+    def run(self, inputs=None, output=None, reset=True, variables=None):
+        """
+        Runs the program once
+
+        Args:
+            inputs (str | list | InputSource): What `pucho` reads, as text,
+                        a list of lines or an input source
+            output (TextIO): Where `ghoshna` prints to, the output is
+                        collected in the result if None
+            reset (bool): Whether to start from a fresh state, or keep the
+                        variables and bribes left by the previous run
+            variables (dict): Variables set before the first statement runs
+
+        Returns:
+            RunResult: Output, error and final state of the run
+        """
+        # Runs that keep the state of the previous run are never cached
+        key = self.cache.key(self, inputs, variables) if (self.cache is not None and (reset or not self.runs)) else None
+        if (key is not None):
+            cached = self.cache.get(key)
+            if (cached is not None):
+                return cached.replay(output)
+
+        interpreter = self.interpreter
+        if (reset and self.runs):
+            interpreter.reset()
+        self.runs += 1
+
+        if (inputs is None or isinstance(inputs, InputSource)):
+            interpreter.inputSource = inputs
+        elif (isinstance(inputs, str)):
+            interpreter.inputSource = TextInputSource(inputs)
+        else:
+            interpreter.inputSource = TextInputSource("\n".join(str(line) for line in inputs))
+
+        for name, value in (variables or {}).items():
+            interpreter.env.set_variable(name, value)
+
+        # Cached runs are collected first, the output is kept with them
+        sink = io.StringIO() if (output is None or key is not None) else output
+        interpreter.output = sink
+        fuel = interpreter.fuel
+        error = None
+        started = time.perf_counter()
+        try:
+            interpreter.run(self.ast, self.hash)
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - started
+        interpreter.globals.join_ropes()
+
+        result = RunResult(
+            output=sink.getvalue() if (output is None or key is not None) else None,
+            error=error,
+            variables=interpreter.globals.variables,
+            collectedBribe=interpreter.bribeManager.collectedBribe,
+            fuelUsed=0 if math.isinf(fuel) else fuel - interpreter.fuel,
+            elapsed=elapsed,
+            bribes={parichay: dict(totals) for parichay, totals in interpreter.bribeManager.ledger.totals.items()},
+        )
+        if (key is not None):
+            # Files left open are flushed, so their contents are complete
+            for file in interpreter.globals.files.values():
+                file.flush()
+            self.cache.put(key, result, self.effects.writes)
+            if (output is not None):
+                output.write(result.output)
+                result.output = None
+        return result
+
+    async def run_async(self, inputs=None, output=None, reset=True, variables=None):
+        """
+        Runs the program once, showing its output only after the delay of
+        its parichay (`Janta` and `Student` wait).
+
+        The program runs at full speed and its output is held, then
+        released on timers of the event loop, so one thread can serve many
+        delayed runs at once. Input from an `AsyncInputSource` is awaited
+        before the program starts.
+
+        Args:
+            inputs (str | list | InputSource): What `pucho` reads
+            output (TextIO): Where the output is released to, it is only
+                        collected in the result if None
+            reset (bool): Whether to start from a fresh state
+            variables (dict): Variables set before the first statement runs
+
+        Returns:
+            RunResult: Output, error and final state of the run, once all
+                of its output is released
+        """
+        if (isinstance(inputs, AsyncInputSource)):
+            await inputs.prefetch()
+        held = HeldOutput(lambda: self.interpreter.bribeManager.output_delay())
+        result = self.run(inputs, held, reset, variables)
+        await release_output(held, output)
+        if (output is None):
+            result.output = held.getvalue()
+        return result
@@ -0,0 +1,234 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from src.program import Program
+from src.columnar import ColumnarProgram
+from src.metrics import Metrics
+
+# Rows handed to a worker at a time, and written to the results together
+BATCH_SIZE = 1000
+
+# Batches queued per worker, enough to keep workers busy while the results
+# of earlier batches are written
+BATCHES_PER_WORKER = 2
+
+RESULT_COLUMNS = ("row", "status", "output", "error")
+
+IDENTIFIER_REGEX = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+# The program compiled once in each worker process, its columnar form if it
+# has one, and the metrics collected since the last batch
+workerProgram = None
+workerColumnar = None
+workerMetrics = None
+
+def start_worker(source, options, columnar=True, metrics=False):
+    """
+    Compiles the program when a worker process starts
+
+    Args:
+        source (str): TaiScript source code
+        options (dict): Passed on to `Program`
+        columnar (bool): Whether to run batches on columns when possible
+        metrics (bool): Whether to collect metrics for the parent process
+    """
+    global workerProgram, workerColumnar, workerMetrics
+    workerMetrics = Metrics() if metrics else None
+    workerProgram = Program.compile(source, metrics=workerMetrics, **options)
+    workerColumnar = ColumnarProgram(workerProgram) if (columnar and ColumnarProgram.supports(workerProgram)) else None
+
+def run_rows(program, columns, rows, first, columnar=None):
+    """
+    Runs a program once per row, with the columns of the row as variables
+
+    Args:
+        program (Program): The compiled program
+        columns (list): Names of the columns
+        rows (list): Fields of each row, as text
+        first (int): Number of the first row, counting from 1
+        columnar (ColumnarProgram): Runs all well-formed rows of the batch
+                        at once if given
+
+    Returns:
+        list: One (row, status, output, error) tuple per row
+    """
+    results = [None] * len(rows)
+    numbers = []
+    values = {name: [] for name in columns}
+    parse_value = program.parse_value
+    for position, row in enumerate(rows):
+        if (len(row) != len(columns)):
+            results[position] = (first + position, "failed", "", f"Row has {len(row)} fields, expected {len(columns)}.")
+            continue
+        numbers.append(position)
+        for name, text in zip(columns, row):
+            values[name].append(parse_value(text))
+
+    if (columnar is not None):
+        outcomes = columnar.run(values, len(numbers))
+    else:
+        outcomes = []
+        for index in range(len(numbers)):
+            result = program.run(variables={name: values[name][index] for name in columns})
+            outcomes.append((result.output, None if result.ok else str(result.error)))
+
+    for position, (output, error) in zip(numbers, outcomes):
+        if (error is None):
+            results[position] = (first + position, "ok", output.rstrip("\n"), "")
+        else:
+            results[position] = (first + position, "failed", output.rstrip("\n"), error)
+    return results
+
+def run_worker_batch(columns, rows, first):
+    """
+    Returns:
+        tuple: The results of the rows, and the metrics collected while
+            running them if the worker collects metrics
+    """
+    results = run_rows(workerProgram, columns, rows, first, workerColumnar)
+    return results, workerMetrics.drain() if workerMetrics is not None else None
+
+class RecordRunner:
+    """
+    Runs one TaiScript program over every row of a CSV file.
+
+    The program is compiled once (once per worker process), and each row
+    runs it from a fresh state with its columns bound as variables, so a
+    row costs one execution and nothing else. Rows are read, run and
+    written in batches of `batchSize`. With several workers the batches
+    run in parallel while at most `BATCHES_PER_WORKER` per worker are
+    queued, so memory stays flat however large the file is. Results are
+    written in the order of the rows.
+
+    Straight-line programs (no loops, files, input or `karam`) run a whole
+    batch at once on NumPy columns with `ColumnarProgram`, giving the same
+    results as running each row.
+    """
+    def __init__(self, source, workers=1, batchSize=BATCH_SIZE, columnar=True, metrics=None, **options):
+        """
+        Args:
+            source (str): TaiScript source code
+            workers (int): Worker processes, rows run in this process if 1
+                        and one worker per CPU if None
+            batchSize (int): Rows per batch
+            columnar (bool): Whether to run batches on columns when the
+                        program allows it
+            metrics (Metrics): Receives the metrics of every row, collected
+                        in the workers and added here after each batch
+            options: Passed on to `Program`
+
+        Raises:
+            SyntaxError: If the source can not be parsed
+            TypeError: With every type error found in the program
+        """
+        self.source = source
+        self.options = options
+        self.metrics = metrics
+        self.program = Program.compile(source, metrics=metrics, **options)
+        self.workers = workers or os.cpu_count() or 1
+        self.batchSize = batchSize
+        self.useColumnar = columnar
+        self.columnar = ColumnarProgram(self.program) if (columnar and ColumnarProgram.supports(self.program)) else None
+
+    def batches(self, reader):
+        """
+        Args:
+            reader (Iterator): Rows of the CSV file after the header
+
+        Yields:
+            tuple: The rows of a batch and the number of its first row
+        """
+        first = 1
+        while (True):
+            rows = list(islice(reader, self.batchSize))
+            if (not rows):
+                return
+            yield rows, first
+            first += len(rows)
+
+    def run(self, csvPath, resultsPath, metricsPath=None):
+        """
+        Runs the program over every row and writes one result per row
+
+        Args:
+            csvPath (str): CSV file whose header names the variables
+            resultsPath (str): CSV file the results are written to
+            metricsPath (str): File `metrics` is written to after every
+                        batch, for the Prometheus textfile collector
+
+        Raises:
+            RuntimeError: If a column name can not be a variable name
+
+        Returns:
+            dict: Rows run, rows failed, seconds taken and rows per second
+        """
+        started = time.perf_counter()
+        rowCount = 0
+        failed = 0
+        with open(csvPath, "r", newline="") as source, open(resultsPath, "w", newline="") as target:
+            reader = csv.reader(source)
+            columns = [name.strip() for name in next(reader, [])]
+            for name in columns:
+                if (not IDENTIFIER_REGEX.fullmatch(name)):
+                    raise RuntimeError(f"Column '{name}' can not be used as a variable name.")
+
+            writer = csv.writer(target)
+            writer.writerow(RESULT_COLUMNS)
+            for results in self.results(columns, self.batches(reader)):
+                writer.writerows(results)
+                rowCount += len(results)
+                failed += sum(1 for result in results if result[1] != "ok")
+                if (metricsPath):
+                    self.metrics.write(metricsPath)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rowCount,
+            "failed": failed,
+            "seconds": elapsed,
+            "rowsPerSecond": rowCount / elapsed if elapsed else 0.0,
+        }
+
+    def results(self, columns, batches):
+        """
+        Args:
+            columns (list): Names of the columns
+            batches (Iterator): Batches from `batches`
+
+        Yields:
+            list: Results of each batch, in the order of the batches
+        """
+        if (self.workers == 1):
+            for rows, first in batches:
+                yield run_rows(self.program, columns, rows, first, self.columnar)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=start_worker, initargs=(self.source, self.options, self.useColumnar, self.metrics is not None)) as pool:
+            pending = deque()
+            for rows, first in batches:
+                pending.append(pool.submit(run_worker_batch, columns, rows, first))
+                if (len(pending) >= self.workers * BATCHES_PER_WORKER):
+                    yield self.collect(pending.popleft())
+            while (pending):
+                yield self.collect(pending.popleft())
+
+    def collect(self, future):
+        """
+        Args:
+            future (Future): A batch submitted to a worker
+
+        Returns:
+            list: Results of the batch, its metrics are added to `metrics`
+        """
+        results, metrics = future.result()
+        if (metrics is not None):
+            self.metrics.merge(metrics)
+        return results
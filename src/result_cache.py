@@ -0,0 +1,222 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import copy
+import datetime
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from src.input_source import InputSource
+
+# Runs remembered per cache
+RESULT_CACHE_SIZE = 256
+
+class ProgramEffects:
+    """
+    What a program reads and writes outside of its variables, found once
+    from its prepared AST. File names in TaiScript are always literals, so
+    every file a run can touch is known before it runs.
+    """
+    def __init__(self, ast):
+        """
+        Args:
+            ast (list): The prepared program, imports linked
+        """
+        self.usesInput = False
+        self.reads = []
+        self.writes = []
+        self.collect(ast)
+
+    def collect(self, statements):
+        for statement in statements or []:
+            statementType = statement["type"]
+            if (statementType == "INPUT"):
+                self.usesInput = True
+            elif (statementType == "FILE_OPEN"):
+                names = self.reads if statement.get("read") else self.writes
+                if (statement["file_name"] not in names):
+                    names.append(statement["file_name"])
+            elif (statementType == "IMPORT" and "module" in statement):
+                for module in statement["module"].order:
+                    self.collect(module.declarations)
+            for key in ("body", "if", "else"):
+                if (isinstance(statement.get(key), list)):
+                    self.collect(statement[key])
+
+def clock_bucket():
+    """
+    Returns:
+        int: The year `BribeManager.calculate_base_bribe` prices bribes by,
+            the only part of the clock a run can depend on
+    """
+    return datetime.datetime.now().year
+
+def file_digest(path):
+    """
+    Returns:
+        str: SHA-256 of the file, None if it can not be read
+    """
+    try:
+        with open(path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+    except OSError:
+        return None
+
+class CachedRun:
+    """
+    Everything a deterministic run left behind: its output, error, final
+    variables, bribes and fuel, and the contents of the files it wrote.
+    """
+    def __init__(self, result, files):
+        """
+        Args:
+            result (RunResult): The result of the run
+            files (dict): Contents of every file the run wrote, by absolute
+                        path
+        """
+        self.output = result.output
+        self.error = result.error
+        # Copied, a later run with `reset=False` changes the variables in place
+        self.variables = copy.deepcopy(result.variables)
+        self.collectedBribe = result.collectedBribe
+        self.fuelUsed = result.fuelUsed
+        self.bribes = result.bribes
+        self.files = files
+
+    def replay(self, output=None):
+        """
+        Writes the files of the run again and returns its result
+
+        Args:
+            output (TextIO): Where the output is written to, it is only
+                        returned in the result if None
+
+        Returns:
+            RunResult: The result of the cached run
+        """
+        from src.program import RunResult
+
+        started = time.perf_counter()
+        for path, content in self.files.items():
+            with open(path, "w") as file:
+                file.write(content)
+        if (output is not None):
+            output.write(self.output)
+        return RunResult(
+            output=self.output if output is None else None,
+            error=self.error,
+            variables=dict(self.variables),
+            collectedBribe=self.collectedBribe,
+            fuelUsed=self.fuelUsed,
+            elapsed=time.perf_counter() - started,
+            bribes={parichay: dict(totals) for parichay, totals in self.bribes.items()},
+            cached=True,
+        )
+
+class ResultCache:
+    """
+    Results of deterministic runs, replayed instead of running again.
+
+    A run is deterministic when it only depends on what it is given: the
+    compiled program (imported yojnas included), the text `pucho` reads,
+    the variables set before it starts, the files it reads and the year
+    bribes are priced by. The key hashes all of them. Runs that read `pucho`
+    from the keyboard or from an `InputSource`, and programs that write a
+    bribe ledger, are never cached.
+
+    At most `size` runs are kept, dropping the least recently used. One
+    cache can be shared by several programs and threads.
+    """
+    def __init__(self, size=RESULT_CACHE_SIZE):
+        """
+        Args:
+            size (int): Runs kept at most
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, program, inputs, variables):
+        """
+        Args:
+            program (Program): The program about to run
+            inputs (str | list | InputSource): What `pucho` reads
+            variables (dict): Variables set before the first statement runs
+
+        Returns:
+            str: The key of the run, None if the run can not be cached
+        """
+        interpreter = program.interpreter
+        effects = program.effects
+        if (interpreter.ledgerPath or isinstance(inputs, InputSource)):
+            return None
+        if (inputs is None and effects.usesInput):
+            return None
+
+        if (inputs is None):
+            text = ""
+        elif (isinstance(inputs, str)):
+            text = inputs
+        else:
+            text = "\n".join(str(line) for line in inputs)
+        parts = [
+            program.hash,
+            text,
+            repr(sorted((variables or {}).items())),
+            repr((interpreter.fuelBudget, interpreter.bribeFuel)),
+            str(clock_bucket()),
+        ]
+        for name in effects.reads:
+            path = os.path.abspath(name)
+            parts.append(f"{path}:{file_digest(path)}")
+        # Relative names are written somewhere else from another directory
+        for name in effects.writes:
+            parts.append(os.path.abspath(name))
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Key of the run
+
+        Returns:
+            CachedRun: The cached run, None if there is none
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if (entry is None):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, result, writes):
+        """
+        Keeps a finished run
+
+        Args:
+            key (str): Key of the run
+            result (RunResult): The result of the run
+            writes (list): Names of the files the program opens for writing
+        """
+        files = {}
+        for name in writes:
+            path = os.path.abspath(name)
+            try:
+                with open(path, "r") as file:
+                    files[path] = file.read()
+            except OSError:
+                # Not written by this run
+                pass
+        entry = CachedRun(result, files)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if (len(self.entries) > self.size):
+                self.entries.popitem(last=False)
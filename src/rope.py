@@ -0,0 +1,113 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Text shorter than this is still copied on `me jodo`, which is faster than
+# keeping its pieces
+ROPE_MIN_LENGTH = 256
+
+# Expressions that may append to the text in a variable, the ones whose
+# left operand is known to be a number are specialised to other nodes
+APPEND_NODES = ("BINARY_EXPRESSION", "CONCAT", "CONCAT_RIGHT")
+
+class Rope:
+    """
+    Text built by `likho report report me jodo ...`, kept as the list of
+    pieces appended instead of one string.
+
+    The pieces list is shared by a rope and the ropes appended to it: a
+    rope is the first `count` pieces of the list. Appending to the rope
+    that ends the list adds the piece in place, so building text in a loop
+    costs the length of the pieces, not the length of the text on every
+    iteration. Appending to an older rope copies its pieces first, so a
+    rope never changes once made.
+
+    Ropes only live in variables. Reading the variable with
+    `Environment.get_variable` joins the pieces into a string once, which
+    is what printing, writing, comparing and interpolating see.
+    """
+    __slots__ = ("parts", "count", "text")
+
+    def __init__(self, parts, count):
+        """
+        Args:
+            parts (list): Pieces of the text, possibly shared
+            count (int): How many of the pieces belong to this rope
+        """
+        self.parts = parts
+        self.count = count
+        self.text = None
+
+    def append(self, piece):
+        """
+        Args:
+            piece (str): Text added at the end
+
+        Returns:
+            Rope: The longer text
+        """
+        parts = self.parts
+        if (len(parts) != self.count):
+            parts = parts[:self.count]
+        parts.append(piece)
+        return Rope(parts, self.count + 1)
+
+    def __str__(self):
+        if (self.text is None):
+            parts = self.parts
+            self.text = "".join(parts if len(parts) == self.count else parts[:self.count])
+        return self.text
+
+    def __len__(self):
+        return len(str(self))
+
+    def __eq__(self, other):
+        if (isinstance(other, (Rope, str))):
+            return str(self) == str(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __reduce__(self):
+        # Pickled as the joined text, without pieces appended by other ropes
+        return (Rope, ([str(self)], 1))
+
+def appendable(value):
+    """
+    Args:
+        value (Any): Value of a variable
+
+    Returns:
+        bool: Whether `me jodo` on the variable should append to it as a
+            rope, text that is short or not text at all is concatenated as
+            usual
+    """
+    return type(value) is Rope or (type(value) is str and len(value) >= ROPE_MIN_LENGTH)
+
+def append(current, value):
+    """
+    Appends to text held in a variable, the way `me jodo` concatenates a
+    string with any value
+
+    Args:
+        current (str | Rope): Text in the variable, `appendable`
+        value (Any): Value of the right operand
+
+    Returns:
+        Rope: The longer text
+    """
+    piece = value if isinstance(value, str) else str(value)
+    if (type(current) is Rope):
+        return current.append(piece)
+    return Rope([current, piece], 2)
+
+def joined(value):
+    """
+    Returns:
+        Any: The value, with a rope joined into a string
+    """
+    return str(value) if type(value) is Rope else value
@@ -0,0 +1,168 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.modules import link_imports
+from src.input_source import FileInputSource
+from src.utils.helper import ComplexityAnalyser
+
+# Estimated cost from which a program is sent to the dedicated workers, so
+# it can not hold up the short programs queued behind it.
+LONG_JOB_COST = 1_000_000
+
+def run_job(job):
+    """
+    Runs one queued program inside a worker process.
+
+    Args:
+        job (dict): The parsed program, its input file and its estimate
+
+    Returns:
+        dict: The job with the printed output, its status and the measured
+            runtime in seconds
+    """
+    from src.interpreter import Interpreter
+
+    output = io.StringIO()
+    status = "ok"
+    inputSource = FileInputSource(job["input"] or os.devnull)
+    interpreter = Interpreter(inputSource)
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(output):
+            interpreter.interpret(job["ast"])
+    except SystemExit:
+        status = "failed"
+    except Exception as e:
+        output.write(f"Error: {e}\n")
+        status = "failed"
+    finally:
+        interpreter.close()
+        inputSource.close()
+
+    return {
+        "file": job["file"],
+        "estimate": job["estimate"],
+        "long": job["long"],
+        "actual": time.perf_counter() - started,
+        "output": output.getvalue(),
+        "status": status,
+    }
+
+class BatchScheduler:
+    """
+    Runs a batch of TaiScript programs shortest-job-first.
+
+    Every program is parsed and given a static cost estimate before anything
+    runs. Programs are then queued cheapest first on a shared pool of
+    workers, while programs estimated at `longJobCost` or more go to a small
+    pool of their own. Results keep the estimate next to the measured
+    runtime, so the cost model can be calibrated against real runs.
+    """
+    def __init__(self, workers=None, dedicatedWorkers=1, longJobCost=LONG_JOB_COST):
+        self.workers = workers or os.cpu_count() or 1
+        self.dedicatedWorkers = dedicatedWorkers
+        self.longJobCost = longJobCost
+        self.analyser = ComplexityAnalyser()
+
+    def plan(self, files, inputs=None):
+        """
+        Parses and estimates every program, in the order they will be run
+
+        Args:
+            files (list): Paths of the TaiScript programs
+            inputs (dict): Optional input file per program path
+
+        Returns:
+            list: One job per program, cheapest first. Programs that do not
+                parse, or whose imports can not be loaded, carry the error
+                instead of an AST.
+        """
+        inputs = inputs or {}
+        jobs = []
+        for fileName in files:
+            job = {"file": fileName, "input": inputs.get(fileName), "ast": None, "estimate": 0, "long": False, "error": None}
+            try:
+                with open(fileName, "r") as file:
+                    ast = Parser(lexer(file.read())).parse()
+                # Imports are relative to the importing file
+                job["ast"] = link_imports(ast, os.path.dirname(os.path.abspath(fileName)))
+                job["estimate"] = self.analyser.estimate_cost(job["ast"])
+                job["long"] = job["estimate"] >= self.longJobCost
+            except (OSError, SyntaxError, ImportError) as e:
+                job["error"] = str(e)
+            jobs.append(job)
+
+        # sorted() is stable, so equal estimates keep their queue order
+        return sorted(jobs, key=lambda job: job["estimate"])
+
+    def run(self, files, inputs=None):
+        """
+        Runs a batch of programs
+
+        Args:
+            files (list): Paths of the TaiScript programs
+            inputs (dict): Optional input file per program path, programs
+                        without one get no input
+
+        Returns:
+            list: One result per program, in the order they were scheduled
+        """
+        jobs = self.plan(files, inputs)
+        pools = {}
+        if (any(not job["long"] and not job["error"] for job in jobs)):
+            pools[False] = ProcessPoolExecutor(max_workers=self.workers)
+        if (any(job["long"] and not job["error"] for job in jobs)):
+            pools[True] = ProcessPoolExecutor(max_workers=self.dedicatedWorkers)
+
+        try:
+            futures = []
+            for job in jobs:
+                if (job["error"]):
+                    futures.append(None)
+                else:
+                    futures.append(pools[job["long"]].submit(run_job, job))
+
+            results = []
+            for job, future in zip(jobs, futures):
+                if (future is None):
+                    results.append({
+                        "file": job["file"], "estimate": job["estimate"], "long": job["long"], "actual": 0.0,
+                        "output": f"Error: {job['error']}\n", "status": "failed",
+                    })
+                else:
+                    results.append(future.result())
+            return results
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+
+    def report(self, results):
+        """
+        Formats estimated and measured cost side by side
+
+        Args:
+            results (list): Results returned by `run`
+
+        Returns:
+            str: A table with one row per program and the overall rate
+        """
+        width = max([len("Program")] + [len(result["file"]) for result in results])
+        lines = [f"{'Program':<{width}}  {'Estimate':>12}  {'Actual (s)':>10}  {'us/unit':>9}  {'Worker':<9}  Status"]
+        for result in results:
+            rate = result["actual"] * 1e6 / result["estimate"] if result["estimate"] else 0.0
+            worker = "dedicated" if result["long"] else "shared"
+            lines.append(f"{result['file']:<{width}}  {result['estimate']:>12}  {result['actual']:>10.4f}  {rate:>9.3f}  {worker:<9}  {result['status']}")
+
+        totalEstimate = sum(result["estimate"] for result in results)
+        totalActual = sum(result["actual"] for result in results)
+        if (totalEstimate):
+            lines.append(f"Overall: {totalActual * 1e6 / totalEstimate:.3f} us per estimated unit")
+        return "\n".join(lines)
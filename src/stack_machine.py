@@ -0,0 +1,327 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.type_inference import SPECIALISED_NODES
+from src.error_handler import FuelExhausted
+from src.input_source import parse_input_value
+from src.rope import APPEND_NODES
+from src.control_flow import BREAK, RETURN
+
+# Continuation records pushed on the work stack next to statements. A
+# statement is a dict, a continuation is a tuple or list starting with one
+# of these.
+LOOP_NEXT = 0
+FILE_LOOP_NEXT = 1
+
+# Returned by `run` when a `pucho` has to wait for input. The `pucho` is
+# left on top of the work stack, so `run` continues with it.
+WAIT_INPUT = 3
+
+# Instructions of the postfix code expressions are compiled to
+LOAD = 0
+CONSTANT = 1
+SPECIALISED = 2
+OPERATOR = 3
+INVARIANT = 4
+DELEGATE = 5
+
+class StackMachine:
+    """
+    Runs statements and evaluates expressions with an explicit work stack
+    instead of recursing through `Interpreter.execute` and
+    `Interpreter.evaluate`.
+
+    Blocks are pushed on the stack in reverse, so the next statement to run
+    is always on top. A loop pushes a continuation record under its body,
+    which moves the loop variable on and pushes the body again when the
+    body is done. `bijli chali gayi` pops the stack down to the record of
+    the innermost loop and ends it, `sarkar gir gayi` empties the stack,
+    ending every loop on it. Expressions are flattened once into postfix
+    code, which runs in a single loop over a value stack. Nesting only
+    grows the stacks, never the Python call stack, so `agar` and
+    `ginti karo` thousands of levels deep run, and each node costs a loop
+    iteration instead of a Python call.
+
+    Bribes, fuel, metrics and errors are handled exactly like on the
+    recursive walker: every statement is validated before it runs,
+    `BribeManager.loop_inc` and `loop_dec` are called at the same points
+    and statements without blocks are handed to `Interpreter.execute`.
+    Loops are never compiled by the JIT in this mode.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        # Postfix code of every expression evaluated so far
+        self.codes = {}
+
+    def execute(self, statement):
+        """
+        Runs a statement and everything nested in it
+
+        Args:
+            statement (dict): Dictionary representing statements
+
+        Returns:
+            int: The signal `run` ended with
+        """
+        return self.run([statement])
+
+    def run(self, stack, pausable=False):
+        """
+        Runs statements until the work stack is empty
+
+        Args:
+            stack (list): Statements to run, the last one first
+            pausable (bool): Whether to stop at a `pucho` whose input has
+                        not arrived yet instead of reading the stream
+
+        Returns:
+            int: `RETURN` if a function body returned, `BREAK` if a
+                `bijli chali gayi` was not inside a loop on this stack,
+                `WAIT_INPUT` if a `pucho` has to wait, None when the stack
+                ran out
+        """
+        interpreter = self.interpreter
+        env = interpreter.env
+        while (stack):
+            item = stack.pop()
+            if (type(item) is not dict):
+                if (item[0] == LOOP_NEXT):
+                    var = item[2]
+                    env.set_variable(var, env.get_variable(var) + item[4])
+                    self.loop_continue(item, stack)
+                else:
+                    self.file_loop_continue(item, stack)
+                continue
+
+            statementType = item["type"]
+            if (statementType not in ("VAR_DECL", "PRINT", "CONDITIONAL", "LOOP", "FILE_LOOP", "BREAK", "RETURN") or item.get("parallel")):
+                if (pausable and statementType == "INPUT" and not interpreter.inputSource.ready()):
+                    stack.append(item)
+                    return WAIT_INPUT
+                interpreter.execute(item)
+                continue
+
+            if (interpreter.statementCounts is not None):
+                interpreter.statementCounts[statementType] = interpreter.statementCounts.get(statementType, 0) + 1
+            interpreter.bribeManager.validate_bribe(item)
+
+            if (statementType == "VAR_DECL"):
+                value = item["value"]
+                if (value and value.get("type") in APPEND_NODES and value["operator"] == "me jodo"):
+                    appended = interpreter.append_text(value)
+                    if (appended is not None):
+                        env.set_variable(item["variable"], appended)
+                        continue
+                env.set_variable(item["variable"], self.evaluate(value) if value else None)
+            elif (statementType == "PRINT"):
+                interpreter.print_value(item, self.evaluate(item["value"]))
+            elif (statementType == "CONDITIONAL"):
+                if (self.evaluate(item["condition"])):
+                    if ("if" in item and item["if"]):
+                        branch = item["if"]
+                    else:
+                        raise RuntimeError("Missing 'if' branch in conditional.")
+                elif ("else" in item and item["else"]):
+                    branch = item["else"]
+                else:
+                    continue
+                interpreter.charge_fuel(len(branch))
+                stack.extend(reversed(branch))
+            elif (statementType == "LOOP"):
+                if (not interpreter.vectorizer.try_execute(item)):
+                    self.loop_start(item, stack)
+            elif (statementType == "BREAK"):
+                # Everything above the innermost loop's record is its body
+                while (stack):
+                    item = stack.pop()
+                    if (type(item) is not dict):
+                        self.loop_end(item)
+                        break
+                else:
+                    return BREAK
+            elif (statementType == "RETURN"):
+                if (interpreter.callDepth == 0):
+                    raise RuntimeError("'sarkar gir gayi' can only be used inside a 'karam'.")
+                interpreter.returnValue = self.evaluate(item["value"]) if item["value"] else None
+                while (stack):
+                    item = stack.pop()
+                    if (type(item) is not dict):
+                        self.loop_end(item)
+                return RETURN
+            else:
+                reader = env.get_reader(item["alias"])
+                interpreter.bribeManager.loop_inc()
+                self.file_loop_continue([FILE_LOOP_NEXT, item, reader, len(item["body"]) or 1, 0], stack)
+        return None
+
+    def loop_start(self, statement, stack):
+        """
+        Sets the loop variable to its start and pushes the first iteration,
+        like `Interpreter.execute_loop`
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            stack (list): The work stack
+        """
+        interpreter = self.interpreter
+        interpreter.bribeManager.loop_inc()
+
+        for slot in statement.get("invariants", ()):
+            interpreter.invariantCache.pop(slot, None)
+
+        var = statement["variable"]
+        start = self.evaluate(statement["start"])
+        end = self.evaluate(statement["end"])
+        increment = statement.get("increment", 1)
+        if (isinstance(increment, dict)):
+            increment = self.evaluate(increment)
+
+        if (not isinstance(start, int) or not isinstance(end, int) or not isinstance(increment, int)):
+            raise RuntimeError(f"Loop boundaries and increment must be integers. Got: start={start}, end={end}, increment={increment}")
+
+        interpreter.env.set_variable(var, start)
+        self.loop_continue((LOOP_NEXT, statement, var, end, increment, len(statement["body"]) or 1), stack)
+
+    def loop_continue(self, frame, stack):
+        """
+        Pushes the next iteration of a loop, or ends it
+
+        Args:
+            frame (tuple): The loop's continuation record
+            stack (list): The work stack
+        """
+        interpreter = self.interpreter
+        _, statement, var, end, increment, cost = frame
+        value = interpreter.env.get_variable(var)
+        if ((value <= end) if increment > 0 else (value >= end)):
+            interpreter.loopIterations += 1
+            interpreter.fuel -= cost
+            if (interpreter.fuel < 0):
+                raise FuelExhausted(interpreter.fuelBudget)
+            stack.append(frame)
+            stack.extend(reversed(statement["body"]))
+        else:
+            self.loop_end(frame)
+
+    def file_loop_continue(self, frame, stack):
+        """
+        Pushes the iteration for the next line of a file, or ends the loop
+        at the end of the file
+
+        Args:
+            frame (list): The loop's continuation record
+            stack (list): The work stack
+        """
+        interpreter = self.interpreter
+        _, statement, reader, cost, lines = frame
+        line = reader.read_line()
+        if (line is None):
+            self.loop_end(frame)
+            return
+
+        frame[4] += 1
+        interpreter.fuel -= cost
+        if (interpreter.fuel < 0):
+            raise FuelExhausted(interpreter.fuelBudget)
+        interpreter.env.set_variable(statement["variable"], interpreter.money.parse(line) if interpreter.money else parse_input_value(line))
+        stack.append(frame)
+        stack.extend(reversed(statement["body"]))
+
+    def loop_end(self, frame):
+        """
+        Ends a loop, when it ran out or was left early
+
+        Args:
+            frame (tuple | list): The loop's continuation record
+        """
+        interpreter = self.interpreter
+        if (frame[0] == FILE_LOOP_NEXT):
+            interpreter.loopIterations += frame[4]
+        interpreter.bribeManager.loop_dec()
+
+    def evaluate(self, expression):
+        """
+        Evaluates an expression like `Interpreter.evaluate`, by running its
+        postfix code
+
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            Any: Result of evaluated expressions
+        """
+        if (not expression):
+            return None
+        entry = self.codes.get(id(expression))
+        if (entry is None):
+            entry = self.codes[id(expression)] = (expression, self.compile(expression))
+        return self.run_code(entry[1])
+
+    def run_code(self, code):
+        """
+        Args:
+            code (list): Postfix code built by `compile`
+
+        Returns:
+            Any: The value the code leaves on the value stack
+        """
+        interpreter = self.interpreter
+        env = interpreter.env
+        values = []
+        for op, arg in code:
+            if (op == LOAD):
+                values.append(env.get_variable(arg))
+            elif (op == CONSTANT):
+                values.append(arg)
+            elif (op == SPECIALISED):
+                right = values.pop()
+                values[-1] = arg(values[-1], right)
+            elif (op == OPERATOR):
+                right = values.pop()
+                values[-1] = interpreter.operate(arg, values[-1], right)
+            elif (op == INVARIANT):
+                slot, valueCode = arg
+                if (slot not in interpreter.invariantCache):
+                    interpreter.invariantCache[slot] = self.run_code(valueCode)
+                values.append(interpreter.invariantCache[slot])
+            else:
+                values.append(interpreter.evaluate(arg))
+        return values[-1]
+
+    def compile(self, expression):
+        """
+        Flattens an expression into postfix code, operands before their
+        operator, without recursing into binary expressions
+
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            list: (op, argument) pairs for `run_code`
+        """
+        code = []
+        work = [expression]
+        while (work):
+            node = work.pop()
+            if (type(node) is tuple):
+                code.append(node)
+                continue
+
+            nodeType = node.get("type")
+            specialised = SPECIALISED_NODES.get(nodeType)
+            if (nodeType == "NUMBER"):
+                code.append((CONSTANT, node["value"]))
+            elif (nodeType == "IDENTIFIER"):
+                code.append((LOAD, node["name"]))
+            elif (specialised is not None or ("left" in node and "operator" in node and "right" in node)):
+                # Popped in reverse: left operand, right operand, operator
+                work.append((SPECIALISED, specialised) if specialised is not None else (OPERATOR, node["operator"]))
+                work.append(node["right"])
+                work.append(node["left"])
+            elif (nodeType == "INVARIANT"):
+                code.append((INVARIANT, (node["slot"], self.compile(node["value"]))))
+            else:
+                code.append((DELEGATE, node))
+        return code
@@ -0,0 +1,355 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import operator
+from src.utils.helper import assigned_names, trampoline
+
+NUMERIC_TYPES = ("int", "float", "num", "bool")
+ORDERING_OPERATORS = ("bada hai", "chota hai", "bada ya barabar hai", "chota ya barabar hai")
+
+# Operations for the specialised nodes emitted by `TypeInferrer`. They skip
+# the type and zero checks done by the generic path of `Interpreter.evaluate`.
+SPECIALISED_NODES = {
+    "INT_ADD": operator.add,
+    "NUM_ADD": operator.add,
+    "CONCAT": operator.add,
+    "CONCAT_LEFT": lambda left, right: str(left) + right,
+    "CONCAT_RIGHT": lambda left, right: left + str(right),
+    "DIV_NONZERO": operator.truediv,
+    "MOD_NONZERO": operator.mod,
+}
+
+class TypeInferrer:
+    """
+    Works out which expressions are always int, float or string and rewrites
+    them into specialised nodes.
+
+    Types are tracked per variable through the program. Branches of `agar`
+    are merged, and loop bodies are analysed until the variable types stop
+    changing. A path ending in `bijli chali gayi` or `sarkar gir gayi`
+    does not reach the statements after it: the types at a break are merged
+    into the types after its loop instead. Anything that can not be known before running has no type
+    (None) and keeps its generic node.
+
+    The walk is written as generators run by `trampoline`, so blocks and
+    expressions nested thousands of levels deep do not recurse.
+    """
+    def __init__(self, money=False):
+        """
+        Args:
+            money (bool): Whether the program counts in paise, where
+                        division gives rupees and paise instead of floats
+        """
+        self.variables = {}
+        self.errors = []
+        self.money = money
+        # Types at each `bijli chali gayi` of the innermost loop
+        self.breaks = None
+        # Whether the current path already left its loop or function
+        self.exited = False
+
+    def infer(self, ast):
+        """
+        Analyses the program and returns a copy with specialised nodes
+
+        Args:
+            ast (list): List of statement from AST
+
+        Raises:
+            TypeError: With every type error found in the program
+
+        Returns:
+            list: The rewritten AST
+        """
+        self.variables = {}
+        self.errors = []
+        self.breaks = None
+        self.exited = False
+        result = trampoline(self.block(ast))
+        if (self.errors):
+            raise TypeError("\n".join(self.errors))
+        return result
+
+    def error(self, message):
+        """
+        Records a type error. The errors of a pass over a loop body whose
+        types are not stable yet are dropped by `loop`.
+
+        Args:
+            message (str): Description of the error
+        """
+        if (message not in self.errors):
+            self.errors.append(message)
+
+    def block(self, statements):
+        """
+        Args:
+            statements (list): List of statements
+
+        Returns:
+            generator: The rewritten statements
+        """
+        result = []
+        for s in statements:
+            result.append((yield self.statement(s)))
+        return result
+
+    def merge(self, first, second):
+        """
+        Merges the variable types of two paths through the program
+
+        Args:
+            first (dict): Variable types on one path
+            second (dict): Variable types on the other path
+
+        Returns:
+            dict: Types that are the same on both paths, None otherwise
+        """
+        merged = {}
+        for name in first.keys() | second.keys():
+            merged[name] = first.get(name) if first.get(name) == second.get(name) else None
+        return merged
+
+    def statement(self, statement):
+        """
+        Infers the types inside a statement
+
+        Args:
+            statement (dict): A dictionary representing the statement
+
+        Returns:
+            generator: The rewritten statement
+        """
+        statementType = statement["type"]
+
+        if (statementType == "VAR_DECL"):
+            value, valueType = yield self.expression(statement["value"])
+            self.variables[statement["variable"]] = valueType
+            return dict(statement, value=value)
+        elif (statementType in ("PRINT", "FILE_WRITE", "ARRAY_APPEND", "RETURN")):
+            value, _ = yield self.expression(statement["value"])
+            if (statementType == "RETURN"):
+                self.exited = True
+            return dict(statement, value=value)
+        elif (statementType == "BREAK"):
+            if (self.breaks is not None):
+                self.breaks.append(dict(self.variables))
+            self.exited = True
+        elif (statementType == "FUNCTION_DECL"):
+            # Parameters and globals can hold anything when the function runs
+            variables, breaks, exited = self.variables, self.breaks, self.exited
+            self.variables, self.breaks, self.exited = {}, None, False
+            body = yield self.block(statement["body"])
+            self.variables, self.breaks, self.exited = variables, breaks, exited
+            return dict(statement, body=body)
+        elif (statementType == "ARRAY_DECL"):
+            self.variables[statement["variable"]] = "array"
+        elif (statementType == "STRUCT_INSTANCE"):
+            self.variables[statement["instance_name"]] = None
+        elif (statementType == "INPUT"):
+            self.variables[statement["name"]] = None
+        elif (statementType == "CONDITIONAL"):
+            return (yield self.conditional(statement))
+        elif (statementType in ("LOOP", "FILE_LOOP")):
+            return (yield self.loop(statement))
+
+        return statement
+
+    def conditional(self, statement):
+        """
+        Args:
+            statement (dict): A dictionary representing conditional statement
+
+        Returns:
+            generator: The rewritten statement
+        """
+        condition, _ = yield self.expression(statement["condition"])
+        entry = dict(self.variables)
+        exited = self.exited
+
+        self.exited = False
+        ifBranch = (yield self.block(statement["if"])) if statement.get("if") else statement.get("if")
+        afterIf, ifExited = self.variables, self.exited
+
+        self.variables = dict(entry)
+        self.exited = False
+        elseBranch = (yield self.block(statement["else"])) if statement.get("else") else statement.get("else")
+        # Only the branches that carry on decide the types after the agar
+        if (ifExited and not self.exited):
+            pass
+        elif (self.exited and not ifExited):
+            self.variables = afterIf
+        else:
+            self.variables = self.merge(afterIf, self.variables)
+        self.exited = exited or (ifExited and self.exited)
+
+        return dict(statement, condition=condition, **{"if": ifBranch, "else": elseBranch})
+
+    def loop(self, statement):
+        """
+        Analyses the loop body until the variable types are stable
+
+        Variables first assigned in the body start out unknown, as they are
+        after an iteration. Most loops are then stable after one pass, which
+        is also the pass that is kept, so nested loops are not analysed
+        again for every pass over the loops around them.
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Returns:
+            generator: The rewritten statement
+        """
+        var = statement["variable"]
+        # Lines of a file can be numbers or strings
+        varType = None
+        if (statement["type"] == "LOOP"):
+            varType = "int"
+            end = statement["end"]
+            # "num" and "bool" may still hold an int when the loop runs
+            if (end.get("type") == "IDENTIFIER" and self.variables.get(end["name"]) in ("float", "string", "array")):
+                self.error(f"Loop boundary '{end['name']}' must be an integer.")
+
+        entry = dict.fromkeys(assigned_names(statement["body"]))
+        entry.update(self.variables)
+        entry[var] = varType
+        state = entry
+        errors, breaks, exited = self.errors, self.breaks, self.exited
+        while (True):
+            self.variables = dict(state)
+            self.errors, self.breaks, self.exited = [], [], False
+            body = yield self.block(statement["body"])
+            # A body that always leaves never reaches the next iteration
+            merged = entry if self.exited else self.merge(entry, dict(self.variables, **{var: varType}))
+            if (merged == state):
+                break
+            state = merged
+
+        found, self.errors = self.errors, errors
+        for message in found:
+            self.error(message)
+        after = dict(state)
+        for types in self.breaks:
+            after = self.merge(after, types)
+        self.variables = after
+        self.breaks, self.exited = breaks, exited
+        return dict(statement, body=body)
+
+    def expression(self, expression):
+        """
+        Infers the type of an expression
+
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            generator: The rewritten expression and its type ("int", "float",
+                "num", "string", "bool", "array" or None when unknown)
+        """
+        if (not expression):
+            return expression, None
+
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            return (yield self.binary(expression))
+
+        exprType = expression["type"]
+        if (exprType == "NUMBER"):
+            return expression, "float" if isinstance(expression["value"], float) else "int"
+        elif (exprType == "STRING"):
+            return expression, "string"
+        elif (exprType == "IDENTIFIER"):
+            return expression, self.variables.get(expression["name"])
+        elif (exprType == "ARRAY_INDEX"):
+            return expression, "num"
+        elif (exprType == "ARRAY_SLICE"):
+            return expression, "array"
+        elif (exprType == "ARRAY_AGGREGATE"):
+            return expression, "int" if expression["function"] == "sankhya" else "num"
+        return expression, None
+
+    def numeric_result(self, leftType, rightType):
+        """
+        Args:
+            leftType (str): Type of the left operand
+            rightType (str): Type of the right operand
+
+        Returns:
+            str: Type of an arithmetic result on two numeric operands
+        """
+        if (leftType == "float" or rightType == "float"):
+            return "float"
+        if (leftType == "num" or rightType == "num"):
+            return "num"
+        return "int"
+
+    def binary(self, expression):
+        """
+        Infers the type of a binary expression and picks a specialised node
+
+        Args:
+            expression (dict): A dictionary representing the binary expression
+
+        Returns:
+            generator: The rewritten expression and its type
+        """
+        left, leftType = yield self.expression(expression["left"])
+        right, rightType = yield self.expression(expression["right"])
+        op = expression["operator"]
+        node = dict(expression, left=left, right=right)
+        numeric = leftType in NUMERIC_TYPES and rightType in NUMERIC_TYPES
+
+        if (op in ORDERING_OPERATORS):
+            if ((leftType == "string" and rightType in NUMERIC_TYPES)
+                    or (rightType == "string" and leftType in NUMERIC_TYPES)):
+                self.error(f"Cannot compare a string with a number using '{op}'.")
+            return node, "bool"
+        elif (op in ("barabar hai", "alag hai")):
+            return node, "bool"
+
+        if ("array" in (leftType, rightType) and not (op == "me jodo" and "string" in (leftType, rightType))):
+            self.error(f"Cannot use '{op}' on a suchi.")
+            return node, None
+
+        if (op == "me jodo"):
+            if (leftType == "string" and rightType == "string"):
+                node["type"] = "CONCAT"
+            elif (leftType == "string" and rightType is not None):
+                node["type"] = "CONCAT_RIGHT"
+            elif (rightType == "string" and leftType is not None):
+                node["type"] = "CONCAT_LEFT"
+            elif (numeric):
+                resultType = self.numeric_result(leftType, rightType)
+                node["type"] = "INT_ADD" if resultType == "int" else "NUM_ADD"
+                return node, resultType
+            else:
+                return node, "string" if "string" in (leftType, rightType) else None
+            return node, "string"
+
+        if (op == "me guna karo" and "string" in (leftType, rightType)):
+            other = rightType if leftType == "string" else leftType
+            if (other in ("string", "float", "num")):
+                self.error("Cannot use 'me guna karo' on a string with anything other than an integer.")
+                return node, None
+            return node, "string"
+
+        if ("string" in (leftType, rightType)):
+            self.error(f"Cannot use '{op}' on a string.")
+            return node, None
+
+        if (op in ("ka bhag karo", "ka shesh bhag karo") and right.get("type") == "NUMBER"):
+            if (right["value"] == 0):
+                self.error("Division by zero.")
+                return node, None
+            if (not self.money):
+                node["type"] = "DIV_NONZERO" if op == "ka bhag karo" else "MOD_NONZERO"
+
+        if (self.money and (op == "ka bhag karo" or not numeric)):
+            # Amounts in paise are only known when the program runs
+            return node, None
+        if (op == "ka bhag karo"):
+            return node, "float"
+        if (numeric):
+            return node, self.numeric_result(leftType, rightType)
+        return node, None
@@ -0,0 +1,202 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from array import array
+
+# Names of the bulk aggregates, read after `<suchi> ka`
+AGGREGATES = ("kul", "nyuntam", "adhiktam", "sankhya")
+
+class TypedArray:
+    """
+    A numeric array (suchi) whose storage is packed with the array module.
+
+    Integers are stored as signed 64 bit values ('q'). The storage is
+    upgraded once to doubles ('d') when the first float is added. Indexes
+    are 1-based so that they line up with `ginti karo i 1 se n tak`.
+    """
+    def __init__(self, values=None):
+        self.typecode = 'q'
+        self.data = array('q')
+        if (values):
+            self.extend(values)
+
+    def _upgrade(self):
+        """
+        Converts the integer storage to double storage.
+        """
+        self.data = array('d', self.data)
+        self.typecode = 'd'
+
+    def append(self, value):
+        """
+        Adds a value at the end of the array
+
+        Args:
+            value (int | float): Value to be added
+
+        Raises:
+            RuntimeError: If the value is not a number or does not fit in 64 bits
+        """
+        if (isinstance(value, float)):
+            if (self.typecode == 'q'):
+                self._upgrade()
+        elif (not isinstance(value, int)):
+            raise RuntimeError(f"Suchi can only hold numbers. Got: {value!r}")
+
+        try:
+            self.data.append(value)
+        except OverflowError:
+            raise RuntimeError(f"Number {value} is too large for a suchi.")
+
+    def extend(self, values):
+        """
+        Adds many values at the end of the array in one go
+
+        Args:
+            values (iterable): Numbers to be added
+
+        Raises:
+            RuntimeError: If any value is not a number or does not fit in 64 bits
+        """
+        values = list(values)
+        for value in values:
+            if (isinstance(value, float)):
+                if (self.typecode == 'q'):
+                    self._upgrade()
+            elif (not isinstance(value, int)):
+                raise RuntimeError(f"Suchi can only hold numbers. Got: {value!r}")
+
+        try:
+            self.data.extend(values)
+        except OverflowError:
+            raise RuntimeError("Number is too large for a suchi.")
+
+    def _position(self, index):
+        """
+        Converts a 1-based TaiScript index into a storage offset
+
+        Args:
+            index (int): 1-based index
+
+        Raises:
+            RuntimeError: If the index is not an integer or is out of range
+
+        Returns:
+            int: 0-based offset into the storage
+        """
+        if (not isinstance(index, int)):
+            raise RuntimeError(f"Suchi index must be an integer. Got: {index}")
+        if (index < 1 or index > len(self.data)):
+            raise RuntimeError(f"Suchi index {index} is out of range (1 se {len(self.data)} tak).")
+        return index - 1
+
+    def get(self, index):
+        """
+        Returns the value stored at the given 1-based index
+
+        Args:
+            index (int): 1-based index
+
+        Returns:
+            int | float: The stored value
+        """
+        return self.data[self._position(index)]
+
+    def slice(self, start, end):
+        """
+        Returns a new array holding values from start to end (both inclusive)
+
+        Args:
+            start (int): 1-based index of the first value
+            end (int): 1-based index of the last value
+
+        Returns:
+            TypedArray: A new array with the selected values
+        """
+        first = self._position(start)
+        last = self._position(end)
+        result = TypedArray()
+        result.typecode = self.typecode
+        result.data = self.data[first:last + 1]
+        return result
+
+    def total(self):
+        """
+        Returns:
+            int | float: Sum of all values
+        """
+        return sum(self.data)
+
+    def minimum(self):
+        """
+        Raises:
+            RuntimeError: If the array is empty
+
+        Returns:
+            int | float: Smallest value
+        """
+        if (not self.data):
+            raise RuntimeError("Khali suchi ka nyuntam nahi hota.")
+        return min(self.data)
+
+    def maximum(self):
+        """
+        Raises:
+            RuntimeError: If the array is empty
+
+        Returns:
+            int | float: Largest value
+        """
+        if (not self.data):
+            raise RuntimeError("Khali suchi ka adhiktam nahi hota.")
+        return max(self.data)
+
+    def count(self):
+        """
+        Returns:
+            int: Number of values in the array
+        """
+        return len(self.data)
+
+    def aggregate(self, function):
+        """
+        Runs a bulk aggregate by its TaiScript name
+
+        Args:
+            function (str): One of 'kul', 'nyuntam', 'adhiktam' or 'sankhya'
+
+        Raises:
+            RuntimeError: If the aggregate is not known
+
+        Returns:
+            int | float: Result of the aggregate
+        """
+        if (function == "kul"):
+            return self.total()
+        elif (function == "nyuntam"):
+            return self.minimum()
+        elif (function == "adhiktam"):
+            return self.maximum()
+        elif (function == "sankhya"):
+            return self.count()
+        else:
+            raise RuntimeError(f"Unknown suchi aggregate: {function}")
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __eq__(self, other):
+        if (isinstance(other, TypedArray)):
+            return self.data.tolist() == other.data.tolist()
+        return NotImplemented
+
+    def __str__(self):
+        return "[" + ", ".join(str(value) for value in self.data) + "]"
+
+    def __repr__(self):
+        return f"TypedArray({self.data.tolist()!r})"
@@ -0,0 +1,125 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    run TEXT NOT NULL,
+    program TEXT,
+    parichay TEXT,
+    kind TEXT NOT NULL,
+    amount REAL NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    parichay TEXT NOT NULL PRIMARY KEY,
+    collected REAL NOT NULL,
+    deducted REAL NOT NULL,
+    collections INTEGER NOT NULL,
+    deductions INTEGER NOT NULL
+);
+"""
+
+# Stored in `totals` for bribes taken before any `parichay`. NULL would
+# never match the primary key, so each flush would add another row.
+NO_PARICHAY = ""
+
+class BribeLedger:
+    """
+    Append-only record of every bribe collected and deducted.
+
+    Running totals per parichay are kept in memory and updated in O(1) per
+    entry. When a path is given, entries wait in memory and are written to
+    a SQLite database in one transaction by `flush`, which the interpreter
+    calls at block boundaries. The `totals` table in the database carries
+    the same aggregates summed over every run, so audits never scan the
+    entries.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        # Entries only carry the run when they are written somewhere
+        self.run = uuid.uuid4().hex if path else None
+        self.program = None
+        self.pending = []
+        self.totals = {}
+
+    def record(self, kind, parichay, amount):
+        """
+        Records a collection or deduction
+
+        Args:
+            kind (str): "COLLECT" or "DEDUCT"
+            parichay (str): The parichay in effect, None before `parichay`
+            amount (float): The amount of the bribe
+        """
+        totals = self.totals.get(parichay)
+        if (totals is None):
+            totals = self.totals[parichay] = {"collected": 0, "deducted": 0, "collections": 0, "deductions": 0}
+        if (kind == "COLLECT"):
+            totals["collected"] += amount
+            totals["collections"] += 1
+        else:
+            totals["deducted"] += amount
+            totals["deductions"] += 1
+
+        if (self.path):
+            self.pending.append((self.run, self.program, parichay, kind, amount, time.time()))
+
+    def flush(self):
+        """
+        Writes the pending entries and their totals in one transaction
+        """
+        if (not self.pending):
+            return
+
+        batch = {}
+        for entry in self.pending:
+            parichay, kind, amount = entry[2], entry[3], entry[4]
+            row = batch.setdefault(parichay, [0, 0, 0, 0])
+            if (kind == "COLLECT"):
+                row[0] += amount
+                row[2] += 1
+            else:
+                row[1] += amount
+                row[3] += 1
+
+        with closing(sqlite3.connect(self.path)) as connection:
+            with connection:
+                connection.executescript(SCHEMA)
+                connection.executemany(
+                    "INSERT INTO entries (run, program, parichay, kind, amount, recorded) VALUES (?, ?, ?, ?, ?, ?)",
+                    self.pending)
+                connection.executemany(
+                    "INSERT INTO totals (parichay, collected, deducted, collections, deductions) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (parichay) DO UPDATE SET collected = collected + excluded.collected, "
+                    "deducted = deducted + excluded.deducted, collections = collections + excluded.collections, "
+                    "deductions = deductions + excluded.deductions",
+                    [(NO_PARICHAY if parichay is None else parichay, *row) for parichay, row in batch.items()])
+        self.pending.clear()
+
+    def persisted_totals(self):
+        """
+        Returns:
+            dict: Totals per parichay over every run written to the database,
+                under None for bribes taken before any `parichay`
+        """
+        if (not self.path or not os.path.exists(self.path)):
+            return {}
+        with closing(sqlite3.connect(self.path)) as connection:
+            connection.executescript(SCHEMA)
+            rows = connection.execute("SELECT parichay, collected, deducted, collections, deductions FROM totals").fetchall()
+        totals = {}
+        for parichay, *row in rows:
+            # Ledgers written before the sentinel hold NULL rows, one per flush
+            parichay = None if parichay in (None, NO_PARICHAY) else parichay
+            current = totals.setdefault(parichay, {"collected": 0, "deducted": 0, "collections": 0, "deductions": 0})
+            for key, value in zip(("collected", "deducted", "collections", "deductions"), row):
+                current[key] += value
+        return totals
@@ -5,10 +5,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import datetime
 from src.utils.helper import ComplexityAnalyser
+from src.utils.bribe_ledger import BribeLedger
 from collections import deque
 
 class BribeManager:
-    def __init__(self):
+    def __init__(self, ledgerPath=None):
+        """
+        Args:
+            ledgerPath (str): SQLite file the bribe ledger is written to,
+                        totals are only kept in memory if None
+        """
         self.baseBribe = 500
         self.startYear = 2025
         self.bribeQueue = deque()
@@ -22,9 +28,25 @@ class BribeManager:
             "BABU SAHEB": 1.0,
             "NETA JI": 0.0,
         }
+        # Fuel units bought per rupee of bribe, the better connected
+        # the parichay, the further the money goes.
+        self.fuelRates = {
+            "JANTA": 1,
+            "STUDENT": 2,
+            "CHACHA VIDHAYAK HAI": 10,
+            "BABU SAHEB": 5,
+            "NETA JI": 10,
+        }
+        # Seconds before the output of a run can be seen, the babus take
+        # their time with ordinary people
+        self.outputDelays = {
+            "JANTA": 1.0,
+            "STUDENT": 0.5,
+        }
         self.currentTimeComplexity = "LINEAR"
         self.loopDepth = 0
         self.loopDeducted = set()
+        self.ledger = BribeLedger(ledgerPath)
 
     def calculate_base_bribe(self):
         """
@@ -65,6 +87,37 @@ class BribeManager:
             bribeAmount (float): The amount to be added as the bribe
         """
         self.bribeQueue.append(bribeAmount)
+        self.ledger.record("COLLECT", self.parichay, bribeAmount)
+
+    def deduct_bribe(self, bribeAmount):
+        """
+        Takes the bribe for a block out of the collected amount
+
+        Args:
+            bribeAmount (float): The amount deducted
+        """
+        self.collectedBribe -= bribeAmount
+        self.ledger.record("DEDUCT", self.parichay, bribeAmount)
+
+    def fuel_for_bribe(self, bribeAmount):
+        """
+        Calculates the execution fuel a bribe buys under the current parichay
+
+        Args:
+            bribeAmount (float): The amount paid as the bribe
+
+        Returns:
+            float: Fuel units bought
+        """
+        return bribeAmount * self.fuelRates.get(self.parichay, 1)
+
+    def output_delay(self):
+        """
+        Returns:
+            float: Seconds before output printed under the current parichay
+                can be seen
+        """
+        return self.outputDelays.get(self.parichay, 0.0)
 
     def update_required_bribe(self):
         """
@@ -84,7 +137,8 @@ class BribeManager:
             RuntimeError: If the collected bribe is insufficient for the code to execute (based on time complexity)
         """
         # TODO: Add better logs of exception for different Parichay Type
-        if (statement["type"] == "LOOP"):
+        # A loop over the lines of a file nests like any other loop
+        if (statement["type"] in ("LOOP", "FILE_LOOP")):
             if (self.loopDepth == 0 and self.currentTimeComplexity == "LINEAR"):
                 self.reset()
                 self.currentTimeComplexity = "NESTED"
@@ -93,7 +147,7 @@ class BribeManager:
                     self.collectedBribe += self.bribeQueue.pop()
 
             if (self.loopDepth not in self.loopDeducted):
-                self.collectedBribe -= self.baseBribe
+                self.deduct_bribe(self.baseBribe)
                 self.loopDeducted.add(self.loopDepth)
 
             if self.collectedBribe < 0:
@@ -1,3 +1,5 @@
+import re
+
 class ComplexityAnalyser:
 
     def __init__(self):
@@ -17,4 +19,249 @@ class ComplexityAnalyser:
                 if ("body" in statement and isinstance(statement["body"], list)):
                     self._analyze(statement["body"], currentNesting)
 
-                currentNesting -= 1
\ No newline at end of file
+                currentNesting -= 1
+
+    def estimate_cost(self, ast):
+        """
+        Estimates how much work a program does before running it.
+
+        Each statement costs its weight plus the size of its expressions.
+        Loop bodies are multiplied by the trip count when the bounds are
+        literals, or variables last set to literals with `likho`, and by
+        `UNKNOWN_TRIP_COUNT` otherwise. Conditionals cost their dearer branch.
+
+        Args:
+            ast (list): List of statements from the AST
+
+        Returns:
+            int: Estimated cost in units of one simple assignment
+        """
+        return self._estimate(ast, {})
+
+    def _estimate(self, statements, constants):
+        cost = 0
+        for statement in statements or []:
+            statementType = statement["type"]
+            cost += STATEMENT_WEIGHTS.get(statementType, 1)
+            for key in ("value", "condition"):
+                if (isinstance(statement.get(key), dict)):
+                    cost += expression_size(statement[key])
+
+            if (statementType == "VAR_DECL"):
+                value = statement["value"]
+                if (value and value.get("type") == "NUMBER"):
+                    constants[statement["variable"]] = value["value"]
+                else:
+                    constants.pop(statement["variable"], None)
+            elif (statementType == "INPUT"):
+                constants.pop(statement["name"], None)
+            elif (statementType == "CONDITIONAL"):
+                ifConstants = dict(constants)
+                elseConstants = dict(constants)
+                cost += max(self._estimate(statement.get("if"), ifConstants),
+                            self._estimate(statement.get("else"), elseConstants))
+                # Only values both branches agree on are known afterwards
+                constants.clear()
+                constants.update({name: value for name, value in ifConstants.items() if elseConstants.get(name) == value})
+            elif (statementType in ("LOOP", "FILE_LOOP")):
+                trips = self.trip_count(statement, constants) if statementType == "LOOP" else UNKNOWN_TRIP_COUNT
+                for name in assigned_names(statement["body"]) | {statement["variable"]}:
+                    constants.pop(name, None)
+                cost += trips * self._estimate(statement["body"], dict(constants))
+        return cost
+
+    def trip_count(self, statement, constants):
+        """
+        Args:
+            statement (dict): A dictionary representing loop statement
+            constants (dict): Variables whose value is known at this point
+
+        Returns:
+            int: Number of iterations, `UNKNOWN_TRIP_COUNT` if the bounds are
+                not known before running
+        """
+        def resolve(expression):
+            if (isinstance(expression, (int, float))):
+                return expression
+            if (expression.get("type") == "INVARIANT"):
+                expression = expression["value"]
+            if (expression.get("type") == "NUMBER"):
+                return expression["value"]
+            if (expression.get("type") == "IDENTIFIER"):
+                return constants.get(expression["name"])
+            return None
+
+        start = resolve(statement["start"])
+        end = resolve(statement["end"])
+        increment = resolve(statement.get("increment", 1))
+        if (not all(isinstance(value, int) for value in (start, end, increment)) or increment == 0):
+            return UNKNOWN_TRIP_COUNT
+        if (increment > 0):
+            return max(0, (end - start) // increment + 1)
+        return max(0, (start - end) // -increment + 1)
+
+# Relative cost of executing each statement type once, in units of a simple
+# assignment. Files and input wait on the outside world, so they weigh more.
+STATEMENT_WEIGHTS = {
+    "VAR_DECL": 1,
+    "PRINT": 2,
+    "INPUT": 20,
+    "CONDITIONAL": 1,
+    "LOOP": 2,
+    "FILE_LOOP": 5,
+    "STRUCT_DECL": 1,
+    "STRUCT_INSTANCE": 2,
+    "ARRAY_DECL": 2,
+    "ARRAY_APPEND": 1,
+    "FILE_OPEN": 50,
+    "FILE_WRITE": 5,
+    "FILE_CLOSE": 20,
+}
+
+# Iterations assumed for loops whose bounds are only known at runtime
+UNKNOWN_TRIP_COUNT = 100
+
+def expression_size(expression):
+    """
+    Args:
+        expression (dict): A dictionary representing the expression
+
+    Returns:
+        int: Number of nodes in the expression
+    """
+    if (not isinstance(expression, dict)):
+        return 0
+    size = 1
+    for key in ("left", "right", "value", "index", "start", "end"):
+        if (isinstance(expression.get(key), dict)):
+            size += expression_size(expression[key])
+    return size
+
+def assigned_names(statements):
+    """
+    Collects every variable a block of statements may assign, including
+    nested blocks.
+
+    Args:
+        statements (list): List of statements
+
+    Returns:
+        set: Names of the variables
+    """
+    names = set()
+    pending = list(statements or [])
+    while (pending):
+        statement = pending.pop()
+        statementType = statement["type"]
+        if (statementType in ("VAR_DECL", "ARRAY_DECL", "ARRAY_APPEND")):
+            names.add(statement["variable"])
+        elif (statementType == "INPUT"):
+            names.add(statement["name"])
+        elif (statementType == "STRUCT_INSTANCE"):
+            names.add(statement["instance_name"])
+        elif (statementType in ("LOOP", "FILE_LOOP")):
+            names.add(statement["variable"])
+            pending += statement["body"]
+        elif (statementType == "CONDITIONAL"):
+            pending += (statement.get("if") or []) + (statement.get("else") or [])
+    return names
+
+PLACEHOLDER_REGEX = re.compile(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}")
+
+def expression_names(expression):
+    """
+    Collects every variable an expression reads, including the
+    placeholders of interpolated strings and the arrays it indexes.
+
+    Args:
+        expression (dict): A dictionary representing the expression
+
+    Returns:
+        set: Names of the variables
+    """
+    if (not expression):
+        return set()
+    if ("left" in expression and "operator" in expression and "right" in expression):
+        return expression_names(expression["left"]) | expression_names(expression["right"])
+
+    exprType = expression["type"]
+    if (exprType == "IDENTIFIER"):
+        return {expression["name"]}
+    elif (exprType == "STRING"):
+        return set(PLACEHOLDER_REGEX.findall(expression["value"]))
+    elif (exprType == "INVARIANT"):
+        return expression_names(expression["value"])
+    elif (exprType == "ARRAY_AGGREGATE"):
+        return {expression["name"]}
+    elif (exprType == "ARRAY_INDEX"):
+        return {expression["name"]} | expression_names(expression["index"])
+    elif (exprType == "ARRAY_SLICE"):
+        return {expression["name"]} | expression_names(expression["start"]) | expression_names(expression["end"])
+    elif (exprType == "CALL"):
+        return set().union(*(expression_names(arg) for arg in expression["args"]))
+    return set()
+
+def expression_calls(expression):
+    """
+    Collects the functions an expression calls
+
+    Args:
+        expression (dict): A dictionary representing the expression
+
+    Returns:
+        set: Names of the functions
+    """
+    calls = set()
+    # Expression chains can be thousands of operators long, walked without recursing
+    pending = [expression]
+    while (pending):
+        expression = pending.pop()
+        if (not expression):
+            continue
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            pending += [expression["left"], expression["right"]]
+        elif (expression["type"] == "INVARIANT"):
+            pending.append(expression["value"])
+        elif (expression["type"] == "CALL"):
+            calls.add(expression["name"])
+            pending += expression["args"]
+    return calls
+
+def trampoline(call):
+    """
+    Runs a recursive pass written as generators without growing the Python
+    call stack.
+
+    A generator makes a nested call by yielding the generator of that call,
+    and the `yield` gives back what the call returned, or raises what it
+    raised. The suspended callers are kept in a list, so nesting thousands
+    of levels deep only makes the list longer.
+
+    Args:
+        call (generator): The outermost call
+
+    Returns:
+        The return value of the outermost call
+    """
+    stack = [call]
+    value, error = None, None
+    while (True):
+        try:
+            if (error is not None):
+                nested = stack[-1].throw(error)
+            else:
+                nested = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if (not stack):
+                return stop.value
+            value, error = stop.value, None
+            continue
+        except Exception as e:
+            stack.pop()
+            if (not stack):
+                raise
+            value, error = None, e
+            continue
+        stack.append(nested)
+        value, error = None, None
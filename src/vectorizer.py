@@ -0,0 +1,367 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ARITHMETIC_OPERATORS = ("me jodo", "se ghatao", "me guna karo", "ka bhag karo", "ka shesh bhag karo")
+
+# Integers up to 2^53 convert to float64 without rounding, so int64 and
+# float64 arithmetic below this bound gives the same result as Python ints.
+INT_LIMIT = 2 ** 53
+
+# Number of iterations evaluated together, keeps memory flat for huge loops.
+CHUNK_SIZE = 1 << 16
+
+class VectorizationFallback(Exception):
+    """
+    Raised while vectorizing when the loop has to run on the scalar path.
+    """
+    pass
+
+class LoopVectorizer:
+    """
+    Runs pure arithmetic `ginti karo` loops as NumPy array expressions.
+
+    A loop qualifies when its body only contains `likho` statements with
+    arithmetic expressions over the loop variable, variables that do not
+    change inside the loop and variables assigned earlier in the same
+    iteration. A variable may also accumulate over iterations with
+    `likho x x me jodo ...` or `likho x x se ghatao ...`.
+    """
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.plans = {}
+
+    def try_execute(self, statement):
+        """
+        Executes the loop with NumPy if it qualifies.
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Returns:
+            bool: True if the loop was executed, False if the caller should
+                run it with `Interpreter.execute_loop`
+        """
+        # NumPy would divide in floats
+        if (np is None or self.interpreter.money is not None):
+            return False
+
+        key = id(statement)
+        if (key not in self.plans):
+            self.plans[key] = (statement, self.analyse(statement))
+        plan = self.plans[key][1]
+        if (plan is None):
+            return False
+
+        try:
+            results = self.run(statement, plan)
+        except VectorizationFallback:
+            return False
+
+        self.interpreter.bribeManager.loop_inc()
+        for name, value in results.items():
+            self.interpreter.env.set_variable(name, value)
+        self.interpreter.bribeManager.loop_dec()
+        return True
+
+    def analyse(self, statement):
+        """
+        Checks whether a loop can be vectorized and builds its plan.
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+
+        Returns:
+            dict | None: The plan with the steps to run and the variables
+                read from outside the loop, None if the loop does not qualify
+        """
+        loopVar = statement["variable"]
+        body = statement["body"]
+        if (not body or any(s["type"] != "VAR_DECL" or not s["value"] for s in body)):
+            return None
+
+        bodyNames = {s["variable"] for s in body}
+        if (loopVar in bodyNames):
+            return None
+
+        steps = []
+        assigned = set()
+        accumulators = set()
+        invariants = set()
+
+        for s in body:
+            var = s["variable"]
+            value = s["value"]
+            if (var in accumulators or not self.is_arithmetic(value)):
+                return None
+
+            names = self.names(value)
+            if (var in names and var not in assigned):
+                if (value.get("operator") not in ("me jodo", "se ghatao")):
+                    return None
+                if (value["left"] != {"type": "IDENTIFIER", "name": var}):
+                    return None
+                names = self.names(value["right"])
+                if (var in names):
+                    return None
+                kind = "REDUCE"
+                expression = value["right"]
+            else:
+                kind = "MAP"
+                expression = value
+
+            for name in names:
+                if (name in accumulators):
+                    return None
+                if (name in bodyNames and name not in assigned):
+                    # Value comes from the previous iteration
+                    return None
+
+            if (kind == "REDUCE"):
+                accumulators.add(var)
+                steps.append((kind, var, value["operator"], expression))
+            else:
+                assigned.add(var)
+                steps.append((kind, var, None, expression))
+            invariants |= names - bodyNames - {loopVar}
+
+        return {"steps": steps, "invariants": invariants, "accumulators": accumulators}
+
+    def is_arithmetic(self, expression):
+        """
+        Checks that an expression only uses numbers, variables and arithmetic
+
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            bool: Whether the expression is pure arithmetic
+        """
+        if (not expression):
+            return False
+        if (expression.get("type") == "INVARIANT"):
+            expression = expression["value"]
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            return (expression["operator"] in ARITHMETIC_OPERATORS
+                    and self.is_arithmetic(expression["left"])
+                    and self.is_arithmetic(expression["right"]))
+        if (expression["type"] == "NUMBER"):
+            return type(expression["value"]) in (int, float)
+        return expression["type"] == "IDENTIFIER"
+
+    def names(self, expression):
+        """
+        Collects the variable names used in an arithmetic expression
+
+        Args:
+            expression (dict): A dictionary representing the expression
+
+        Returns:
+            set: Names of the variables
+        """
+        if (expression.get("type") == "INVARIANT"):
+            expression = expression["value"]
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            return self.names(expression["left"]) | self.names(expression["right"])
+        if (expression["type"] == "IDENTIFIER"):
+            return {expression["name"]}
+        return set()
+
+    def run(self, statement, plan):
+        """
+        Evaluates the loop over chunks of `arange(start, end + 1, step)`.
+
+        Args:
+            statement (dict): A dictionary representing loop statement
+            plan (dict): Plan built by `analyse`
+
+        Raises:
+            VectorizationFallback: If the loop has to run on the scalar path
+
+        Returns:
+            dict: Final values of the variables changed by the loop
+        """
+        interpreter = self.interpreter
+        start = interpreter.evaluate(statement["start"])
+        end = interpreter.evaluate(statement["end"])
+        increment = statement.get("increment", 1)
+        if (isinstance(increment, dict)):
+            increment = interpreter.evaluate(increment)
+
+        if (type(start) is not int or type(end) is not int or type(increment) is not int or increment == 0):
+            raise VectorizationFallback()
+
+        if (increment > 0):
+            trips = len(range(start, end + 1, increment))
+        else:
+            trips = len(range(start, end - 1, increment))
+        last = start + max(trips - 1, 0) * increment
+
+        scope = {}
+        for name in plan["invariants"] | plan["accumulators"]:
+            value = interpreter.env.variables.get(name)
+            if (type(value) not in (int, float)):
+                raise VectorizationFallback()
+            scope[name] = value
+
+        # Without enough fuel the scalar loop runs until the exact iteration
+        # where it runs out
+        fuelCost = trips * len(statement["body"])
+        if (fuelCost > interpreter.fuel):
+            raise VectorizationFallback()
+
+        self.check_bounds(statement["variable"], plan, scope, max(abs(start), abs(last)), trips)
+
+        results = {name: scope[name] for name in plan["accumulators"]}
+        for chunkStart in range(0, trips, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, trips - chunkStart)
+            columns = dict(scope)
+            columns[statement["variable"]] = np.arange(count, dtype=np.int64) * increment + (start + chunkStart * increment)
+
+            for kind, var, operator, expression in plan["steps"]:
+                value = self.evaluate(expression, columns)
+                if (kind == "MAP"):
+                    columns[var] = value
+                    results[var] = value[-1].item() if isinstance(value, np.ndarray) else value
+                else:
+                    terms = np.concatenate((np.asarray([results[var]]), np.broadcast_to(value, (count,))))
+                    if (operator == "me jodo"):
+                        results[var] = np.add.accumulate(terms)[-1].item()
+                    else:
+                        results[var] = np.subtract.accumulate(terms)[-1].item()
+
+        results[statement["variable"]] = start + trips * increment
+        interpreter.fuel -= fuelCost
+        interpreter.loopIterations += trips
+        counts = interpreter.statementCounts
+        if (counts is not None):
+            # The body is only made of `likho` statements
+            counts["VAR_DECL"] = counts.get("VAR_DECL", 0) + trips * len(statement["body"])
+        return results
+
+    def check_bounds(self, loopVar, plan, scope, loopBound, trips):
+        """
+        Makes sure no integer in the loop can grow past `INT_LIMIT`, where
+        int64 would stop matching Python integers.
+
+        Args:
+            loopVar (str): Name of the loop variable
+            plan (dict): Plan built by `analyse`
+            scope (dict): Values of the variables read from outside the loop
+            loopBound (int): Largest absolute value of the loop variable
+            trips (int): Number of iterations
+
+        Raises:
+            VectorizationFallback: If an integer may grow past the limit
+        """
+        kinds = {name: self.kind_of(value) for name, value in scope.items()}
+        kinds[loopVar] = ("int", loopBound)
+        for name in plan["accumulators"]:
+            if (kinds[name][0] == "int" and kinds[name][1] > INT_LIMIT):
+                raise VectorizationFallback()
+
+        for kind, var, operator, expression in plan["steps"]:
+            exprKind = self.bound(expression, kinds)
+            if (kind == "MAP"):
+                kinds[var] = exprKind
+            elif (kinds[var][0] == "int" and exprKind[0] == "int"):
+                if (kinds[var][1] + trips * exprKind[1] > INT_LIMIT):
+                    raise VectorizationFallback()
+
+    def kind_of(self, value):
+        """
+        Args:
+            value (int | float): A number
+
+        Returns:
+            tuple: ("int", absolute value) or ("float", None)
+        """
+        if (type(value) is int):
+            return ("int", abs(value))
+        return ("float", None)
+
+    def bound(self, expression, kinds):
+        """
+        Works out whether an expression yields ints or floats and, for ints,
+        the largest absolute value it can take.
+
+        Args:
+            expression (dict): A dictionary representing the expression
+            kinds (dict): Kind and bound of each variable
+
+        Raises:
+            VectorizationFallback: If an integer may grow past the limit
+
+        Returns:
+            tuple: ("int", bound) or ("float", None)
+        """
+        if (expression.get("type") == "INVARIANT"):
+            expression = expression["value"]
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            leftKind, leftBound = self.bound(expression["left"], kinds)
+            rightKind, rightBound = self.bound(expression["right"], kinds)
+            operator = expression["operator"]
+            if (operator == "ka bhag karo" or leftKind == "float" or rightKind == "float"):
+                return ("float", None)
+            if (operator == "me guna karo"):
+                result = leftBound * rightBound
+            elif (operator == "ka shesh bhag karo"):
+                result = rightBound
+            else:
+                result = leftBound + rightBound
+            if (result > INT_LIMIT):
+                raise VectorizationFallback()
+            return ("int", result)
+
+        if (expression["type"] == "NUMBER"):
+            result = self.kind_of(expression["value"])
+        else:
+            result = kinds[expression["name"]]
+        if (result[0] == "int" and result[1] > INT_LIMIT):
+            raise VectorizationFallback()
+        return result
+
+    def evaluate(self, expression, columns):
+        """
+        Evaluates an arithmetic expression over whole columns.
+
+        Args:
+            expression (dict): A dictionary representing the expression
+            columns (dict): NumPy arrays or plain numbers for each variable
+
+        Raises:
+            VectorizationFallback: If a division by zero would happen, so the
+                scalar path can raise it at the right iteration
+
+        Returns:
+            numpy.ndarray | int | float: The result for every iteration
+        """
+        if (expression.get("type") == "INVARIANT"):
+            expression = expression["value"]
+        if ("left" in expression and "operator" in expression and "right" in expression):
+            left = self.evaluate(expression["left"], columns)
+            right = self.evaluate(expression["right"], columns)
+            operator = expression["operator"]
+
+            if (operator == "me jodo"):
+                return left + right
+            elif (operator == "se ghatao"):
+                return left - right
+            elif (operator == "me guna karo"):
+                return left * right
+
+            if (np.any(right == 0)):
+                raise VectorizationFallback()
+            if (operator == "ka bhag karo"):
+                return left / right
+            return left % right
+
+        if (expression["type"] == "NUMBER"):
+            return expression["value"]
+        return columns[expression["name"]]
@@ -0,0 +1,102 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src.utils.bribe_ledger import BribeLedger
+
+PROGRAM = """
+    yojna shuru "Ledger"
+    parichay "Janta"
+    ghoos lo 700
+    ghoos lo 800
+    ginti karo i 1 se 3 tak {
+        ghoshna i
+    }
+    ginti band
+    ghoos lo 600
+    ghoshna "Ho gaya"
+    yojna band
+"""
+
+def run(ledgerPath=None):
+    interpreter = Interpreter(ledgerPath=ledgerPath)
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret(Parser(lexer(PROGRAM)).parse())
+    return interpreter
+
+class TestBribeLedger(unittest.TestCase):
+
+    def test_in_memory_totals(self):
+        ledger = run().bribeManager.ledger
+        self.assertEqual(ledger.totals, {"JANTA": {"collected": 2100, "deducted": 500, "collections": 3, "deductions": 1}})
+        self.assertEqual(ledger.pending, [])
+
+    def test_persists_across_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.db")
+            run(path)
+            ledger = run(path).bribeManager.ledger
+
+            self.assertEqual(ledger.persisted_totals(), {"JANTA": {"collected": 4200, "deducted": 1000, "collections": 6, "deductions": 2}})
+            connection = sqlite3.connect(path)
+            rows = connection.execute("SELECT program, kind, amount FROM entries WHERE run = ? ORDER BY id", (ledger.run,)).fetchall()
+            connection.close()
+            self.assertEqual(rows, [("Ledger", "COLLECT", 700), ("Ledger", "COLLECT", 800), ("Ledger", "DEDUCT", 500), ("Ledger", "COLLECT", 600)])
+
+    def test_bribes_before_parichay_share_one_total(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.db")
+            ledger = BribeLedger(path)
+            for amount in (100, 50):
+                ledger.record("COLLECT", None, amount)
+                ledger.flush()
+
+            self.assertEqual(ledger.persisted_totals(), {None: {"collected": 150, "deducted": 0, "collections": 2, "deductions": 0}})
+            connection = sqlite3.connect(path)
+            count = connection.execute("SELECT COUNT(*) FROM totals").fetchone()[0]
+            connection.close()
+            self.assertEqual(count, 1)
+
+    def test_file_loops_pay_for_their_depth(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lines.txt")
+            with open(path, "w") as file:
+                file.write("1\n2\n")
+            program = f"""
+                yojna shuru "Padho"
+                parichay "Janta"
+                ghoos lo 600
+                file padho "{path}" aur naam do lines
+                ghoos lo 700
+                ginti karo n lines ki har line {{
+                    ghoshna n
+                }}
+                ginti band
+                ghoos lo 500
+                band karo lines
+                yojna band
+            """
+            interpreter = Interpreter()
+            with redirect_stdout(io.StringIO()):
+                interpreter.interpret(Parser(lexer(program)).parse())
+        self.assertEqual(interpreter.bribeManager.ledger.totals, {"JANTA": {"collected": 1800, "deducted": 500, "collections": 3, "deductions": 1}})
+
+    def test_entries_wait_for_flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ledger = BribeLedger(os.path.join(directory, "ledger.db"))
+            ledger.record("COLLECT", "STUDENT", 250)
+            self.assertEqual(ledger.persisted_totals(), {})
+            ledger.flush()
+            self.assertEqual(ledger.persisted_totals()["STUDENT"]["collected"], 250)
+
+if __name__ == "__main__":
+    unittest.main()
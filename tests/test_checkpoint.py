@@ -0,0 +1,131 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import pickle
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src.checkpoint import Checkpointer, load_checkpoint
+
+PROGRAM = """
+    yojna shuru "Lambi"
+    parichay "Janta"
+    ghoos lo 500
+    likho total 0
+    likho hisaab suchi banao 0
+    file kholo "{path}" aur naam do report
+    ghoos lo 5000
+    ginti karo i 1 se 6 tak {{
+        agar i bada hai 2 toh {{
+            ginti karo j 1 se 4 tak {{
+                likho total total me jodo i me guna karo j
+                report me likho "{{i}}-{{j}} "
+            }}
+            ginti band
+        }}
+        warna {{
+            ghoshna "chhota {{i}}"
+        }}
+        hisaab me dalo total
+    }}
+    ginti band
+    ghoos lo 500
+    band karo report
+    ghoshna total
+    yojna band
+"""
+
+class PowerCut(Exception):
+    pass
+
+class CrashingCheckpointer(Checkpointer):
+    """
+    Cuts the power right after the given number of checkpoints.
+    """
+    def __init__(self, path, every, crashAfter):
+        super().__init__(path, every)
+        self.crashAfter = crashAfter
+        self.saved = 0
+
+    def save(self):
+        super().save()
+        self.saved += 1
+        if (self.saved == self.crashAfter):
+            # The dying process lets go of its files
+            for fileObject in self.interpreter.env.files.values():
+                fileObject.close()
+            raise PowerCut()
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpointPath = os.path.join(self.directory.name, "run.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_program(self, reportName, checkpointer=None, checkpoint=None):
+        source = PROGRAM.format(path=os.path.join(self.directory.name, reportName))
+        interpreter = Interpreter(checkpointer=checkpointer)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            interpreter.interpret(Parser(lexer(source)).parse(), checkpoint)
+        return interpreter, output.getvalue()
+
+    def read(self, name):
+        with open(os.path.join(self.directory.name, name)) as file:
+            return file.read()
+
+    def test_resume_after_crash(self):
+        expected, expectedOutput = self.run_program("expected.txt")
+
+        for crashAfter in (1, 3, 7):
+            with self.assertRaises(PowerCut):
+                self.run_program("report.txt", CrashingCheckpointer(self.checkpointPath, 2, crashAfter))
+            checkpoint = load_checkpoint(self.checkpointPath)
+            self.assertIsNotNone(checkpoint)
+
+            resumed, output = self.run_program("report.txt", Checkpointer(self.checkpointPath, 2), checkpoint)
+            self.assertEqual(resumed.env.get_variable("total"), expected.env.get_variable("total"))
+            self.assertEqual(str(resumed.env.get_variable("hisaab")), str(expected.env.get_variable("hisaab")))
+            self.assertEqual(resumed.bribeManager.collectedBribe, expected.bribeManager.collectedBribe)
+            self.assertEqual(resumed.bribeManager.loopDepth, 0)
+            self.assertTrue(expectedOutput.endswith(output))
+            self.assertEqual(self.read("report.txt"), self.read("expected.txt"))
+            self.assertFalse(os.path.exists(self.checkpointPath))
+
+    def test_deltas_only_carry_dirty_variables(self):
+        with self.assertRaises(PowerCut):
+            self.run_program("report.txt", CrashingCheckpointer(self.checkpointPath, 1, 3))
+        records = []
+        with open(self.checkpointPath, "rb") as file:
+            while (True):
+                try:
+                    records.append(pickle.load(file))
+                except EOFError:
+                    break
+        self.assertTrue(records[0]["full"])
+        self.assertFalse(records[1]["full"])
+        self.assertNotIn("total", records[1]["variables"])
+        self.assertIn("i", records[1]["variables"])
+
+    def test_refuses_other_program(self):
+        with self.assertRaises(PowerCut):
+            self.run_program("report.txt", CrashingCheckpointer(self.checkpointPath, 2, 1))
+        checkpoint = load_checkpoint(self.checkpointPath)
+        interpreter = Interpreter()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                interpreter.interpret(Parser(lexer('yojna shuru "Doosra"\nparichay "Janta"\nyojna band')).parse(), checkpoint)
+        self.assertIn("different program", output.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import socket
+import subprocess
+import tempfile
+import threading
+import unittest
+from src.cluster import Coordinator, serve_worker
+
+ROWS_PROGRAM = """
+    yojna shuru "Kar"
+    parichay "Chacha Vidhayak Hai"
+    likho tax salary me guna karo 3 ka bhag karo 10
+    ghoshna "{naam}: {tax}"
+    yojna band
+"""
+
+def start_worker(test):
+    server = serve_worker(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test.addCleanup(server.server_close)
+    test.addCleanup(server.shutdown)
+    return server.server_address
+
+def start_dying_worker(test, units=1):
+    """
+    A worker that reads `units` units and dies without answering
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    test.addCleanup(listener.close)
+
+    def serve():
+        for _ in range(units):
+            connection, _ = listener.accept()
+            connection.makefile("rb").readline()
+            connection.close()
+        listener.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return listener.getsockname()
+
+class TestCluster(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, code, parichay="Chacha Vidhayak Hai"):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(f'yojna shuru "Test"\nparichay "{parichay}"\n' + code + '\nyojna band\n')
+        return path
+
+    def test_scripts_run_on_every_worker(self):
+        files = [self.write(f"p{n}.tai", f"ghoshna {n} me guna karo {n}") for n in range(8)]
+        files.append(self.write("broken.tai", "ghoshna"))
+        files.append(self.write("janta.tai", "ghoos lo 700\nghoshna \"ho gaya\"", "Janta"))
+        coordinator = Coordinator([start_worker(self), start_worker(self)])
+        results = coordinator.run_scripts(files)
+
+        self.assertEqual([result["file"] for result in results], files)
+        self.assertEqual([result["output"] for result in results[:8]], [f"{n * n}\n" for n in range(8)])
+        self.assertEqual(results[8]["status"], "failed")
+        self.assertTrue(results[8]["output"].startswith("Error: "))
+        self.assertEqual(results[9]["output"], "ho gaya\n")
+        self.assertEqual(len({result["worker"] for result in results}), 2)
+        self.assertEqual(coordinator.bribes["JANTA"]["collected"], 700)
+        self.assertEqual(coordinator.bribes["JANTA"]["collections"], 1)
+
+        # Sent to a worker again, runs are replayed from its cache and
+        # still count their bribes
+        coordinator = Coordinator([start_worker(self)])
+        coordinator.run_scripts(files)
+        again = coordinator.run_scripts(files)
+        self.assertEqual([result["output"] for result in again], [result["output"] for result in results])
+        self.assertTrue(all(result["cached"] for result in again if result["status"] == "ok"))
+        self.assertEqual(coordinator.bribes["JANTA"]["collected"], 700)
+
+    def test_units_of_dead_workers_are_retried(self):
+        files = [self.write(f"p{n}.tai", f"ghoshna {n}") for n in range(4)]
+        # Nothing listens on the last address
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        unreachable = closed.getsockname()
+        closed.close()
+        coordinator = Coordinator([start_dying_worker(self, 2), unreachable, start_worker(self)])
+        results = coordinator.run_scripts(files)
+        self.assertEqual([result["output"] for result in results], [f"{n}\n" for n in range(4)])
+        self.assertTrue(all(result["status"] == "ok" for result in results))
+        self.assertTrue(any(result["attempts"] > 1 for result in results))
+
+        # A unit whose workers keep dying fails, and so does everything
+        # once no worker is left
+        coordinator = Coordinator([start_dying_worker(self, 3)], retries=1)
+        results = coordinator.run_scripts(files[:2])
+        self.assertIn("Worker lost", results[0]["output"])
+        self.assertEqual(results[1]["status"], "failed")
+
+    def test_csv_rows_are_split_across_workers(self):
+        rowsPath = os.path.join(self.directory.name, "rows.csv")
+        resultsPath = os.path.join(self.directory.name, "results.csv")
+        with open(rowsPath, "w", newline="") as file:
+            csv.writer(file).writerows([["naam", "salary"]] + [[f"n{i}", str(i * 10)] for i in range(1, 51)] + [["adhoora"]])
+        coordinator = Coordinator([start_worker(self), start_dying_worker(self), start_worker(self)], batchSize=7)
+        summary = coordinator.run_records(ROWS_PROGRAM, rowsPath, resultsPath)
+
+        self.assertEqual((summary["rows"], summary["failed"]), (51, 1))
+        with open(resultsPath, newline="") as file:
+            results = list(csv.reader(file))
+        self.assertEqual(results[0], ["row", "status", "output", "error"])
+        self.assertEqual(results[1:51], [[str(i), "ok", f"n{i}: {i * 3}.0", ""] for i in range(1, 51)])
+        self.assertEqual(results[51][1], "failed")
+
+    def test_worker_process(self):
+        script = os.path.join(os.path.dirname(__file__), "..", "scripts", "run_worker.py")
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        worker = subprocess.Popen([sys.executable, script, "--port", str(port)], stdout=subprocess.PIPE, text=True)
+        self.addCleanup(worker.stdout.close)
+        self.addCleanup(worker.wait)
+        self.addCleanup(worker.kill)
+        self.assertIn(f":{port}", worker.stdout.readline())
+
+        results = Coordinator([f"127.0.0.1:{port}"]).run_scripts([self.write("p.tai", 'ghoshna "dur se"')])
+        self.assertEqual(results[0]["output"], "dur se\n")
+
+        worker.kill()
+        worker.wait()
+        results = Coordinator([f"127.0.0.1:{port}"]).run_scripts([self.write("q.tai", 'ghoshna "dur se"')])
+        self.assertEqual(results[0]["output"], "Error: No workers left.\n")
+
+if __name__ == "__main__":
+    unittest.main()
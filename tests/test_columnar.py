@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from src.program import Program
+from src.columnar import ColumnarProgram
+from src.records import run_rows
+
+def program(code):
+    return Program.compile('yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band')
+
+class TestColumnarProgram(unittest.TestCase):
+
+    def assert_same_as_rows(self, code, columns, rows):
+        compiled = program(code)
+        self.assertTrue(ColumnarProgram.supports(compiled))
+        expected = run_rows(compiled, columns, rows, 1)
+        results = run_rows(compiled, columns, rows, 1, ColumnarProgram(compiled))
+        self.assertEqual(results, expected)
+        return results
+
+    def test_branches_and_arithmetic(self):
+        results = self.assert_same_as_rows("""
+            likho tax 0
+            agar salary bada hai 1000 toh {
+                likho upar salary se ghatao 1000
+                likho tax upar me guna karo 3
+                likho tax tax ka bhag karo 10
+            }
+            warna {
+                likho tax salary ka shesh bhag karo 7
+            }
+            ghoshna "{naam}: {tax}"
+        """, ["naam", "salary"], [["Kamal", "5000"], ["Raju", "800"], ["Sita", "1234.5"], ["Gita", "-3"]])
+        self.assertEqual(results[0], (1, "ok", "Kamal: 1200.0", ""))
+
+    def test_string_coercion(self):
+        self.assert_same_as_rows("""
+            likho jod a me jodo b
+            ghoshna jod
+            ghoshna "kul: " me jodo jod
+            agar a barabar hai b toh {
+                ghoshna "barabar"
+            }
+        """, ["a", "b"], [["1", "2"], ["1", "x"], ["y", "2.5"], ["2.5", "3"], ["p", "p"], ["4", "4.0"]])
+
+    def test_errors_stop_only_their_row(self):
+        results = self.assert_same_as_rows("""
+            ghoshna "shuru"
+            agar d barabar hai 1 toh {
+                likho extra 5
+            }
+            ghoshna 10 ka bhag karo d
+            ghoshna extra
+            ghoshna d se ghatao 1
+        """, ["d"], [["1"], ["0"], ["2"], ["abc"]])
+        self.assertEqual(results[0][1], "ok")
+        self.assertEqual(results[1], (2, "failed", "shuru", "Division by zero."))
+        self.assertEqual(results[2][3], "Variable 'extra' is not defined.")
+        self.assertEqual(results[3][1], "failed")
+
+    def test_large_ints_stay_exact(self):
+        self.assert_same_as_rows("""
+            likho x n me guna karo n
+            ghoshna x me jodo 1
+        """, ["n"], [["94906267"], ["3"], ["123456789012345678"]])
+
+    def test_unsupported_programs(self):
+        self.assertFalse(ColumnarProgram.supports(program("""
+            ginti karo i 1 se 3 tak {
+                ghoshna i
+            }
+            ginti band
+        """)))
+        self.assertFalse(ColumnarProgram.supports(program("paise me hisaab karo\nghoshna 1")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import tempfile
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter, prepare_program
+
+def run(code, jitThreshold=None, explicitStack=False, parichay="Chacha Vidhayak Hai"):
+    source = f'yojna shuru "Test"\nparichay "{parichay}"\n' + code + '\nyojna band'
+    interpreter = Interpreter(jitThreshold=jitThreshold, output=io.StringIO(), explicitStack=explicitStack)
+    error = None
+    try:
+        interpreter.run(prepare_program(Parser(lexer(source)).parse()))
+    except RuntimeError as e:
+        error = str(e)
+    return interpreter, interpreter.output.getvalue(), error
+
+# Every way a loop can run: tree walker, compiled by the JIT, explicit stack
+MODES = ({}, {"jitThreshold": 3}, {"explicitStack": True})
+
+class TestControlFlow(unittest.TestCase):
+
+    def assert_all_modes(self, code, expected, **options):
+        for mode in MODES:
+            interpreter, output, error = run(code, **mode, **options)
+            self.assertIsNone(error, mode)
+            self.assertEqual(output, expected, mode)
+            self.assertEqual(interpreter.bribeManager.loopDepth, 0, mode)
+        return interpreter
+
+    def test_break_ends_the_innermost_loop(self):
+        interpreter = self.assert_all_modes("""
+            likho count 0
+            ginti karo i 1 se 3 tak {
+                ginti karo j 1 se 100 tak {
+                    agar j bada hai i toh {
+                        bijli chali gayi
+                    }
+                    likho count count me jodo 1
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna count
+        """, "6\n")
+        self.assertEqual(interpreter.env.get_variable("j"), 4)
+
+    def test_break_in_a_hot_loop_is_compiled(self):
+        interpreter = self.assert_all_modes("""
+            likho total 0
+            ginti karo i 1 se 100000 tak {
+                agar i barabar hai 5000 toh {
+                    bijli chali gayi
+                }
+                likho total total me jodo i
+            }
+            ginti band
+            ghoshna total
+        """, f"{sum(range(5000))}\n")
+        interpreter, _, _ = run("""
+            ginti karo i 1 se 100000 tak {
+                agar i barabar hai 5000 toh {
+                    bijli chali gayi
+                }
+            }
+            ginti band
+        """, jitThreshold=3)
+        self.assertEqual(len(interpreter.jit.compiled), 1)
+
+    def test_return_from_nested_loops(self):
+        interpreter = self.assert_all_modes("""
+            karam karo dhoondo target {
+                ginti karo i 1 se 10 tak {
+                    ginti karo j 1 se 10 tak {
+                        agar i me guna karo j barabar hai target toh {
+                            sarkar gir gayi i me jodo "x" me jodo j
+                        }
+                    }
+                    ginti band
+                }
+                ginti band
+                sarkar gir gayi "nahi mila"
+            }
+            karam band
+            ginti karo k 1 se 2 tak {
+                ghoshna bulao dhoondo(12)
+                ghoshna bulao dhoondo(97)
+            }
+            ginti band
+        """, "2x6\nnahi mila\n" * 2)
+        self.assertEqual(interpreter.callDepth, 0)
+
+    def test_bribes_after_leaving_loops_early(self):
+        code = """
+            ghoos lo 600
+            karam karo pehla {
+                ginti karo i 1 se 5 tak {
+                    sarkar gir gayi i
+                }
+                ginti band
+            }
+            karam band
+            ghoos lo 1500
+            ginti karo i 1 se 3 tak {
+                ginti karo j 1 se 3 tak {
+                    bijli chali gayi
+                }
+                ginti band
+                ghoshna bulao pehla()
+            }
+            ginti band
+        """
+        self.assert_all_modes(code, "1\n1\n1\n", parichay="Janta")
+        # The nested loops are paid for once, like loops that ran to the end
+        self.assertEqual(run(code, parichay="Janta")[0].bribeManager.collectedBribe,
+                         run(code.replace("bijli chali gayi", "likho x j").replace("sarkar gir gayi i", "likho y i"), parichay="Janta")[0].bribeManager.collectedBribe)
+
+    def test_types_set_before_a_break_reach_the_end_of_the_loop(self):
+        self.assert_all_modes("""
+            likho x 1
+            ginti karo i 1 se 3 tak {
+                likho x "a"
+                agar i barabar hai 1 toh {
+                    bijli chali gayi
+                }
+                likho x 2
+            }
+            ginti band
+            likho y x me jodo 1
+            ghoshna y
+        """, "a1\n")
+
+    def test_break_in_a_file_loop(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("5\n7\n0\n9\n")
+        self.addCleanup(os.remove, file.name)
+        self.assert_all_modes(f"""
+            file padho "{file.name}" aur naam do lines
+            ginti karo n lines ki har line {{
+                agar n barabar hai 0 toh {{
+                    bijli chali gayi
+                }}
+                ghoshna n
+            }}
+            ginti band
+            band karo lines
+        """, "5\n7\n")
+
+    def test_break_outside_a_loop(self):
+        for mode in MODES:
+            _, _, error = run("""
+                ghoshna "shuru"
+                bijli chali gayi
+            """, **mode)
+            self.assertIn("'bijli chali gayi' can only be used inside a 'ginti karo'", error)
+            # A loop of the caller does not count
+            _, _, error = run("""
+                karam karo tod {
+                    bijli chali gayi
+                }
+                karam band
+                ginti karo i 1 se 3 tak {
+                    bulao tod()
+                }
+                ginti band
+            """, **mode)
+            self.assertIn("'bijli chali gayi' can only be used inside a 'ginti karo'", error)
+
+if __name__ == "__main__":
+    unittest.main()
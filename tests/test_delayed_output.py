@@ -0,0 +1,72 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import io
+import time
+import unittest
+from src.program import Program
+from src.delayed_output import HeldOutput, ReleasedOutput, release_output
+
+def program(parichay):
+    return Program.compile(f'yojna shuru "T"\nparichay "{parichay}"\nghoos lo 600\nghoshna "arzi " me jodo n\nyojna band')
+
+class TestDelayedOutput(unittest.TestCase):
+
+    def test_writes_are_released_in_order(self):
+        delays = iter([0.2, 0.0, 0.05])
+        held = HeldOutput(lambda: next(delays))
+        held.write("a")
+        held.write("b")
+        held.write("c")
+        times = [releaseAt for releaseAt, _ in held.chunks]
+        self.assertEqual(times, sorted(times))
+
+        target = io.StringIO()
+        started = time.monotonic()
+        asyncio.run(release_output(held, target))
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        self.assertEqual(target.getvalue(), "abc")
+
+    def test_released_while_the_program_runs(self):
+        delays = iter([0.0, 0.1, 0.0])
+        target = io.StringIO()
+        output = ReleasedOutput(lambda: next(delays), target)
+        output.write("turant ")
+        # Nothing waits before it, so it is shown at once
+        self.assertEqual(target.getvalue(), "turant ")
+        output.write("baad me ")
+        output.write("phir ")
+        # Writes keep their order behind a delayed one
+        self.assertEqual(target.getvalue(), "turant ")
+        time.sleep(0.3)
+        self.assertEqual(target.getvalue(), "turant baad me phir ")
+        self.assertFalse(output.chunks)
+        output.finish()
+
+    def test_many_delayed_runs_share_one_thread(self):
+        student = program("Student")
+
+        async def main():
+            return await asyncio.gather(*(student.run_async(variables={"n": i}) for i in range(20)))
+
+        started = time.monotonic()
+        results = asyncio.run(main())
+        elapsed = time.monotonic() - started
+        self.assertEqual([result.output for result in results], [f"arzi {i}\n" for i in range(20)])
+        # Twenty half-second delays, waited for together
+        self.assertGreaterEqual(elapsed, 0.5)
+        self.assertLess(elapsed, 2.0)
+
+    def test_no_delay_with_connections(self):
+        target = io.StringIO()
+        started = time.monotonic()
+        result = asyncio.run(program("Chacha Vidhayak Hai").run_async(output=target, variables={"n": 1}))
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertTrue(result.ok)
+        self.assertEqual(target.getvalue(), "arzi 1\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src import functions
+
+def parse_program(code):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    return Parser(lexer(source)).parse()
+
+def run_program(code):
+    interpreter = Interpreter()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            interpreter.interpret(parse_program(code))
+        except SystemExit:
+            pass
+    return interpreter, output.getvalue()
+
+class TestFunctions(unittest.TestCase):
+
+    def test_parameters_and_return(self):
+        interpreter, output = run_program("""
+            likho dar 18
+            karam karo shulk daam {
+                likho hissa daam me guna karo dar ka bhag karo 100
+                sarkar gir gayi daam me jodo hissa
+            }
+            karam band
+            ghoshna bulao shulk(200)
+            likho total bulao shulk(100) me jodo bulao shulk(50)
+            ghoshna total
+        """)
+        self.assertEqual(output, "236.0\n177.0\n")
+        # Variables set in the body stay inside the call
+        self.assertNotIn("hissa", interpreter.env.variables)
+        self.assertNotIn("daam", interpreter.env.variables)
+
+    def test_recursion_reuses_frames(self):
+        interpreter, output = run_program("""
+            karam karo factorial n {
+                agar n chota hai 2 toh {
+                    sarkar gir gayi 1
+                }
+                sarkar gir gayi n me guna karo bulao factorial(n se ghatao 1)
+            }
+            karam band
+            ghoshna bulao factorial(10)
+            ghoshna bulao factorial(5)
+        """)
+        self.assertEqual(output, "3628800\n120\n")
+        function = interpreter.functions["factorial"]
+        # One frame per level of the deepest call, shared by the later call
+        self.assertEqual(len(function.pool), 10)
+
+    def test_call_statement_appends_to_program_suchi(self):
+        interpreter, output = run_program("""
+            likho bahi suchi banao
+            karam karo darj rakam {
+                bahi me dalo rakam
+            }
+            karam band
+            ginti karo i 1 se 4 tak {
+                bulao darj(i me guna karo 10)
+            }
+            ginti band
+            ghoshna bahi ka kul
+        """)
+        self.assertEqual(output, "100\n")
+
+    def test_memoized_function(self):
+        interpreter, output = run_program("""
+            yaad rakho karam karo fib n {
+                agar n chota hai 2 toh {
+                    sarkar gir gayi n
+                }
+                sarkar gir gayi bulao fib(n se ghatao 1) me jodo bulao fib(n se ghatao 2)
+            }
+            karam band
+            ghoshna bulao fib(80)
+        """)
+        self.assertEqual(output, "23416728348467685\n")
+        function = interpreter.functions["fib"]
+        self.assertEqual(function.misses, 81)
+        self.assertEqual(function.hits, 78)
+
+    def test_memo_drops_least_recently_used(self):
+        size = functions.MEMO_SIZE
+        functions.MEMO_SIZE = 2
+        try:
+            interpreter, _ = run_program("""
+                yaad rakho karam karo double n {
+                    sarkar gir gayi n me guna karo 2
+                }
+                karam band
+                likho a bulao double(1)
+                likho a bulao double(2)
+                likho a bulao double(1)
+                likho a bulao double(3)
+            """)
+        finally:
+            functions.MEMO_SIZE = size
+        self.assertEqual(list(interpreter.functions["double"].cache), [((int, 1),), ((int, 3),)])
+
+    def test_memo_tells_equal_numbers_of_other_types_apart(self):
+        _, output = run_program("""
+            yaad rakho karam karo teen_guna n {
+                sarkar gir gayi n me guna karo 3
+            }
+            karam band
+            ghoshna bulao teen_guna(2)
+            ghoshna bulao teen_guna(4 ka bhag karo 2)
+        """)
+        self.assertEqual(output, "6\n6.0\n")
+
+    def test_memoized_function_must_be_pure(self):
+        _, output = run_program("""
+            likho dar 18
+            yaad rakho karam karo shulk daam {
+                sarkar gir gayi daam me guna karo dar
+            }
+            karam band
+        """)
+        self.assertIn("can not read outer variable 'dar'", output)
+
+    def test_errors(self):
+        _, output = run_program("sarkar gir gayi 1")
+        self.assertIn("can only be used inside a 'karam'", output)
+        _, output = run_program("ghoshna bulao kuchbhi(1)")
+        self.assertIn("Karam 'kuchbhi' is not defined.", output)
+        _, output = run_program("""
+            karam karo ek n {
+                sarkar gir gayi n
+            }
+            karam band
+            ghoshna bulao ek(1 2)
+        """)
+        self.assertIn("takes 1 arguments, got 2", output)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import io
+import queue
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src.input_source import InputSource, StreamInputSource, QueueInputSource, AsyncInputSource, MappedFileSource, parse_input_value
+
+PROGRAM = """
+    yojna shuru "Input"
+    parichay "Chacha Vidhayak Hai"
+    pucho naam
+    pucho salary
+    ghoshna naam me jodo " ki salary " me jodo salary me guna karo 2
+    yojna band
+"""
+
+class TestInputSource(unittest.TestCase):
+
+    def test_sources_must_fill(self):
+        class Empty(InputSource):
+            pass
+        with self.assertRaises(TypeError):
+            Empty()
+
+    def test_parse_input_value(self):
+        self.assertEqual(parse_input_value("42"), 42)
+        self.assertEqual(parse_input_value("-2.5"), -2.5)
+        self.assertEqual(parse_input_value("Kamal"), "Kamal")
+
+    def test_stream_lines_across_chunks(self):
+        source = StreamInputSource(io.StringIO("pehla\r\ndoosra\nteesra"), chunkSize=4)
+        self.assertEqual(source.read_line(), "pehla")
+        self.assertEqual(source.read_line(), "doosra")
+        self.assertEqual(source.read_line(), "teesra")
+        self.assertIsNone(source.read_line())
+
+    def test_mapped_file_lines_across_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "salary.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("पहला\r\n500000\nteesra")
+            source = MappedFileSource(path, chunkSize=3)
+            self.assertEqual(source.read_line(), "पहला")
+            self.assertEqual(source.read_line(), "500000")
+            self.assertEqual(source.read_line(), "teesra")
+            self.assertIsNone(source.read_line())
+            source.close()
+
+            open(path, "w").close()
+            source = MappedFileSource(path)
+            self.assertIsNone(source.read_line())
+            source.close()
+
+    def test_file_padho_loop(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "salary.txt")
+            with open(path, "w") as file:
+                file.write("\n".join(str(n * 1000) for n in range(1, 101)) + "\n")
+            program = f"""
+                yojna shuru "Padho"
+                parichay "Chacha Vidhayak Hai"
+                likho total 0
+                file padho "{path}" aur naam do salary
+                ginti karo rakam salary ki har line {{
+                    likho total total me jodo rakam
+                }}
+                ginti band
+                band karo salary
+                ghoshna total
+                yojna band
+            """
+            interpreter = Interpreter()
+            output = io.StringIO()
+            with redirect_stdout(output):
+                interpreter.interpret(Parser(lexer(program)).parse())
+        self.assertEqual(output.getvalue(), "5050000\n")
+        self.assertEqual(interpreter.bribeManager.loopDepth, 0)
+        self.assertFalse(interpreter.env.readers)
+
+    def test_queue_source_feeds_pucho(self):
+        lines = queue.Queue()
+        lines.put("Kamal\n500")
+        lines.put("00\n")
+        lines.put(None)
+        interpreter = Interpreter(QueueInputSource(lines))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            interpreter.interpret(Parser(lexer(PROGRAM)).parse())
+        self.assertEqual(output.getvalue(), "Kamal ki salary 100000\n")
+
+    def test_async_source(self):
+        async def main():
+            lines = asyncio.Queue()
+            interpreter = Interpreter(AsyncInputSource(lines))
+            task = asyncio.create_task(interpreter.interpret_async(Parser(lexer(PROGRAM)).parse()))
+            await lines.put("Kamal\n")
+            await lines.put("7\n")
+            await lines.put(None)
+            await task
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            asyncio.run(main())
+        self.assertEqual(output.getvalue(), "Kamal ki salary 14\n")
+
+    def test_async_source_runs_before_input_arrives(self):
+        source = """
+            yojna shuru "Prompt"
+            parichay "Chacha Vidhayak Hai"
+            ghoshna "naam?"
+            pucho naam
+            ghoshna naam
+            yojna band
+        """
+        output = io.StringIO()
+
+        async def main():
+            lines = asyncio.Queue()
+            interpreter = Interpreter(AsyncInputSource(lines))
+            task = asyncio.create_task(interpreter.interpret_async(Parser(lexer(source)).parse()))
+            # The input only arrives once the prompt was printed
+            while ("naam?" not in output.getvalue()):
+                await asyncio.sleep(0.01)
+            await lines.put("Kamal\n")
+            await asyncio.wait_for(task, 5)
+
+        with redirect_stdout(output):
+            asyncio.run(asyncio.wait_for(main(), 5))
+        self.assertEqual(output.getvalue(), "naam?\nKamal\n")
+
+    def test_async_errors_are_raised(self):
+        async def main():
+            lines = asyncio.Queue()
+            await lines.put(None)
+            await Interpreter(AsyncInputSource(lines)).interpret_async(Parser(lexer(PROGRAM)).parse())
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+
+    def test_pipe_lines_are_read_as_they_arrive(self):
+        readFd, writeFd = os.pipe()
+        lines = []
+        with open(readFd, "r") as stream, open(writeFd, "w") as writer:
+            writer.write("Kamal\n")
+            writer.flush()
+            # The pipe stays open, the line must not wait for a full chunk
+            reader = threading.Thread(target=lambda: lines.append(StreamInputSource(stream).read_line()), daemon=True)
+            reader.start()
+            reader.join(5)
+            self.assertEqual(lines, ["Kamal"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+
+def run_program(code):
+    """
+    Runs a TaiScript program under the 'Chacha Vidhayak Hai' parichay
+    and returns the interpreter along with everything it printed.
+    """
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    ast = Parser(lexer(source)).parse()
+    interpreter = Interpreter()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        interpreter.interpret(ast)
+    return interpreter, output.getvalue()
+
+class TestInterpreter(unittest.TestCase):
+
+    def test_array_indexing_and_append(self):
+        code = """
+            likho salaries suchi banao 100 200 300
+            salaries me dalo 400
+            ghoshna salaries ka 1
+            ghoshna salaries ka 4
+            ghoshna salaries ka 2 3
+        """
+        interpreter, output = run_program(code)
+        self.assertEqual(output, "100\n400\n[200, 300]\n")
+        self.assertEqual(interpreter.env.get_variable("salaries").typecode, 'q')
+
+    def test_array_aggregates(self):
+        code = """
+            likho salaries suchi banao 500 100 300
+            ghoshna salaries ka kul
+            ghoshna salaries ka nyuntam
+            ghoshna salaries ka adhiktam
+            ghoshna salaries ka sankhya
+        """
+        _, output = run_program(code)
+        self.assertEqual(output, "900\n100\n500\n3\n")
+
+    def test_aggregate_names_are_identifiers_elsewhere(self):
+        code = """
+            likho kul 5
+            ghoshna kul
+            likho sankhya suchi banao 1 2
+            ghoshna sankhya ka sankhya
+        """
+        _, output = run_program(code)
+        self.assertEqual(output, "5\n2\n")
+
+    def test_array_upgrades_to_float_storage(self):
+        code = """
+            likho rates suchi banao 10
+            rates me dalo 5 ka bhag karo 2
+            ghoshna rates ka kul
+        """
+        interpreter, output = run_program(code)
+        self.assertEqual(output, "12.5\n")
+        self.assertEqual(interpreter.env.get_variable("rates").typecode, 'd')
+
+    def test_array_index_out_of_range(self):
+        code = """
+            likho salaries suchi banao 1 2
+            ghoshna salaries ka 3
+        """
+        with self.assertRaises(SystemExit):
+            run_program(code)
+
+    def test_type_error_reported_before_execution(self):
+        source = 'yojna shuru "Test"\nghoshna "Shuru"\nlikho a "das" se ghatao 1\nyojna band'
+        ast = Parser(lexer(source)).parse()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                Interpreter().interpret(ast)
+        self.assertNotIn("Shuru", output.getvalue())
+        self.assertIn("Type error", output.getvalue())
+
+    def test_fuel_budget_stops_runaway_loop(self):
+        source = """
+            yojna shuru "Test"
+            parichay "Chacha Vidhayak Hai"
+            ginti karo i 1 se 1000000 tak {
+                ghoshna i
+            }
+            ginti band
+            yojna band
+        """
+        interpreter = Interpreter(fuel=10)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                interpreter.interpret(Parser(lexer(source)).parse())
+        lines = output.getvalue().split("\n")
+        # 4 top-level statements leave fuel for 6 iterations
+        self.assertEqual(lines[:7], ["1", "2", "3", "4", "5", "6", ""])
+        self.assertIn("Sarkar gir gayi!", output.getvalue())
+
+    def test_bribe_buys_fuel(self):
+        source = """
+            yojna shuru "Test"
+            parichay "Student"
+            ghoos lo 500
+            likho total 0
+            ghoos lo 500
+            ginti karo i 1 se 1000 tak {
+                likho total total me jodo i
+            }
+            ginti band
+            yojna band
+        """
+        interpreter = Interpreter(fuel=10, bribeFuel=True)
+        interpreter.interpret(Parser(lexer(source)).parse())
+        self.assertEqual(interpreter.env.get_variable("total"), 500500)
+        self.assertEqual(interpreter.fuel, 10 + 2 * 1000 - 7 - 1000)
+
+if __name__ == "__main__":
+    unittest.main()
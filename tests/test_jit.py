@@ -0,0 +1,131 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+
+def parse_program(code):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    return Parser(lexer(source)).parse()
+
+def run(code, jitThreshold, fuel=None):
+    interpreter = Interpreter(fuel=fuel, jitThreshold=jitThreshold)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            interpreter.interpret(parse_program(code))
+        except SystemExit:
+            pass
+    return interpreter, output.getvalue()
+
+class TestLoopJit(unittest.TestCase):
+
+    def assert_same_as_tree_walker(self, code, fuel=None):
+        walker, expected = run(code, None, fuel)
+        jitted, output = run(code, 5, fuel)
+        self.assertEqual(output, expected)
+        self.assertEqual(jitted.env.variables, walker.env.variables)
+        self.assertEqual(jitted.bribeManager.loopDepth, walker.bribeManager.loopDepth)
+        return jitted
+
+    def test_compiles_hot_loop(self):
+        interpreter = self.assert_same_as_tree_walker("""
+            likho total 0
+            likho naam "Chacha"
+            ginti karo i 1 se 40 tak {
+                likho total total me jodo i me guna karo 3
+                agar i ka shesh bhag karo 7 barabar hai 0 toh {
+                    ghoshna "{naam}: {i} par " me jodo total
+                }
+                warna {
+                    likho ausat total ka bhag karo i
+                }
+                ginti karo j 10 se 1 tak ghatao 3 {
+                    likho total total se ghatao j
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna total
+        """)
+        self.assertTrue(interpreter.jit.compiled)
+
+    def test_deoptimises_when_type_changes(self):
+        interpreter = self.assert_same_as_tree_walker("""
+            likho x 0
+            ginti karo k 1 se 3 tak {
+                agar k barabar hai 3 toh {
+                    likho x 1 ka bhag karo 2
+                }
+                ginti karo i 1 se 50 tak {
+                    likho x x me jodo 1
+                    agar i bada hai 1000 toh {
+                        ghoshna i
+                    }
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna x
+        """)
+        self.assertEqual(interpreter.jit.deoptimisations, 1)
+        self.assertEqual(interpreter.env.get_variable("x"), 50.5)
+
+    def test_fuel_runs_out_at_the_same_iteration(self):
+        self.assert_same_as_tree_walker("""
+            ginti karo i 1 se 1000000 tak {
+                ghoshna i
+            }
+            ginti band
+        """, fuel=200)
+
+    def test_errors_match_tree_walker(self):
+        self.assert_same_as_tree_walker("""
+            likho zero 0
+            ginti karo i 1 se 20 tak {
+                ghoshna i
+                agar i barabar hai 12 toh {
+                    ghoshna 10 ka bhag karo zero
+                }
+            }
+            ginti band
+        """)
+
+    def test_invariants_read_variables_of_the_compiled_loop(self):
+        # `i me guna karo 2` is hoisted out of the inner loop, and `i` is
+        # only a local of the compiled outer loop
+        interpreter = self.assert_same_as_tree_walker("""
+            likho s 0
+            ginti karo i 1 se 300 tak {
+                ginti karo j 1 se 1 tak {
+                    likho x i me guna karo 2
+                    likho s s me jodo x
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna s
+        """)
+        self.assertTrue(interpreter.jit.compiled)
+        self.assertEqual(interpreter.env.get_variable("s"), 90300)
+
+    def test_unsupported_loop_stays_on_tree_walker(self):
+        interpreter = self.assert_same_as_tree_walker("""
+            likho daam suchi banao 1
+            ginti karo i 1 se 20 tak {
+                daam me dalo i
+            }
+            ginti band
+            ghoshna daam ka kul
+        """)
+        self.assertFalse(interpreter.jit.compiled)
+        self.assertTrue(interpreter.jit.rejected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -247,6 +247,79 @@ class TestLexer (unittest.TestCase):
         ]
         self.assertEqual(lexer(code), expected_tokens)
 
+    def test_arrays(self):
+        code = """
+            likho salaries suchi banao 100 200
+            salaries me dalo 300
+            ghoshna salaries ka kul
+        """
+        expected_tokens = [
+            ('VAR_DECL', 'likho'),
+            ('IDENTIFIER', 'salaries'),
+            ('ARRAY_DECL', 'suchi banao'),
+            ('NUMBER', 100),
+            ('NUMBER', 200),
+            ('IDENTIFIER', 'salaries'),
+            ('ARRAY_APPEND', 'me dalo'),
+            ('NUMBER', 300),
+            ('PRINT', 'ghoshna'),
+            ('IDENTIFIER', 'salaries'),
+            ('STRUCT_ACCESS', 'ka'),
+            ('IDENTIFIER', 'kul')
+        ]
+        self.assertEqual(lexer(code), expected_tokens)
+
+    def test_functions(self):
+        code = """
+            yaad rakho karam karo dugna n {
+                sarkar gir gayi n me guna karo 2
+            }
+            karam band
+            ghoshna bulao dugna(4)
+        """
+        expected_tokens = [
+            ('MEMOIZE', 'yaad rakho'),
+            ('FUNCTION_DECL', 'karam karo'),
+            ('IDENTIFIER', 'dugna'),
+            ('IDENTIFIER', 'n'),
+            ('LCBRACE', '{'),
+            ('RETURN', 'sarkar gir gayi'),
+            ('IDENTIFIER', 'n'),
+            ('OPERATOR', 'me guna karo'),
+            ('NUMBER', 2),
+            ('RCBRACE', '}'),
+            ('FUNCTION_END', 'karam band'),
+            ('PRINT', 'ghoshna'),
+            ('FUNCTION_CALL', 'bulao'),
+            ('IDENTIFIER', 'dugna'),
+            ('LRBRACE', '('),
+            ('NUMBER', 4),
+            ('RRBRACE', ')'),
+        ]
+        self.assertEqual(lexer(code), expected_tokens)
+
+    def test_file_read_loop(self):
+        code = """
+            file padho "salary.txt" aur naam do data
+            ginti karo line data ki har line {
+            }
+            ginti band
+        """
+        expected_tokens = [
+            ('FILE_READ', 'file padho'),
+            ('STRING', 'salary.txt'),
+            ('FILE_DECL', 'aur naam do'),
+            ('IDENTIFIER', 'data'),
+            ('LOOP_START', 'ginti karo'),
+            ('IDENTIFIER', 'line'),
+            ('IDENTIFIER', 'data'),
+            ('FILE_LINES', 'ki har line'),
+            ('LCBRACE', '{'),
+            ('RCBRACE', '}'),
+            ('LOOP_END', 'ginti band'),
+        ]
+        self.assertEqual(lexer(code), expected_tokens)
+
     def test_mismatched_characters(self):
         code = "dhacha banao TaxPayer { ! }"
         with self.assertRaises(SyntaxError):
@@ -0,0 +1,112 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src.loop_optimizer import LoopInvariantHoister
+
+def parse_program(code):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    return Parser(lexer(source)).parse()
+
+class TestLoopInvariantHoister(unittest.TestCase):
+
+    def test_hoists_invariant_expression(self):
+        ast = LoopInvariantHoister().optimise(parse_program("""
+            likho salary 1000
+            likho rate 30
+            ginti karo i 1 se 12 tak {
+                likho tax salary me guna karo rate ka bhag karo 100
+                ghoshna "Mahina {i}: " me jodo tax
+            }
+            ginti band
+        """))
+        loop = ast[4]
+        self.assertEqual(loop["invariants"], [0])
+        self.assertEqual(loop["body"][0]["value"]["type"], "INVARIANT")
+        self.assertNotEqual(loop["body"][1]["value"].get("type"), "INVARIANT")
+
+    def test_variables_assigned_in_body_are_not_hoisted(self):
+        ast = LoopInvariantHoister().optimise(parse_program("""
+            likho total 0
+            ginti karo i 1 se 3 tak {
+                likho total total me jodo 5
+                ghoshna "{total}"
+            }
+            ginti band
+        """))
+        self.assertEqual(ast[3]["invariants"], [])
+
+    def test_suchi_appended_to_under_another_name(self):
+        code = """
+            likho a suchi banao 1
+            likho b a
+            ginti karo i 1 se 3 tak {
+                b me dalo i
+                ghoshna a ka kul
+            }
+            ginti band
+        """
+        ast = LoopInvariantHoister().optimise(parse_program(code))
+        self.assertEqual(ast[4]["invariants"], [])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Interpreter().interpret(parse_program(code))
+        self.assertEqual(output.getvalue(), "2\n4\n7\n")
+
+    def test_nested_loop_hoists_to_outer_loop(self):
+        ast = LoopInvariantHoister().optimise(parse_program("""
+            likho rate 7
+            ginti karo i 1 se 3 tak {
+                ginti karo j 1 se 3 tak {
+                    ghoshna rate me guna karo 2
+                    ghoshna i me guna karo 2
+                }
+                ginti band
+            }
+            ginti band
+        """))
+        outer = ast[3]
+        inner = outer["body"][0]
+        self.assertEqual(len(outer["invariants"]), 1)
+        self.assertEqual(len(inner["invariants"]), 1)
+
+    def test_error_order_is_preserved(self):
+        code = """
+            likho zero 0
+            ginti karo i 1 se 3 tak {
+                ghoshna "Pehle"
+                ghoshna 10 ka bhag karo zero
+            }
+            ginti band
+        """
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                Interpreter().interpret(parse_program(code))
+        self.assertEqual(output.getvalue(), "Pehle\n\nRuntime exception: Division by zero.\n")
+
+    def test_invariants_are_recomputed_on_each_loop_entry(self):
+        code = """
+            ginti karo i 1 se 2 tak {
+                likho base i me guna karo 10
+                ginti karo j 1 se 2 tak {
+                    ghoshna base me jodo 1
+                }
+                ginti band
+            }
+            ginti band
+        """
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Interpreter().interpret(parse_program(code))
+        self.assertEqual(output.getvalue(), "11\n11\n21\n21\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import tempfile
+import unittest
+import urllib.request
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter, prepare_program
+from src.program import Program
+from src.records import RecordRunner
+from src.metrics import Metrics, count_nodes
+
+PROGRAM = """
+    yojna shuru "Metrics"
+    parichay "Chacha Vidhayak Hai"
+    ghoos lo 600
+    ghoos lo 600
+    likho total 0
+    ginti karo i 1 se 10 tak {
+        likho total total me jodo i
+    }
+    ginti band
+    ginti karo i 1 se 30 tak {
+        agar i bada hai 100 toh {
+            ghoshna i
+        }
+    }
+    ginti band
+    ghoshna total
+    yojna band
+"""
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counts_a_run(self):
+        metrics = Metrics()
+        program = Program.compile(PROGRAM, metrics=metrics, jitThreshold=5)
+        for _ in range(2):
+            self.assertTrue(program.run().ok)
+        counters = metrics.counters
+
+        self.assertGreater(counters[("taiscript_tokens_total", ())], 0)
+        self.assertGreater(counters[("taiscript_ast_nodes_total", ())], 0)
+        self.assertEqual(counters[("taiscript_runs_total", (("status", "ok"),))], 2)
+        self.assertEqual(metrics.statements["PRINT"], 2)
+        self.assertEqual(metrics.statements["LOOP"], 4)
+        self.assertEqual(metrics.statements["VAR_DECL"], 22)
+        self.assertEqual(metrics.statements["CONDITIONAL"], 60)
+        # Vectorized, then partly compiled by the JIT
+        self.assertEqual(counters[("taiscript_loop_iterations_total", ())], 80)
+        self.assertEqual(counters[("taiscript_bribe_collections_total", (("parichay", "CHACHA VIDHAYAK HAI"),))], 4)
+        self.assertEqual(counters[("taiscript_bribe_collected_total", (("parichay", "CHACHA VIDHAYAK HAI"),))], 2400)
+        self.assertEqual(counters[("taiscript_bribe_deductions_total", (("parichay", "CHACHA VIDHAYAK HAI"),))], 2)
+
+        text = metrics.render()
+        self.assertIn("# TYPE taiscript_statements_total counter", text)
+        self.assertIn('taiscript_phase_seconds_count{phase="execute"} 2', text)
+        self.assertIn('taiscript_phase_seconds_bucket{phase="lex",le="+Inf"} 1', text)
+
+    def test_statements_are_counted_on_every_path(self):
+        source = """
+            yojna shuru "Counts"
+            parichay "Chacha Vidhayak Hai"
+            likho total 0
+            ginti karo i 1 se 500 tak {
+                likho total total me jodo i
+            }
+            ginti band
+            ginti karo i 1 se 500 tak {
+                agar i ka shesh bhag karo 2 barabar hai 0 toh {
+                    likho total total se ghatao 1
+                }
+                ginti karo j 1 se 2 tak {
+                    likho total total me jodo j
+                }
+                ginti band
+            }
+            ginti band
+            milkar ginti karo i 1 se 40 tak {
+                likho total total me jodo 1
+            }
+            ginti band
+            yojna band
+        """
+        expected = {"VAR_DECL": 1791, "LOOP": 503, "CONDITIONAL": 500}
+        # Tree walker, then vectorized and compiled loops
+        for jitThreshold in (None, 5):
+            metrics = Metrics()
+            program = Program.compile(source, metrics=metrics, jitThreshold=jitThreshold)
+            self.assertTrue(program.run().ok)
+            self.assertEqual({name: metrics.statements[name] for name in expected}, expected)
+
+    def test_iterations_left_early_are_counted(self):
+        source = """
+            yojna shuru "Iterations"
+            parichay "Chacha Vidhayak Hai"
+            likho total 0
+            ginti karo i 1 se 50 tak {
+                ginti karo j 1 se 10 tak {
+                    agar j barabar hai 3 toh {
+                        bijli chali gayi
+                    }
+                    likho total total me jodo j
+                }
+                ginti band
+            }
+            ginti band
+            yojna band
+        """
+        # Tree walker, then nested loops compiled with the outer one
+        for jitThreshold in (None, 5):
+            metrics = Metrics()
+            program = Program.compile(source, metrics=metrics, jitThreshold=jitThreshold)
+            self.assertTrue(program.run().ok)
+            self.assertEqual(metrics.counters[("taiscript_loop_iterations_total", ())], 200)
+
+        metrics = Metrics()
+        Interpreter(metrics=metrics, explicitStack=True).run(prepare_program(Parser(lexer(source)).parse()))
+        self.assertEqual(metrics.counters[("taiscript_loop_iterations_total", ())], 200)
+
+    def test_bribes_carried_over_are_counted_once(self):
+        metrics = Metrics()
+        program = Program.compile(PROGRAM, metrics=metrics)
+        program.run()
+        program.run(reset=False)
+        self.assertEqual(metrics.counters[("taiscript_bribe_collections_total", (("parichay", "CHACHA VIDHAYAK HAI"),))], 4)
+
+    def test_failed_runs(self):
+        metrics = Metrics()
+        program = Program.compile('yojna shuru "T"\nparichay "Janta"\nghoshna 1\nyojna band', metrics=metrics)
+        self.assertFalse(program.run().ok)
+        self.assertEqual(metrics.counters[("taiscript_runs_total", (("status", "failed"),))], 1)
+
+    def test_count_nodes(self):
+        ast = [{"type": "PRINT", "value": {"left": {"type": "NUMBER", "value": 1}, "operator": "me jodo", "right": {"type": "NUMBER", "value": 2}}}]
+        self.assertEqual(count_nodes(ast), 3)
+
+    def test_textfile_and_http(self):
+        metrics = Metrics()
+        metrics.add("taiscript_runs_total", 3, (("status", "ok"),))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "taiscript.prom")
+            metrics.write(path)
+            with open(path) as file:
+                self.assertIn('taiscript_runs_total{status="ok"} 3', file.read())
+
+        server = metrics.serve(0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+                self.assertIn('taiscript_runs_total{status="ok"} 3', response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_records_merge_worker_metrics(self):
+        source = 'yojna shuru "T"\nparichay "Chacha Vidhayak Hai"\nghoshna n me jodo 1\nyojna band'
+        with tempfile.TemporaryDirectory() as directory:
+            csvPath = os.path.join(directory, "rows.csv")
+            with open(csvPath, "w", newline="") as file:
+                csv.writer(file).writerows([["n"]] + [[str(i)] for i in range(10)])
+            for workers, columnar in ((1, True), (1, False), (2, True)):
+                metrics = Metrics()
+                RecordRunner(source, workers, batchSize=3, columnar=columnar, metrics=metrics).run(csvPath, os.path.join(directory, "out.csv"))
+                self.assertEqual(metrics.counters[("taiscript_runs_total", (("status", "ok"),))], 10)
+                self.assertEqual(metrics.statements["PRINT"], 10)
+
+if __name__ == "__main__":
+    unittest.main()
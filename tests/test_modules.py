@@ -0,0 +1,144 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from unittest import mock
+from src.lexer import lexer
+from src.parser import Parser
+from src.program import Program
+from src.modules import ModuleCache, link_imports, MODULE_SLOTS
+
+TAXES = """
+    yojna shuru "Taxes"
+    parichay "Chacha Vidhayak Hai"
+    dhacha banao TaxPayer {
+        likho naam
+        likho aay
+    }
+    karam karo tax aay {
+        sarkar gir gayi aay ka bhag karo 10
+    }
+    karam band
+    karam karo total_tax n {
+        likho total 0
+        ginti karo i 1 se n tak {
+            likho total total me jodo n me guna karo 50
+        }
+        ginti band
+        sarkar gir gayi total
+    }
+    karam band
+    ghoshna "not printed by importers"
+    yojna band
+"""
+
+class TestModules(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, source):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(source)
+        return path
+
+    def program(self, code, **options):
+        source = 'yojna shuru "Main"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+        return Program.compile(source, directory=self.directory.name, **options)
+
+    def test_imports_structs_and_functions(self):
+        self.write("taxes.tai", TAXES)
+        program = self.program("""
+            yojna lao "taxes.tai"
+            likho ram aur usko banao TaxPayer
+            ghoshna bulao tax(5000)
+            ghoshna bulao total_tax(3)
+        """)
+        result = program.run()
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.output, "500.0\n450\n")
+        self.assertEqual(result.variables["ram"], {"naam": None, "aay": None})
+
+    def test_modules_are_compiled_once_and_shared(self):
+        path = self.write("taxes.tai", TAXES)
+        modules = ModuleCache()
+        ast = Parser(lexer('yojna shuru "A"\nyojna lao "taxes.tai"\nyojna band')).parse()
+        first = link_imports(ast, self.directory.name, modules)
+        second = link_imports(ast, self.directory.name, modules)
+        self.assertIs(first[1]["module"], second[1]["module"])
+        self.assertEqual(modules.compiles, 1)
+
+        # A changed file is compiled again
+        with open(path, "a") as file:
+            file.write("\n")
+        link_imports(ast, self.directory.name, modules)
+        self.assertEqual(modules.compiles, 2)
+
+    def test_nested_imports_are_declared_once_in_order(self):
+        self.write("base.tai", 'yojna shuru "Base"\nkaram karo ek {\nsarkar gir gayi 1\n}\nkaram band\nyojna band')
+        self.write("left.tai", 'yojna shuru "Left"\nyojna lao "base.tai"\nkaram karo do {\nsarkar gir gayi bulao ek() me jodo 1\n}\nkaram band\nyojna band')
+        self.write("right.tai", 'yojna shuru "Right"\nyojna lao "base.tai"\nyojna band')
+        modules = ModuleCache()
+        left = modules.load(os.path.join(self.directory.name, "left.tai"))
+        right = modules.load(os.path.join(self.directory.name, "right.tai"))
+        self.assertIs(left.order[0], right.order[0])
+        self.assertEqual(modules.compiles, 3)
+
+        result = self.program('yojna lao "left.tai"\nyojna lao "right.tai"\nghoshna bulao do()').run()
+        self.assertEqual(result.output, "2\n")
+
+    def test_changed_nested_imports_are_compiled_again(self):
+        base = self.write("base.tai", 'yojna shuru "Base"\nkaram karo ek {\nsarkar gir gayi 1\n}\nkaram band\nyojna band')
+        self.write("mid.tai", 'yojna shuru "Mid"\nyojna lao "base.tai"\nkaram karo do {\nsarkar gir gayi bulao ek() me jodo 1\n}\nkaram band\nyojna band')
+        first = self.program('yojna lao "mid.tai"\nghoshna bulao do()')
+        self.assertEqual(first.run().output, "2\n")
+
+        with open(base, "w") as file:
+            file.write('yojna shuru "Base"\nkaram karo ek {\nsarkar gir gayi 100\n}\nkaram band\nyojna band')
+        second = self.program('yojna lao "mid.tai"\nghoshna bulao do()')
+        self.assertEqual(second.run().output, "101\n")
+        self.assertNotEqual(first.hash, second.hash)
+
+    def test_circular_imports(self):
+        self.write("a.tai", 'yojna shuru "A"\nyojna lao "b.tai"\nyojna band')
+        self.write("b.tai", 'yojna shuru "B"\nyojna lao "a.tai"\nyojna band')
+        with self.assertRaisesRegex(ImportError, "a.tai -> b.tai -> a.tai"):
+            self.program('yojna lao "a.tai"')
+        with self.assertRaisesRegex(ImportError, "not found"):
+            self.program('yojna lao "missing.tai"')
+
+    def test_parsed_modules_are_kept_on_disk(self):
+        path = self.write("taxes.tai", TAXES)
+        cacheDirectory = os.path.join(self.directory.name, "cache")
+        first = ModuleCache(cacheDirectory).load(path)
+        with mock.patch("src.modules.Parser", side_effect=AssertionError("parsed again")):
+            second = ModuleCache(cacheDirectory).load(path)
+        self.assertEqual(repr(first), repr(second))
+        self.assertEqual([d["type"] for d in second.declarations], ["STRUCT_DECL", "FUNCTION_DECL", "FUNCTION_DECL"])
+
+    def test_invariant_slots_do_not_clash(self):
+        path = self.write("taxes.tai", TAXES)
+        loop = ModuleCache().load(path).declarations[2]["body"][1]
+        self.assertTrue(loop["invariants"])
+        self.assertTrue(all(slot >= MODULE_SLOTS for slot in loop["invariants"]))
+
+        result = self.program("""
+            yojna lao "taxes.tai"
+            likho rate 7
+            likho sum 0
+            ginti karo j 1 se 3 tak {
+                likho sum sum me jodo rate me guna karo 2
+            }
+            ginti band
+            ghoshna sum me jodo bulao total_tax(2)
+        """, jitThreshold=None).run()
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.output, "242\n")
+
+if __name__ == "__main__":
+    unittest.main()
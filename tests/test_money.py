@@ -0,0 +1,78 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.program import Program
+from src.money import Money, MoneyArithmetic, divide_rounded
+
+def compile_program(code, rounding=""):
+    source = f'yojna shuru "Kar"\nparichay "Chacha Vidhayak Hai"\npaise me hisaab karo {rounding}\n' + code + '\nyojna band'
+    return Program.compile(source)
+
+class TestMoney(unittest.TestCase):
+
+    def test_divide_rounded(self):
+        cases = {
+            "aadha upar": [(5, 2, 3), (-5, 2, -3), (7, 3, 2), (8, 3, 3)],
+            "aadha sam": [(5, 2, 2), (7, 2, 4), (-5, 2, -2)],
+            "upar": [(7, 3, 3), (-7, 3, -2)],
+            "neeche": [(8, 3, 2), (-7, 3, -3)],
+        }
+        for rounding, values in cases.items():
+            for numerator, denominator, expected in values:
+                self.assertEqual(divide_rounded(numerator, denominator, rounding), expected, (rounding, numerator, denominator))
+
+    def test_tax_is_exact(self):
+        result = compile_program("""
+            likho tax 0
+            ghoos lo 0
+            ginti karo i 1 se 1000 tak {
+                likho tax tax me jodo 1234567 me guna karo 18 ka bhag karo 100
+            }
+            ginti band
+            ghoshna tax
+        """).run()
+        self.assertEqual(result.output, "222222060.00\n")
+        self.assertEqual(result.variables["tax"], Money(22222206000))
+        # Loop counters stay integers
+        self.assertIs(type(result.variables["i"]), int)
+
+    def test_rounding_is_selectable(self):
+        code = "ghoshna 5 ka bhag karo 200\nlikho t 1 ka bhag karo 3\nghoshna t me guna karo 3"
+        self.assertEqual(compile_program(code).run().output, "0.03\n0.99\n")
+        self.assertEqual(compile_program(code, '"aadha sam"').run().output, "0.02\n0.99\n")
+        self.assertEqual(compile_program(code, '"upar"').run().output, "0.03\n1.02\n")
+        with self.assertRaises(SyntaxError):
+            Parser(lexer('yojna shuru "Kar"\npaise me hisaab karo "kabhi nahi"\nyojna band')).parse()
+
+    def test_input_and_comparisons(self):
+        program = compile_program("""
+            pucho salary
+            agar salary bada hai 1000 toh {
+                ghoshna "Kar: " me jodo salary me guna karo 30 ka bhag karo 100
+            }
+            warna {
+                ghoshna "Maaf"
+            }
+        """)
+        self.assertEqual(program.run(["1000.005"]).output, "Kar: 300.00\n")
+        self.assertEqual(program.run(["1000"]).output, "Maaf\n")
+        self.assertEqual(program.run(["-0.5"]).output, "Maaf\n")
+
+    def test_division_by_zero(self):
+        result = compile_program("likho zero 0\nghoshna 10 ka bhag karo zero").run()
+        self.assertIn("Division by zero", str(result.error))
+
+    def test_amounts_equal_whole_rupees(self):
+        self.assertEqual(Money(500), 5)
+        self.assertEqual(hash(Money(500)), hash(5))
+        self.assertNotEqual(Money(501), 5)
+        self.assertEqual(str(Money(-5)), "-0.05")
+        self.assertEqual(MoneyArithmetic().apply("ka shesh bhag karo", Money(750), 5), Money(250))
+
+if __name__ == "__main__":
+    unittest.main()
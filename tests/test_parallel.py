@@ -0,0 +1,116 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src import parallel
+
+PROGRAM = """
+    yojna shuru "Parallel"
+    parichay "Janta"
+    ghoos lo 1000
+    likho total 0
+    likho report ""
+    ghoos lo 5000
+    LOOP i 1 se 25 tak {
+        likho sq i me guna karo i
+        ghoshna "{i} ka square {sq}"
+        likho total total me jodo sq
+        likho report report me jodo "{i},"
+        ginti karo j 1 se 2 tak {
+            likho t j
+        }
+        ginti band
+    }
+    ginti band
+    ghoos lo 1000
+    ghoshna total
+    yojna band
+"""
+
+def run(code):
+    interpreter = Interpreter()
+    interpreter.parallelRunner.workers = 2
+    output = io.StringIO()
+    with redirect_stdout(output):
+        interpreter.interpret(Parser(lexer(code)).parse())
+    return interpreter, output.getvalue()
+
+class TestParallelLoop(unittest.TestCase):
+
+    def test_matches_serial_loop(self):
+        serial, serialOutput = run(PROGRAM.replace("LOOP", "ginti karo"))
+        parallel, parallelOutput = run(PROGRAM.replace("LOOP", "milkar ginti karo"))
+        self.assertEqual(serialOutput, parallelOutput)
+        self.assertEqual(serial.env.variables, parallel.env.variables)
+        self.assertEqual(serial.bribeManager.collectedBribe, parallel.bribeManager.collectedBribe)
+        self.assertEqual(serial.bribeManager.loopDepth, parallel.bribeManager.loopDepth)
+
+    def test_insufficient_bribe_for_nested_loop(self):
+        messages = []
+        for keyword in ("ginti karo", "milkar ginti karo"):
+            code = PROGRAM.replace("LOOP", keyword).replace("ghoos lo 5000", "ghoos lo 600")
+            with self.assertRaises(SystemExit):
+                run(code)
+            interpreter = Interpreter()
+            output = io.StringIO()
+            with redirect_stdout(output):
+                with self.assertRaises(SystemExit):
+                    interpreter.interpret(Parser(lexer(code)).parse())
+            messages.append(output.getvalue().splitlines()[-1])
+        self.assertEqual(messages[0], messages[1])
+
+    def test_refuses_outer_assignment(self):
+        code = """
+            yojna shuru "Parallel"
+            parichay "Chacha Vidhayak Hai"
+            likho last 0
+            milkar ginti karo i 1 se 5 tak {
+                likho last i
+            }
+            ginti band
+            yojna band
+        """
+        interpreter = Interpreter()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(SystemExit):
+                interpreter.interpret(Parser(lexer(code)).parse())
+        self.assertIn("can not change outer variable 'last'", output.getvalue())
+
+    def test_workers_are_started_once(self):
+        code = """
+            yojna shuru "Parallel"
+            parichay "Chacha Vidhayak Hai"
+            likho total 0
+            ginti karo k 1 se 3 tak {
+                milkar ginti karo i 1 se 10 tak {
+                    likho total total me jodo i
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna total
+            yojna band
+        """
+        output = io.StringIO()
+        with mock.patch.object(parallel, "ProcessPoolExecutor", wraps=parallel.ProcessPoolExecutor) as pools:
+            interpreter = Interpreter()
+            interpreter.parallelRunner.workers = 2
+            with redirect_stdout(output):
+                interpreter.interpret(Parser(lexer(code)).parse())
+            self.assertEqual(pools.call_count, 1)
+        self.assertEqual(output.getvalue(), "165\n")
+        self.assertIsNotNone(interpreter.parallelRunner.pool)
+        interpreter.close()
+        self.assertIsNone(interpreter.parallelRunner.pool)
+
+if __name__ == "__main__":
+    unittest.main()
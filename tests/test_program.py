@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from src.program import Program
+from src.error_handler import FuelExhausted
+
+SOURCE = """
+    yojna shuru "Tax"
+    parichay "Chacha Vidhayak Hai"
+    pucho salary
+    likho tax salary me guna karo 3 ka bhag karo 10
+    ghoshna "Tax: {tax}"
+    yojna band
+"""
+
+class TestProgram(unittest.TestCase):
+
+    def test_runs_many_times_with_fresh_state(self):
+        program = Program.compile(SOURCE)
+        for salary in (1000, 2000, 30):
+            result = program.run([salary])
+            self.assertTrue(result.ok)
+            self.assertEqual(result.output, f"Tax: {salary * 3 / 10}\n")
+            self.assertEqual(result.variables, {"salary": salary, "tax": salary * 3 / 10})
+
+    def test_errors_are_returned(self):
+        program = Program.compile(SOURCE.replace("pucho salary", "likho salary naam"))
+        result = program.run()
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, RuntimeError)
+        self.assertIn("'naam' is not defined", str(result.error))
+        # The program can still be run after an error
+        self.assertFalse(program.run().ok)
+
+    def test_fuel_is_reset_between_runs(self):
+        program = Program.compile("""
+            yojna shuru "Loop"
+            parichay "Chacha Vidhayak Hai"
+            ginti karo i 1 se 1000 tak {
+                ghoshna i
+            }
+            ginti band
+            yojna band
+        """, fuel=100)
+        for _ in range(2):
+            result = program.run()
+            self.assertIsInstance(result.error, FuelExhausted)
+            self.assertEqual(result.output.count("\n"), 96)
+
+    def test_keeps_state_without_reset(self):
+        program = Program.compile(SOURCE.replace("pucho salary", "ghoos lo 500\n    pucho salary"))
+        self.assertEqual(program.run([10]).collectedBribe, 500)
+        self.assertEqual(program.run([10], reset=False).collectedBribe, 1000)
+        self.assertEqual(program.run([10]).collectedBribe, 500)
+
+    def test_compiled_loops_are_reused(self):
+        program = Program.compile("""
+            yojna shuru "Ginti"
+            parichay "Chacha Vidhayak Hai"
+            likho total 0
+            ginti karo i 1 se 2000 tak {
+                agar i ka shesh bhag karo 500 barabar hai 0 toh {
+                    likho total total me jodo i
+                }
+            }
+            ginti band
+            yojna band
+        """)
+        program.run()
+        compiled = dict(program.interpreter.jit.compiled)
+        self.assertTrue(compiled)
+        result = program.run()
+        self.assertEqual(result.variables["total"], 5000)
+        self.assertEqual(program.interpreter.jit.compiled, compiled)
+
+    def test_output_sink(self):
+        program = Program.compile(SOURCE)
+        sink = io.StringIO()
+        program.run("10", output=sink)
+        program.run("20", output=sink)
+        self.assertEqual(sink.getvalue(), "Tax: 3.0\nTax: 6.0\n")
+
+    def test_compile_errors_raise(self):
+        with self.assertRaises(SyntaxError):
+            Program.compile('yojna shuru "Adhoora"')
+        with self.assertRaises(TypeError):
+            Program.compile(SOURCE.replace("pucho salary", 'likho salary "das"'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import tempfile
+import unittest
+from src.records import RecordRunner
+
+PROGRAM = """
+    yojna shuru "Kar"
+    parichay "Chacha Vidhayak Hai"
+    paise me hisaab karo
+    likho tax 0
+    agar salary bada hai 1000 toh {
+        likho upar salary se ghatao 1000
+        likho tax upar me guna karo 30 ka bhag karo 100
+    }
+    ghoshna "{naam}: {tax}"
+    yojna band
+"""
+
+class TestRecordRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csvPath = os.path.join(self.directory.name, "rows.csv")
+        self.resultsPath = os.path.join(self.directory.name, "results.csv")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_rows(self, rows):
+        with open(self.csvPath, "w", newline="") as file:
+            csv.writer(file).writerows(rows)
+
+    def read_results(self):
+        with open(self.resultsPath, newline="") as file:
+            return list(csv.reader(file))
+
+    def test_runs_every_row(self):
+        self.write_rows([["naam", "salary"], ["Kamal", "5000"], ["Raju", "800"], ["Sita", "1234.56"]])
+        summary = RecordRunner(PROGRAM, batchSize=2).run(self.csvPath, self.resultsPath)
+        self.assertEqual(summary["rows"], 3)
+        self.assertEqual(summary["failed"], 0)
+        self.assertEqual(self.read_results(), [
+            ["row", "status", "output", "error"],
+            ["1", "ok", "Kamal: 1200.00", ""],
+            ["2", "ok", "Raju: 0", ""],
+            ["3", "ok", "Sita: 70.37", ""],
+        ])
+
+    def test_failed_rows(self):
+        self.write_rows([["naam", "salary"], ["Kamal"], ["Raju", "bahut"], ["Sita", "2000"]])
+        summary = RecordRunner(PROGRAM).run(self.csvPath, self.resultsPath)
+        self.assertEqual(summary["failed"], 2)
+        results = self.read_results()
+        self.assertIn("expected 2", results[1][3])
+        self.assertEqual(results[2][1], "failed")
+        self.assertEqual(results[3][2], "Sita: 300.00")
+
+    def test_bad_column_name(self):
+        self.write_rows([["naam", "kul salary"], ["Kamal", "5000"]])
+        with self.assertRaises(RuntimeError):
+            RecordRunner(PROGRAM).run(self.csvPath, self.resultsPath)
+
+    def test_workers_keep_row_order(self):
+        rows = [["naam", "salary"]] + [[f"N{i}", str(i * 100)] for i in range(1, 51)]
+        self.write_rows(rows)
+        RecordRunner(PROGRAM).run(self.csvPath, self.resultsPath)
+        expected = self.read_results()
+        summary = RecordRunner(PROGRAM, workers=2, batchSize=7).run(self.csvPath, self.resultsPath)
+        self.assertEqual(summary["rows"], 50)
+        self.assertEqual(self.read_results(), expected)
+
+if __name__ == "__main__":
+    unittest.main()
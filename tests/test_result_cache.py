@@ -0,0 +1,121 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import tempfile
+import unittest
+from unittest import mock
+from src.program import Program
+from src.input_source import TextInputSource
+from src.result_cache import ResultCache
+
+def compile(code, cache, parichay="Chacha Vidhayak Hai", **options):
+    source = f'yojna shuru "Test"\nparichay "{parichay}"\n' + code + '\nyojna band'
+    return Program.compile(source, cache=cache, **options)
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_same_inputs_are_replayed(self):
+        cache = ResultCache()
+        code = """
+            pucho n
+            likho total 0
+            ginti karo i 1 se n tak {
+                likho total total me jodo i
+            }
+            ginti band
+            ghoshna total
+        """
+        program = compile(code, cache)
+        first = program.run("100")
+        self.assertFalse(first.cached)
+        with mock.patch.object(program.interpreter, "run", side_effect=AssertionError("ran again")):
+            again = program.run(["100"])
+        self.assertTrue(again.cached)
+        self.assertEqual((again.output, again.variables["total"], again.ok), ("5050\n", 5050, True))
+
+        # The same source compiled again shares the entry, other inputs do not
+        self.assertTrue(compile(code, cache).run("100").cached)
+        self.assertEqual(program.run("10").output, "55\n")
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+        # The year bribes are priced by is part of the key
+        with mock.patch("src.result_cache.clock_bucket", return_value=2099):
+            self.assertFalse(program.run("100").cached)
+
+    def test_errors_bribes_and_sinks(self):
+        cache = ResultCache()
+        program = compile('ghoos lo 700\nghoshna "shuru"\nghoshna 1 ka bhag karo zero_nahi', cache, "Janta")
+        for cached in (False, True):
+            sink = io.StringIO()
+            result = program.run(output=sink)
+            self.assertEqual(result.cached, cached)
+            self.assertEqual(sink.getvalue(), "shuru\n")
+            self.assertIsNone(result.output)
+            self.assertFalse(result.ok)
+            self.assertEqual(result.bribes["JANTA"]["collected"], 700)
+
+    def test_files_are_part_of_the_run(self):
+        cache = ResultCache()
+        source, report = self.path("in.txt"), self.path("report.txt")
+        with open(source, "w") as file:
+            file.write("5\n7\n")
+        program = compile(f"""
+            likho total 0
+            file padho "{source}" aur naam do lines
+            ginti karo n lines ki har line {{
+                likho total total me jodo n
+            }}
+            ginti band
+            band karo lines
+            file kholo "{report}" aur naam do report
+            report me likho "total {{total}}"
+            band karo report
+        """, cache)
+        program.run()
+        os.remove(report)
+        self.assertTrue(program.run().cached)
+        with open(report) as file:
+            self.assertEqual(file.read(), "total 12\n")
+
+        # A changed input file is a different run
+        with open(source, "a") as file:
+            file.write("8\n")
+        self.assertFalse(program.run().cached)
+        with open(report) as file:
+            self.assertEqual(file.read(), "total 20\n")
+
+    def test_runs_that_are_not_cached(self):
+        cache = ResultCache()
+        program = compile("pucho n\nghoshna n", cache)
+        program.run(TextInputSource("1"))
+        program.run(TextInputSource("1"))
+        program.run("1")
+        program.run("1", reset=False)
+        self.assertEqual((cache.hits, cache.misses, len(cache.entries)), (0, 1, 1))
+
+        program = compile('ghoshna "ledger"', cache, ledgerPath=self.path("ledger.db"))
+        program.run()
+        self.assertFalse(program.run().cached)
+
+    def test_least_recently_used_runs_are_dropped(self):
+        cache = ResultCache(size=2)
+        program = compile("pucho n\nghoshna n", cache)
+        for n in ("1", "2", "1", "3"):
+            program.run(n)
+        self.assertTrue(program.run("1").cached)
+        self.assertTrue(program.run("3").cached)
+        self.assertFalse(program.run("2").cached)
+        self.assertEqual(len(cache.entries), 2)
+
+if __name__ == "__main__":
+    unittest.main()
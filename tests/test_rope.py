@@ -0,0 +1,81 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import pickle
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter, prepare_program
+from src.rope import Rope, append
+
+REPORT = """
+    likho report ""
+    ginti karo i 1 se 300 tak {
+        likho report report me jodo "line {i}, "
+        likho report report me jodo i
+    }
+    ginti band
+"""
+
+def run(code, explicitStack=False):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    interpreter = Interpreter(jitThreshold=None, output=io.StringIO(), explicitStack=explicitStack)
+    interpreter.run(prepare_program(Parser(lexer(source)).parse()))
+    return interpreter
+
+def expected_report():
+    return "".join(f"line {i}, {i}" for i in range(1, 301))
+
+class TestRope(unittest.TestCase):
+
+    def test_older_ropes_do_not_change(self):
+        base = append("x" * 300, "a")
+        longer = append(base, "b")
+        other = append(base, "c")
+        self.assertEqual(str(longer), "x" * 300 + "ab")
+        self.assertEqual(str(other), "x" * 300 + "ac")
+        self.assertEqual(str(base), "x" * 300 + "a")
+        self.assertEqual(str(append(longer, 5)), "x" * 300 + "ab5")
+        self.assertEqual(pickle.loads(pickle.dumps(other)), "x" * 300 + "ac")
+
+    def test_appends_in_a_loop_are_kept_as_a_rope(self):
+        for explicitStack in (False, True):
+            interpreter = run(REPORT, explicitStack)
+            self.assertIs(type(interpreter.env.variables["report"]), Rope)
+            self.assertEqual(interpreter.env.get_variable("report"), expected_report())
+            self.assertIs(type(interpreter.env.variables["report"]), str)
+
+    def test_text_is_the_same_wherever_it_is_used(self):
+        interpreter = run(REPORT + """
+            ghoshna report
+            ghoshna "report: {report}"
+            likho copy report
+            agar copy barabar hai report toh {
+                ghoshna "same"
+            }
+            likho report report me jodo "!"
+            ghoshna report
+        """)
+        report = expected_report()
+        self.assertEqual(interpreter.output.getvalue(), f"{report}\nreport: {report}\nsame\n{report}!\n")
+
+    def test_appends_inside_functions(self):
+        interpreter = run("""
+            karam karo banao n {
+                likho text ""
+                ginti karo i 1 se n tak {
+                    likho text text me jodo "ab"
+                }
+                ginti band
+                sarkar gir gayi text
+            }
+            karam band
+            ghoshna bulao banao(400)
+        """)
+        self.assertEqual(interpreter.output.getvalue(), "ab" * 400 + "\n")
+
+if __name__ == "__main__":
+    unittest.main()
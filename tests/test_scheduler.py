@@ -0,0 +1,103 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.scheduler import BatchScheduler
+from src.utils.helper import ComplexityAnalyser, UNKNOWN_TRIP_COUNT
+
+def parse_program(code):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    return Parser(lexer(source)).parse()
+
+class TestCostModel(unittest.TestCase):
+
+    def test_multiplies_literal_trip_counts(self):
+        small = ComplexityAnalyser().estimate_cost(parse_program("""
+            ginti karo i 1 se 10 tak {
+                ghoshna i
+            }
+            ginti band
+        """))
+        nested = ComplexityAnalyser().estimate_cost(parse_program("""
+            ginti karo i 1 se 10 tak {
+                ginti karo j 1 se 20 tak {
+                    ghoshna j
+                }
+                ginti band
+            }
+            ginti band
+        """))
+        # yojna shuru, parichay and yojna band cost 1 each, a loop 2 and
+        # `ghoshna i` 2 plus 1 for its expression
+        self.assertEqual(small, 3 + 2 + 10 * 3)
+        self.assertEqual(nested, 3 + 2 + 10 * (2 + 20 * 3))
+
+    def test_bounds_bound_with_likho(self):
+        analyser = ComplexityAnalyser()
+        ast = parse_program("""
+            likho n 50
+            ginti karo i 1 se n tak badhao 5 {
+                ghoshna i
+            }
+            ginti band
+        """)
+        self.assertEqual(analyser.trip_count(ast[3], {"n": 50}), 10)
+
+        ast = parse_program("""
+            pucho n
+            ginti karo i 1 se n tak {
+                ghoshna i
+            }
+            ginti band
+        """)
+        self.assertEqual(analyser.trip_count(ast[3], {}), UNKNOWN_TRIP_COUNT)
+
+class TestBatchScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.long = self.write("long.tai", 'likho total 0\nginti karo i 1 se 2000 tak {\nlikho total total me jodo i\n}\nginti band\nghoshna total')
+        self.short = self.write("short.tai", 'ghoshna "Jaldi"')
+        self.broken = self.write("broken.tai", "ghoshna")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, code):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write('yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band\n')
+        return path
+
+    def test_shortest_job_first(self):
+        scheduler = BatchScheduler(workers=2, longJobCost=1000)
+        jobs = scheduler.plan([self.long, self.short])
+        self.assertEqual([job["file"] for job in jobs], [self.short, self.long])
+        self.assertEqual([job["long"] for job in jobs], [False, True])
+
+    def test_run_reports_estimate_and_runtime(self):
+        scheduler = BatchScheduler(workers=2, longJobCost=1000)
+        results = scheduler.run([self.long, self.broken, self.short])
+        self.assertEqual([result["file"] for result in results], [self.broken, self.short, self.long])
+        self.assertEqual([result["status"] for result in results], ["failed", "ok", "ok"])
+        self.assertEqual(results[1]["output"], "Jaldi\n")
+        self.assertEqual(results[2]["output"], "2001000\n")
+        self.assertIn("dedicated", scheduler.report(results))
+
+    def test_imports_are_relative_to_each_program(self):
+        os.mkdir(os.path.join(self.directory.name, "lib"))
+        self.write(os.path.join("lib", "common.tai"), "karam karo dugna n {\nsarkar gir gayi n me guna karo 2\n}\nkaram band")
+        program = self.write("uses_lib.tai", 'yojna lao "lib/common.tai"\nghoshna bulao dugna(21)')
+        missing = self.write("missing.tai", 'yojna lao "nahi_hai.tai"\nghoshna 1')
+        results = BatchScheduler(workers=1).run([program, missing])
+        self.assertEqual([result["status"] for result in results], ["failed", "ok"])
+        self.assertIn("nahi_hai.tai", results[0]["output"])
+        self.assertEqual(results[1]["output"], "42\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter, prepare_program
+
+DEPTH = 3000
+LOOP_DEPTH = 500
+
+def parse_program(code, parichay="Chacha Vidhayak Hai"):
+    source = f'yojna shuru "Test"\nparichay "{parichay}"\n' + code + '\nyojna band'
+    return prepare_program(Parser(lexer(source)).parse())
+
+def run(ast, explicitStack, fuel=None):
+    interpreter = Interpreter(fuel=fuel, jitThreshold=None, output=io.StringIO(), explicitStack=explicitStack)
+    error = None
+    try:
+        interpreter.run(ast)
+    except RuntimeError as e:
+        error = str(e)
+    return interpreter, interpreter.output.getvalue(), error
+
+class TestStackMachine(unittest.TestCase):
+
+    def assert_same_as_recursive(self, ast, fuel=None):
+        recursive, expected, expectedError = run(ast, False, fuel)
+        stacked, output, error = run(ast, True, fuel)
+        self.assertEqual(output, expected)
+        self.assertEqual(error, expectedError)
+        self.assertEqual(stacked.env.variables, recursive.env.variables)
+        self.assertEqual(stacked.bribeManager.loopDepth, recursive.bribeManager.loopDepth)
+        self.assertEqual(stacked.bribeManager.collectedBribe, recursive.bribeManager.collectedBribe)
+        self.assertEqual(stacked.fuel, recursive.fuel)
+        return output
+
+    def test_same_as_recursive_walker(self):
+        self.assert_same_as_recursive(parse_program("""
+            karam karo jod a b {
+                ginti karo i 1 se 3 tak {
+                    agar i barabar hai 2 toh {
+                        sarkar gir gayi a me jodo b me jodo i
+                    }
+                }
+                ginti band
+            }
+            karam band
+            likho total 0
+            ginti karo i 10 se 1 tak ghatao 3 {
+                agar i ka shesh bhag karo 2 barabar hai 0 toh {
+                    ghoshna "{i} even"
+                }
+                warna {
+                    likho total total me jodo bulao jod(i 1)
+                }
+                ginti karo j 1 se 2 tak {
+                    likho total total se ghatao j
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna "total: " me jodo total
+        """))
+
+    def test_bribes_and_errors(self):
+        output = self.assert_same_as_recursive(parse_program("""
+            ghoos lo 600
+            ghoshna "shuru"
+            ghoos lo 600
+            ginti karo i 1 se 3 tak {
+                ginti karo j 1 se 2 tak {
+                    likho x i me guna karo j
+                }
+                ginti band
+            }
+            ginti band
+            ghoshna x
+        """, "Janta"))
+        self.assertIn("shuru", output)
+        self.assert_same_as_recursive(parse_program("""
+            likho zero 0
+            ginti karo i 1 se 5 tak {
+                ghoshna i
+                agar i barabar hai 3 toh {
+                    ghoshna 1 ka bhag karo zero
+                }
+            }
+            ginti band
+        """))
+
+    def test_fuel_runs_out_at_the_same_statement(self):
+        self.assert_same_as_recursive(parse_program("""
+            ginti karo i 1 se 1000 tak {
+                agar i bada hai 0 toh {
+                    ghoshna i
+                }
+            }
+            ginti band
+        """), fuel=50)
+
+    def test_deeply_nested_conditionals(self):
+        code = "".join(f"agar {level} chota hai {DEPTH} toh {{\n" for level in range(DEPTH))
+        code += 'ghoshna "andar"\n' + "}\n" * DEPTH
+        ast = parse_program(code)
+
+        # RecursionError is a RuntimeError
+        self.assertIn("recursion", run(ast, False)[2])
+        _, output, error = run(ast, True)
+        self.assertIsNone(error)
+        self.assertEqual(output, "andar\n")
+
+    def test_deeply_nested_loops(self):
+        # The hoister walks the body of every loop, preparing nested loops
+        # costs the square of the depth
+        code = "likho count 0\n"
+        code += "".join(f"ginti karo i{level} 1 se {2 if level < 3 else 1} tak {{\n" for level in range(LOOP_DEPTH))
+        code += "likho count count me jodo 1\n" + "}\nginti band\n" * LOOP_DEPTH
+        ast = parse_program(code)
+
+        self.assertIn("recursion", run(ast, False)[2])
+        interpreter, _, error = run(ast, True)
+        self.assertIsNone(error)
+        self.assertEqual(interpreter.env.get_variable("count"), 8)
+        self.assertEqual(interpreter.bribeManager.loopDepth, 0)
+
+    def test_long_expression_chain(self):
+        ast = parse_program("ghoshna " + "1 me jodo " * (DEPTH * 2) + "0")
+        _, output, error = run(ast, True)
+        self.assertIsNone(error)
+        self.assertEqual(output, f"{DEPTH * 2}\n")
+
+if __name__ == "__main__":
+    unittest.main()
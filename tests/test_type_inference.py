@@ -0,0 +1,98 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.type_inference import TypeInferrer
+
+def infer(code):
+    source = 'yojna shuru "Test"\n' + code + '\nyojna band'
+    return TypeInferrer().infer(Parser(lexer(source)).parse())
+
+class TestTypeInferrer(unittest.TestCase):
+
+    def test_int_add_and_concat(self):
+        ast = infer("""
+            likho a 5 me jodo 10
+            likho b "Total: " me jodo a
+        """)
+        self.assertEqual(ast[1]["value"]["type"], "INT_ADD")
+        self.assertEqual(ast[2]["value"]["type"], "CONCAT_RIGHT")
+
+    def test_division_by_literal(self):
+        ast = infer("""
+            likho a 5
+            likho b a ka bhag karo 2
+            likho c b me jodo a
+        """)
+        self.assertEqual(ast[2]["value"]["type"], "DIV_NONZERO")
+        self.assertEqual(ast[3]["value"]["type"], "NUM_ADD")
+
+    def test_loop_changes_type(self):
+        ast = infer("""
+            likho a 5
+            ginti karo i 1 se 3 tak {
+                ghoshna a me jodo 1
+                likho a "paanch"
+            }
+            ginti band
+        """)
+        self.assertEqual(ast[2]["body"][0]["value"]["type"], "BINARY_EXPRESSION")
+
+    def test_branches_that_leave_the_loop(self):
+        ast = infer("""
+            likho a 5
+            ginti karo i 1 se 3 tak {
+                agar i barabar hai 2 toh {
+                    likho a "paanch"
+                    bijli chali gayi
+                }
+                likho b a me jodo 1
+            }
+            ginti band
+            likho c a me jodo 1
+        """)
+        # Only the break sees `a` as a string, the rest of the body does not
+        self.assertEqual(ast[2]["body"][1]["value"]["type"], "INT_ADD")
+        self.assertEqual(ast[3]["value"]["type"], "BINARY_EXPRESSION")
+
+    def test_loop_bound_from_a_suchi(self):
+        ast = infer("""
+            likho nums suchi banao 1 2
+            likho n nums ka kul
+            likho m nums ka 2
+            ginti karo i 1 se n tak {
+                ghoshna i
+            }
+            ginti band
+            ginti karo i 1 se m tak {
+                ghoshna i
+            }
+            ginti band
+        """)
+        self.assertEqual(ast[4]["type"], "LOOP")
+        with self.assertRaises(TypeError) as context:
+            infer("""
+                likho n 5 ka bhag karo 2
+                ginti karo i 1 se n tak {
+                    ghoshna i
+                }
+                ginti band
+            """)
+        self.assertIn("Loop boundary 'n' must be an integer.", str(context.exception))
+
+    def test_static_type_errors(self):
+        with self.assertRaises(TypeError) as context:
+            infer("""
+                likho name "Kamal"
+                likho a name se ghatao 1
+                likho b 10 ka bhag karo 0
+            """)
+        self.assertIn("'se ghatao'", str(context.exception))
+        self.assertIn("Division by zero.", str(context.exception))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from src.lexer import lexer
+from src.parser import Parser
+from src.interpreter import Interpreter
+from src import vectorizer
+
+def parse_program(code):
+    source = 'yojna shuru "Test"\nparichay "Chacha Vidhayak Hai"\n' + code + '\nyojna band'
+    return Parser(lexer(source)).parse()
+
+def find_loop(ast):
+    return next(statement for statement in ast if statement["type"] == "LOOP")
+
+class TestLoopVectorizer(unittest.TestCase):
+
+    def run_both(self, code):
+        """
+        Runs the program on the scalar and the vectorized path and returns
+        both environments along with the bribe state.
+        """
+        results = []
+        for vectorize in (False, True):
+            interpreter = Interpreter()
+            if (not vectorize):
+                interpreter.vectorizer.try_execute = lambda statement: False
+            interpreter.interpret(parse_program(code))
+            manager = interpreter.bribeManager
+            results.append((interpreter.env.variables, manager.collectedBribe, manager.loopDepth))
+        return results
+
+    def test_accumulation_qualifies(self):
+        ast = parse_program("""
+            likho total 0
+            ginti karo i 1 se 10 tak {
+                likho x i me guna karo 3
+                likho total total me jodo x
+            }
+            ginti band
+        """)
+        plan = Interpreter().vectorizer.analyse(find_loop(ast))
+        self.assertIsNotNone(plan)
+        self.assertEqual(plan["accumulators"], {"total"})
+
+    def test_print_does_not_qualify(self):
+        ast = parse_program("""
+            ginti karo i 1 se 10 tak {
+                ghoshna i
+            }
+            ginti band
+        """)
+        self.assertIsNone(Interpreter().vectorizer.analyse(find_loop(ast)))
+
+    def test_cross_iteration_dependence_does_not_qualify(self):
+        ast = parse_program("""
+            likho prev 0
+            ginti karo i 1 se 10 tak {
+                likho x prev me jodo i
+                likho prev x
+            }
+            ginti band
+        """)
+        self.assertIsNone(Interpreter().vectorizer.analyse(find_loop(ast)))
+
+    @unittest.skipIf(vectorizer.np is None, "NumPy is not installed")
+    def test_results_match_scalar_path(self):
+        code = """
+            likho n 200000
+            likho rate 7
+            likho total 0
+            likho share 0
+            ginti karo i 1 se n tak badhao 3 {
+                likho x i me guna karo rate
+                likho y x ka shesh bhag karo 11
+                likho total total me jodo y
+                likho share share se ghatao i ka bhag karo 3
+            }
+            ginti band
+        """
+        scalar, vectorized = self.run_both(code)
+        self.assertEqual(scalar, vectorized)
+        self.assertEqual(type(scalar[0]["share"]), type(vectorized[0]["share"]))
+
+    @unittest.skipIf(vectorizer.np is None, "NumPy is not installed")
+    def test_division_by_zero_falls_back(self):
+        code = """
+            likho total 0
+            ginti karo i 1 se 5 tak {
+                likho total total me jodo 10 ka bhag karo i se ghatao 3
+            }
+            ginti band
+        """
+        for vectorize in (False, True):
+            interpreter = Interpreter()
+            if (not vectorize):
+                interpreter.vectorizer.try_execute = lambda statement: False
+            with self.assertRaises(SystemExit):
+                interpreter.interpret(parse_program(code))
+
+if __name__ == "__main__":
+    unittest.main()